@@ -0,0 +1,148 @@
+"""
+Game action executor for Selection Protocol.
+
+Round resolution decides the winning action on the vote manager's command
+loop, then hands the keypress to this executor. Jobs run in order on a
+dispatcher thread, which sends each keypress on a worker thread and waits
+at most the action timeout for the whole job (focus, key, revalidation and
+retry). A slow or hung backend therefore never stalls the timer, vote
+handling or overlay broadcasts, nor later actions: a timed-out job is
+reported as failed, its worker (a daemon thread, so it never holds up
+interpreter exit) is abandoned and the backend connections are replaced. Results are reported back as 'action_result' events and
+admin log entries.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from .broadcast import VOTE_ROOMS
+from .config import ACTION_TIMEOUT
+from .game_controller import get_default_game_controller
+
+
+class ActionExecutor:
+    """
+    Performs game keypresses in order, each within the action timeout.
+
+    Result event payload ('action_result'):
+        {action, key, success, error, source, round_id, claimant, duration_ms}
+    """
+
+    def __init__(self, socketio, log_action=None, timeout=ACTION_TIMEOUT, game=None, namespace='/'):
+        """
+        Initialize executor (worker starts on first job).
+
+        Args:
+            socketio: Flask-SocketIO instance for result events
+            log_action: Optional logging function for admin panel
+            timeout: Seconds each keypress job may take
+            game: GameController to send keys to (None = default game window)
+            namespace: Socket.IO namespace for action_result events
+        """
+        self.socketio = socketio
+        self.log_action = log_action or (lambda *args: None)
+        self.timeout = timeout
+        self.game = game or get_default_game_controller()
+        self.namespace = namespace
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._worker = None            # Job queue of the current keypress thread
+
+    def execute(self, action, key, source='vote', round_id=None, claimant=None):
+        """
+        Queue an action for execution and return immediately.
+
+        Args:
+            action: Action code ('k', 'l', ...)
+            key: Keypress to send
+            source: 'vote' (round winner) or 'admin' (forced)
+            round_id: Round that produced the action
+            claimant: First-L claimant at resolution time (L only)
+        """
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='action-executor', daemon=True)
+                self._thread.start()
+
+        self._queue.put({
+            'action': action,
+            'key': key,
+            'source': source,
+            'round_id': round_id,
+            'claimant': claimant,
+        })
+
+    def pending(self):
+        """Number of actions waiting to execute (approximate)."""
+        return self._queue.qsize()
+
+    def _run(self):
+        """Dispatcher: execute queued actions and report results."""
+        while True:
+            job = self._queue.get()
+            start = time.monotonic()
+            future = self._submit(self.game.send_keypress, job['key'], self.log_action, timeout=self.timeout)
+            try:
+                result = future.result(timeout=self.timeout)
+            except FutureTimeout:
+                result = {'success': False, 'error': f"Action timed out after {self.timeout}s"}
+                self._replace_worker()
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            job['duration_ms'] = int((time.monotonic() - start) * 1000)
+            self._report(job, result)
+
+    def _submit(self, fn, *args, **kwargs):
+        """Run a call on the keypress thread (started if needed) and return its Future."""
+        if self._worker is None:
+            self._worker = queue.SimpleQueue()
+            threading.Thread(target=self._work, args=(self._worker,), name='keypress', daemon=True).start()
+        future = Future()
+        self._worker.put((future, fn, args, kwargs))
+        return future
+
+    @staticmethod
+    def _work(jobs):
+        """Keypress thread: run calls until told to stop (None)."""
+        while True:
+            item = jobs.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _replace_worker(self):
+        """Abandon a stuck keypress worker and reconnect the backend."""
+        # The stuck thread cannot be killed; it exits whenever its call
+        # returns, and the next job starts on a fresh worker
+        self._worker.put(None)
+        self._worker = None
+        try:
+            self.game.reset_backend()
+        except Exception as e:
+            print(f"⚠ Keypress backend reset failed: {e}")
+
+    def _report(self, job, result):
+        """Print, log and broadcast an action result."""
+        job['success'] = result['success']
+        job['error'] = result.get('error')
+
+        label = "FORCE EXECUTED" if job['source'] == 'admin' else "EXECUTED"
+        detail = f"{job['key']} keypress ({job['action'].upper()}"
+        if job['claimant']:
+            detail += f", claimant: {job['claimant']}"
+        detail += f", {job['duration_ms']}ms)"
+
+        if job['success']:
+            print(f"✓ {label}: {detail}")
+            self.log_action(f"Action done: {job['action'].upper()}", detail)
+        else:
+            print(f"✗ FAILED: {detail} - {job['error'] or 'Unknown error'}")
+            self.log_action(f"Action FAILED: {job['action'].upper()}", job['error'] or 'Unknown error')
+
+        self.socketio.emit('action_result', job, namespace=self.namespace, to=VOTE_ROOMS)
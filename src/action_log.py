@@ -0,0 +1,122 @@
+"""
+Admin action log.
+
+Every vote, timer event and admin command is logged, so appending must
+stay cheap: entries are stored as tuples in a bounded deque (oldest
+dropped beyond ACTION_LOG_SIZE) and formatted only when sent or printed.
+
+Entry IDs increase by one per entry and are never reused, so admin
+panels receive only the entries after the last ID they saw (since())
+and scroll back through older ones a page at a time (page()).
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from .config import ACTION_LOG_SIZE, ACTION_LOG_PAGE_SIZE
+
+
+class ActionLog:
+    """Ring buffer of (id, time, action, details) entries."""
+
+    def __init__(self, maxlen=ACTION_LOG_SIZE):
+        """
+        Initialize empty log.
+
+        Args:
+            maxlen: Maximum entries kept (oldest dropped first)
+        """
+        self.maxlen = maxlen
+        self._entries = deque(maxlen=maxlen)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def last_id(self):
+        """ID of the newest entry (0 if empty)."""
+        entries = self._entries
+        return entries[-1][0] if entries else 0
+
+    def append(self, action, details=""):
+        """
+        Add an entry.
+
+        Args:
+            action: Short description of what happened
+            details: Optional details
+
+        Returns:
+            int: Entry ID
+        """
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries.append((entry_id, time.time(), action, details))
+        return entry_id
+
+    def latest(self):
+        """Get the newest entry as a dict (None if empty)."""
+        with self._lock:
+            entry = self._entries[-1] if self._entries else None
+        return self.to_dict(entry) if entry else None
+
+    def since(self, entry_id):
+        """
+        Get entries newer than entry_id.
+
+        Args:
+            entry_id: Last ID the caller has (0 = everything kept)
+
+        Returns:
+            list: Entry dicts, oldest first
+        """
+        with self._lock:
+            newer = []
+            for entry in reversed(self._entries):
+                if entry[0] <= entry_id:
+                    break
+                newer.append(entry)
+        return [self.to_dict(entry) for entry in reversed(newer)]
+
+    def page(self, before=None, limit=ACTION_LOG_PAGE_SIZE):
+        """
+        Get up to limit entries older than before.
+
+        Args:
+            before: Entry ID to page back from (None = newest entries)
+            limit: Maximum entries returned
+
+        Returns:
+            tuple: (entry dicts oldest first, whether older entries remain)
+        """
+        with self._lock:
+            entries = self._entries
+            if not entries or limit <= 0:
+                return [], False
+            first_id = entries[0][0]
+            end = len(entries) if before is None else max(0, min(len(entries), before - first_id))
+            start = max(0, end - limit)
+            selected = list(itertools.islice(entries, start, end))
+        return [self.to_dict(entry) for entry in selected], start > 0
+
+    @staticmethod
+    def to_dict(entry):
+        """Convert an entry tuple to its wire format."""
+        entry_id, timestamp, action, details = entry
+        return {
+            'id': entry_id,
+            'time': time.strftime('%H:%M:%S', time.localtime(timestamp)),
+            'action': action,
+            'details': details,
+        }
+
+    @staticmethod
+    def format(entry):
+        """Format an entry dict as a console line ("HH:MM:SS - action: details")."""
+        line = f"{entry['time']} - {entry['action']}"
+        if entry['details']:
+            line += f": {entry['details']}"
+        return line
@@ -0,0 +1,263 @@
+"""
+Arenas for Selection Protocol.
+
+An arena is one channel/game pairing: its own VoteManager, cooldowns and
+game controller, served on its own socket.io namespace. Several arenas
+(e.g. the main stream and a practice sandbox) run in one server process
+and share the round-timer scheduler and keypress backend, so an idle
+arena costs two blocked threads and no polling.
+
+Votes from the bot are routed by Twitch channel ID; votes from unknown
+channels go to the default arena.
+
+Configured in config.yaml:
+
+    arenas:
+      main:
+        namespace: /
+        channel_ids: ["123456"]
+      practice:
+        namespace: /practice
+        channel_ids: ["654321"]
+        window_name: "Bibites Practice"
+        leaderboard: false        # Keep practice rounds off !stats (default: true)
+"""
+
+from pathlib import Path
+from .cooldowns import CooldownTracker, get_default_cooldowns
+from .game_controller import (
+    WINDOW_NAME, GameController, GameWindow, get_default_game_controller,
+)
+from .vote_manager import VoteManager
+from .recovery import RoundRecovery
+from .config import RECOVERY_DIR
+
+# Arena used when config.yaml has no arenas section
+DEFAULT_ARENA = 'main'
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config.yaml'
+
+
+class Arena:
+    """One channel/game pairing with its own votes, cooldowns and game window."""
+
+    def __init__(self, name, socketio, log_action, scheduler, namespace='/',
+                 channel_ids=(), window_name=WINDOW_NAME, default=False, history=None,
+                 leaderboard=None, ranked=True):
+        """
+        Initialize arena.
+
+        Args:
+            name: Arena name (used in URLs as ?arena=name and in logs)
+            socketio: Flask-SocketIO instance
+            log_action: Logging function for admin panel
+            scheduler: Shared DeadlineScheduler for round timers
+            namespace: Socket.IO namespace for this arena's clients
+            channel_ids: Twitch channel IDs whose votes go to this arena
+            window_name: Game window title to discover
+            default: Default arena (uses the module-level game window and
+                cooldowns, so single-arena helpers keep working)
+            history: Shared HistoryStore (None = no persistence)
+            leaderboard: Shared Leaderboard fed by this arena's rounds
+                (None = not ranked)
+            ranked: Feed the leaderboard (False keeps this arena's rounds
+                off !lineage / !stats)
+        """
+        self.name = name
+        self.namespace = namespace
+        self.channel_ids = {str(channel_id) for channel_id in channel_ids}
+        self.default = default
+        self.ranked = ranked
+
+        if default:
+            self.log_action = log_action
+            self.cooldowns = get_default_cooldowns()
+            self.game = get_default_game_controller()
+            self.game.window.name = window_name
+        else:
+            self.log_action = lambda action, details="": log_action(f"[{name}] {action}", details)
+            self.cooldowns = CooldownTracker()
+            self.game = GameController(GameWindow(window_name))
+
+        self.vote_manager = VoteManager(
+            socketio, self.log_action,
+            scheduler=scheduler,
+            game_window=self.game.window,
+            game=self.game,
+            namespace=namespace,
+            history=history.for_arena(name) if history is not None else None,
+            leaderboard=leaderboard if ranked else None,
+        )
+
+        # Snapshot + journal of the live round (started by start_recovery)
+        self.recovery = RoundRecovery(
+            self.vote_manager, Path(RECOVERY_DIR) / name, self.cooldowns, scheduler
+        )
+
+    def start(self, scheduler):
+        """
+        Discover the game window and start monitoring it.
+
+        Raises:
+            RuntimeError: If the default arena's window is not found
+                (other arenas wait for their game to appear)
+        """
+        try:
+            self.game.window.discover()
+        except RuntimeError as e:
+            if self.default:
+                raise
+            print(f"⚠ Arena '{self.name}': {e} (waiting for game)")
+        self.game.window.start_monitor(scheduler)
+
+    def attach_stores(self, history, leaderboard):
+        """
+        Record this arena's rounds in stores opened after it was created.
+
+        Call before start_recovery() (a restored round is then recorded
+        when it resolves).
+
+        Args:
+            history: Shared HistoryStore (None = no persistence)
+            leaderboard: Shared Leaderboard (ignored unless ranked)
+        """
+        self.vote_manager.history = history.for_arena(self.name) if history is not None else None
+        self.vote_manager.leaderboard = leaderboard if self.ranked else None
+
+    def start_recovery(self):
+        """
+        Restore an interrupted round (if any) and start journaling.
+
+        Returns:
+            bool: True if a round was restored
+        """
+        return self.recovery.start()
+
+
+class ArenaRegistry:
+    """Arenas by name, namespace and channel ID."""
+
+    def __init__(self):
+        self._by_name = {}
+        self._by_namespace = {}
+        self._by_channel = {}
+        self.default = None
+
+    def add(self, arena):
+        """
+        Register an arena.
+
+        Raises:
+            RuntimeError: On duplicate names, namespaces or channel IDs
+        """
+        if arena.name in self._by_name:
+            raise RuntimeError(f"Duplicate arena name '{arena.name}'")
+        if arena.namespace in self._by_namespace:
+            raise RuntimeError(f"Arena '{arena.name}' reuses namespace '{arena.namespace}'")
+        for channel_id in arena.channel_ids:
+            if channel_id in self._by_channel:
+                raise RuntimeError(
+                    f"Channel {channel_id} assigned to both '{self._by_channel[channel_id].name}' "
+                    f"and '{arena.name}'"
+                )
+
+        self._by_name[arena.name] = arena
+        self._by_namespace[arena.namespace] = arena
+        for channel_id in arena.channel_ids:
+            self._by_channel[channel_id] = arena
+        if arena.default:
+            self.default = arena
+
+    def get(self, name):
+        """Get an arena by name (None if unknown)."""
+        return self._by_name.get(name)
+
+    def for_namespace(self, namespace):
+        """Get the arena serving a socket.io namespace (None if unknown)."""
+        return self._by_namespace.get(namespace)
+
+    def for_channel(self, channel_id):
+        """Get the arena for a Twitch channel ID (default arena if unmapped)."""
+        if channel_id is None:
+            return self.default
+        return self._by_channel.get(str(channel_id), self.default)
+
+    def __iter__(self):
+        return iter(self._by_name.values())
+
+    def __len__(self):
+        return len(self._by_name)
+
+
+def load_arena_config(path=CONFIG_PATH):
+    """
+    Read arena definitions from config.yaml.
+
+    Args:
+        path: Config file path
+
+    Returns:
+        list: Arena specs ({name, namespace, channel_ids, window_name, leaderboard});
+            a single default arena if the file or section is missing
+    """
+    specs = []
+    path = Path(path)
+    if path.exists():
+        import yaml
+        with open(path) as f:
+            config = yaml.safe_load(f) or {}
+        for name, spec in (config.get('arenas') or {}).items():
+            spec = spec or {}
+            namespace = spec.get('namespace', '/' if name == DEFAULT_ARENA else f'/{name}')
+            if not namespace.startswith('/'):
+                raise RuntimeError(f"Arena '{name}' namespace must start with '/' (got '{namespace}')")
+            specs.append({
+                'name': name,
+                'namespace': namespace,
+                'channel_ids': [str(c) for c in spec.get('channel_ids', [])],
+                'window_name': spec.get('window_name', WINDOW_NAME),
+                'leaderboard': bool(spec.get('leaderboard', True)),
+            })
+
+    if not specs:
+        specs.append({
+            'name': DEFAULT_ARENA, 'namespace': '/', 'channel_ids': [],
+            'window_name': WINDOW_NAME, 'leaderboard': True,
+        })
+    return specs
+
+
+def create_arenas(socketio, log_action, scheduler, specs, history=None, leaderboard=None):
+    """
+    Build arenas from specs (see load_arena_config).
+
+    The arena on namespace '/' (or the first one) is the default arena:
+    it receives votes from unmapped channels and owns the module-level
+    game window and cooldowns.
+
+    Args:
+        socketio: Flask-SocketIO instance
+        log_action: Logging function for admin panel
+        scheduler: Shared DeadlineScheduler
+        specs: Arena specs from load_arena_config
+        history: Shared HistoryStore (None = no persistence)
+        leaderboard: Shared Leaderboard for arenas whose spec enables it
+
+    Returns:
+        ArenaRegistry: Registered arenas
+    """
+    default_name = next((s['name'] for s in specs if s['namespace'] == '/'), specs[0]['name'])
+
+    registry = ArenaRegistry()
+    for spec in specs:
+        registry.add(Arena(
+            spec['name'], socketio, log_action, scheduler,
+            namespace=spec['namespace'],
+            channel_ids=spec['channel_ids'],
+            window_name=spec['window_name'],
+            default=spec['name'] == default_name,
+            history=history,
+            leaderboard=leaderboard,
+            ranked=spec.get('leaderboard', True),
+        ))
+    return registry
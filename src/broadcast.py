@@ -0,0 +1,186 @@
+"""
+Broadcast coalescing and versioning for SocketIO state updates.
+
+Chat floods can change vote state hundreds of times per second; the overlay
+only needs to redraw a few times per second. The coalescer marks state dirty
+on each change and flushes at most max_rate times per second, so broadcast
+cost is bounded by the flush rate rather than the vote rate.
+
+Flushed state is sent as versioned patches (changed fields only). Clients
+track the sequence number and request a full snapshot when they see a gap.
+
+Clients join a room per role (see websocket.ClientRooms) and events are
+addressed to the rooms that use them, so OBS overlays never receive admin
+traffic and the bot never receives vote state.
+"""
+
+import threading
+import time
+from datetime import datetime
+from .config import BROADCAST_MAX_RATE
+
+# Socket.IO rooms by client role
+ROOM_OVERLAY = 'overlay'
+ROOM_ADMIN = 'admin'
+ROOM_BOT = 'bot'
+ROLES = (ROOM_OVERLAY, ROOM_ADMIN, ROOM_BOT)
+
+# Rooms that render vote state (vote_patch, action_result)
+VOTE_ROOMS = [ROOM_OVERLAY, ROOM_ADMIN]
+
+
+class BroadcastCoalescer:
+    """
+    Rate-capped, coalescing broadcaster.
+
+    The first change after a quiet period is flushed immediately (leading
+    edge); changes inside the rate window are merged into one trailing
+    flush at the end of the window. flush() bypasses the cap for
+    round-boundary events that must reach clients right away.
+    """
+
+    def __init__(self, socketio, flush_fn, max_rate=BROADCAST_MAX_RATE):
+        """
+        Initialize coalescer.
+
+        Args:
+            socketio: Flask-SocketIO instance (used for background tasks)
+            flush_fn: Callable that performs the actual emit
+            max_rate: Maximum flushes per second (0 or None = no cap)
+        """
+        self.socketio = socketio
+        self._flush_fn = flush_fn
+        self.interval = 1.0 / max_rate if max_rate else 0.0
+
+        self._lock = threading.Lock()
+        self._dirty = False            # Change pending for trailing flush
+        self._flush_scheduled = False  # Trailing flush task running
+        self._last_flush = 0.0         # Monotonic time of last flush
+
+        # Counters
+        self.emits_requested = 0
+        self.emits_sent = 0
+        self.emits_suppressed = 0
+
+    def mark_dirty(self):
+        """Record a state change; flush now or fold into the next flush."""
+        with self._lock:
+            self.emits_requested += 1
+            now = time.monotonic()
+            wait = self._last_flush + self.interval - now
+
+            if wait <= 0 and not self._flush_scheduled:
+                self._last_flush = now
+                flush_now = True
+            else:
+                flush_now = False
+                if self._dirty:
+                    self.emits_suppressed += 1
+                self._dirty = True
+                if not self._flush_scheduled:
+                    self._flush_scheduled = True
+                    self.socketio.start_background_task(self._trailing_flush, wait)
+
+        if flush_now:
+            self._send()
+
+    def flush(self):
+        """Flush immediately, regardless of rate cap (round boundaries)."""
+        with self._lock:
+            self.emits_requested += 1
+            if self._dirty:
+                # Pending trailing flush is superseded by this one
+                self.emits_suppressed += 1
+            self._dirty = False
+            self._last_flush = time.monotonic()
+        self._send()
+
+    def get_stats(self):
+        """
+        Get broadcast counters.
+
+        Returns:
+            dict: requested, sent and suppressed emit counts, plus max rate
+        """
+        return {
+            'requested': self.emits_requested,
+            'sent': self.emits_sent,
+            'suppressed': self.emits_suppressed,
+            'max_rate': 1.0 / self.interval if self.interval else None
+        }
+
+    def _trailing_flush(self, wait):
+        """Background task: flush pending changes at the end of the rate window."""
+        if wait > 0:
+            self.socketio.sleep(wait)
+
+        with self._lock:
+            self._flush_scheduled = False
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+        self._send()
+
+    def _send(self):
+        """Perform the emit and count it."""
+        with self._lock:
+            self.emits_sent += 1
+        self._flush_fn()
+
+
+class VersionedState:
+    """
+    Sequence-numbered state with field-level patches.
+
+    Wire format:
+    - Patch:    {'seq': 42, 'changes': {'time_remaining': 17}}
+    - Snapshot: {'seq': 42, 'timestamp': '...', **full_state}
+
+    Every update that changes at least one field bumps seq by one, so a
+    client that sees seq jump by more than one knows it missed a patch.
+    """
+
+    def __init__(self):
+        """Initialize empty state at sequence 0."""
+        self._lock = threading.Lock()
+        self._state = {}
+        self.seq = 0
+
+    def update(self, state):
+        """
+        Diff new state against the last published state.
+
+        Args:
+            state: Full current state dict
+
+        Returns:
+            dict: Patch {'seq', 'changes'}, or None if nothing changed
+        """
+        with self._lock:
+            current = self._state
+            changes = {
+                key: value
+                for key, value in state.items()
+                if key not in current or current[key] != value
+            }
+            if not changes:
+                return None
+
+            current.update(changes)
+            self.seq += 1
+            return {'seq': self.seq, 'changes': changes}
+
+    def snapshot(self):
+        """
+        Get the full published state for (re)syncing a client.
+
+        Returns:
+            dict: Full state with 'seq' and 'timestamp'
+        """
+        with self._lock:
+            snapshot = dict(self._state)
+            snapshot['seq'] = self.seq
+        snapshot['timestamp'] = datetime.now().isoformat()
+        return snapshot
@@ -0,0 +1,344 @@
+"""
+Outbound Twitch chat queue for the Selection Protocol bot.
+
+Messages are sent through the Helix "Send Chat Message" endpoint from one
+pooled aiohttp session, so sending never blocks EventSub handling.
+A token bucket keeps the bot inside Twitch's chat limit (20 messages per
+30 seconds for a regular account): with burst B and refill rate r, any
+30s window carries at most B + 30r messages, so the defaults (burst 10,
+10 per 30s) never exceed 20.
+
+Under backlog the queue stays useful rather than merely ordered:
+- lower priority numbers go first (round results before command replies
+  before calls to action)
+- a message with a key replaces a queued message with the same key
+  (only the latest round result / CTA is worth sending)
+- messages older than their ttl when their turn comes are dropped
+- beyond max_queue, the lowest-priority oldest message is dropped
+
+Every send() returns a future that resolves to True once Twitch accepts
+the message, False if it was dropped or rejected. A message rejected with
+401 is retried once after on_unauthorized (e.g. TokenManager.renew)
+reports a new token.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+import aiohttp
+
+HELIX_URL = 'https://api.twitch.tv/helix'
+
+# Priorities (lower is sent first)
+PRIORITY_RESULT = 0      # Round outcomes
+PRIORITY_REPLY = 1       # Command replies (!stats, !lineage)
+PRIORITY_UPDATE = 2      # Round opened, startup announcement
+PRIORITY_CTA = 3         # Calls to action
+
+# Default token bucket: at most 20 messages in any 30s window
+CHAT_BURST = 10
+CHAT_RATE = 10 / 30
+
+
+class TokenBucket:
+    """Token bucket with async acquire (single consumer)."""
+
+    def __init__(self, rate, capacity):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait for and take one token."""
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def refund(self):
+        """Return an unused token."""
+        self._tokens = min(self.capacity, self._tokens + 1)
+
+    def pause(self, seconds):
+        """Stop handing out tokens (server said we are rate limited) and empty the bucket."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+        self._updated = self._paused_until
+
+
+class _Message:
+    __slots__ = ('priority', 'seq', 'text', 'channel_id', 'key', 'expires', 'created', 'future', 'done', 'retried')
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ChatSender:
+    """
+    Prioritised, rate-limited chat message queue.
+
+    Call start() from the running event loop and close() on shutdown.
+    """
+
+    def __init__(self, client_id, token, sender_id, channel_id, helix_url=HELIX_URL,
+                 rate=CHAT_RATE, burst=CHAT_BURST, max_queue=50, timeout=10, on_unauthorized=None):
+        """
+        Initialize sender (no connection until the first message).
+
+        Args:
+            client_id: Application client ID
+            token: User access token, or a zero-argument callable returning
+                the current token (read on every request)
+            sender_id: Bot user ID (numeric)
+            channel_id: Default broadcaster ID messages go to
+            helix_url: Helix API base URL (point at a local stub for tests)
+            rate: Messages per second the bucket refills
+            burst: Bucket capacity
+            max_queue: Queued messages kept under backlog
+            timeout: Seconds per HTTP request
+            on_unauthorized: Async callable taking the rejected token and
+                returning True if a new token is available (None = fail
+                the message)
+        """
+        self.client_id = client_id
+        self._token = token
+        self.sender_id = sender_id
+        self.channel_id = channel_id
+        self.url = helix_url.rstrip('/') + '/chat/messages'
+        self.bucket = TokenBucket(rate, burst)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.on_unauthorized = on_unauthorized
+
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+        self._heap = []
+        self._by_key = {}
+        self._seq = itertools.count()
+        self._ready = None
+        self._session = None
+        self._task = None
+
+    # ------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------
+
+    def start(self):
+        """Start the send loop (must be called from the event loop)."""
+        if self._task is None:
+            self._ready = asyncio.Event()
+            if self._heap:
+                self._ready.set()
+            self._task = asyncio.create_task(self._run())
+
+    def send(self, text, priority=PRIORITY_REPLY, key=None, ttl=None, channel_id=None):
+        """
+        Queue a chat message and return immediately.
+
+        Args:
+            text: Message text (Twitch truncates past 500 characters)
+            priority: PRIORITY_* constant (lower goes first)
+            key: Merge key - replaces a queued message with the same key
+            ttl: Seconds the message stays worth sending (None = forever)
+            channel_id: Broadcaster ID (None = default channel)
+
+        Returns:
+            asyncio.Future: Resolves to True if sent, False if dropped or rejected
+        """
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        expires = now + ttl if ttl is not None else None
+
+        queued = self._by_key.get(key) if key is not None else None
+        if queued is not None and not queued.done:
+            # Newer content for the same slot: take over the queued message
+            queued.text = text[:500]
+            queued.expires = expires
+            queued.created = now
+            self.merged += 1
+            return queued.future
+
+        message = _Message()
+        message.priority = priority
+        message.seq = next(self._seq)
+        message.text = text[:500]
+        message.channel_id = channel_id or self.channel_id
+        message.key = key
+        message.expires = expires
+        message.created = now
+        message.future = loop.create_future()
+        message.done = False
+        message.retried = False
+
+        heapq.heappush(self._heap, message)
+        if key is not None:
+            self._by_key[key] = message
+        self._trim()
+        if self._ready is not None:
+            self._ready.set()
+        return message.future
+
+    def pending(self):
+        """Number of queued messages."""
+        return sum(1 for message in self._heap if not message.done)
+
+    def _finish(self, message, result):
+        message.done = True
+        if message.key is not None and self._by_key.get(message.key) is message:
+            del self._by_key[message.key]
+        if not message.future.done():
+            message.future.set_result(result)
+
+    def _trim(self):
+        """Drop the lowest-priority oldest messages beyond max_queue."""
+        live = [message for message in self._heap if not message.done]
+        if len(live) > self.max_queue:
+            live.sort(key=lambda m: (-m.priority, m.seq))
+            for message in live[:len(live) - self.max_queue]:
+                self.dropped += 1
+                self._finish(message, False)
+        self._heap = [message for message in self._heap if not message.done]
+        heapq.heapify(self._heap)
+
+    def _next(self):
+        """Pop the next live, unexpired message (or None)."""
+        now = time.monotonic()
+        while self._heap:
+            message = heapq.heappop(self._heap)
+            if message.done:
+                continue
+            if message.expires is not None and now > message.expires:
+                self.dropped += 1
+                self._finish(message, False)
+                continue
+            if message.key is not None and self._by_key.get(message.key) is message:
+                del self._by_key[message.key]  # In flight: new messages with this key queue afresh
+            return message
+        return None
+
+    # ------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------
+
+    async def _run(self):
+        """Send loop: wait for a token, then send the best message still worth sending."""
+        while True:
+            await self._ready.wait()
+            await self.bucket.acquire()
+            message = self._next()  # Chosen after the wait, so stale messages are skipped
+            if message is None:
+                self._ready.clear()
+                self.bucket.refund()
+                continue
+            await self._deliver(message)
+
+    async def _deliver(self, message):
+        token = self._token() if callable(self._token) else self._token
+        headers = {
+            'Client-ID': self.client_id,
+            'Authorization': f'Bearer {token}',
+        }
+        payload = {
+            'broadcaster_id': message.channel_id,
+            'sender_id': self.sender_id,
+            'message': message.text,
+        }
+        try:
+            if self._session is None:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                )
+            async with self._session.post(self.url, headers=headers, json=payload) as response:
+                if response.status == 429:
+                    # Rate limited anyway (shared limit, other clients): wait for reset, retry
+                    reset = float(response.headers.get('Ratelimit-Reset', 0) or 0)
+                    self.rate_limited += 1
+                    self.bucket.pause(max(1.0, reset - time.time()))
+                    self._requeue(message)
+                    print(f"⚠ Chat rate limited - pausing sends ({self.pending()} queued)")
+                    return
+                if response.status == 401 and self.on_unauthorized is not None and not message.retried:
+                    # Token expired under us: retry once with the renewed token
+                    message.retried = True
+                    if await self.on_unauthorized(token):
+                        self._requeue(message)
+                        self.bucket.refund()
+                        return
+                body = await response.json(content_type=None)
+                if response.status >= 400:
+                    raise RuntimeError(f"HTTP {response.status}: {body.get('message', body)}")
+        except Exception as e:
+            self.failed += 1
+            print(f"⚠ Chat send failed: {e}")
+            self._finish(message, False)
+            return
+
+        result = (body.get('data') or [{}])[0]
+        if result.get('is_sent', True):
+            self.sent += 1
+            self._finish(message, True)
+        else:
+            self.failed += 1
+            reason = (result.get('drop_reason') or {}).get('message', 'unknown reason')
+            print(f"⚠ Chat message dropped by Twitch: {reason}")
+            self._finish(message, False)
+
+    def _requeue(self, message):
+        """Put an in-flight message back (unless a newer one with its key is queued)."""
+        if message.key is not None and message.key in self._by_key:
+            self._finish(message, False)  # Superseded while in flight
+            return
+        if message.key is not None:
+            self._by_key[message.key] = message
+        heapq.heappush(self._heap, message)
+        if self._ready is not None:
+            self._ready.set()
+
+    async def close(self):
+        """Stop the send loop and close the HTTP session."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def get_stats(self):
+        """
+        Get queue counters.
+
+        Returns:
+            dict: sent, merged, dropped, failed, rate_limited and pending
+        """
+        return {
+            'sent': self.sent,
+            'merged': self.merged,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'rate_limited': self.rate_limited,
+            'pending': self.pending(),
+        }
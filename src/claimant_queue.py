@@ -0,0 +1,181 @@
+"""
+Ordered index of L voters for first-L claimant tracking.
+
+Keeps current L voters ordered by vote timestamp using a pair of heaps
+with lazy deletion, so claimant transfer is O(log n) and "who is first /
+who is latest" lookups are amortized O(1) instead of rescanning all votes.
+"""
+
+import heapq
+
+
+def _sort_key(timestamp):
+    """Convert a vote timestamp (datetime or float) to a float sort key."""
+    if hasattr(timestamp, 'timestamp'):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+class ClaimantQueue:
+    """
+    L voters ordered by vote timestamp (earliest first).
+
+    Re-adding a user replaces their previous entry (switching back to L
+    means a new timestamp - back of the queue). Removed entries stay in
+    the heaps until they surface and are discarded.
+    """
+
+    def __init__(self):
+        """Initialize an empty queue."""
+        # Current entries: {username: (sort_key, seq, timestamp)}
+        self._entries = {}
+        # Min-heap (sort_key, seq, username) for earliest voter
+        self._min_heap = []
+        # Max-heap (-sort_key, -seq, username) for latest voter
+        self._max_heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, username):
+        return username in self._entries
+
+    def add(self, username, timestamp):
+        """
+        Add or re-add an L voter.
+
+        Args:
+            username: Voter key
+            timestamp: Vote timestamp (datetime or float)
+        """
+        key = _sort_key(timestamp)
+        self._seq += 1
+        seq = self._seq
+        self._entries[username] = (key, seq, timestamp)
+        heapq.heappush(self._min_heap, (key, seq, username))
+        heapq.heappush(self._max_heap, (-key, -seq, username))
+        self._maybe_compact()
+
+    def load(self, items):
+        """
+        Replace the queue with (username, timestamp) pairs in one pass.
+
+        Heaps are built with heapify (O(n)) rather than n pushes; pairs
+        should be in arrival order so equal timestamps keep that order.
+
+        Args:
+            items: Iterable of (username, timestamp)
+        """
+        self.clear()
+        pairs = list(items)
+        if not pairs:
+            return
+        usernames, timestamps = zip(*pairs)
+        if all(type(timestamp) is float for timestamp in timestamps):
+            keys = timestamps
+        else:
+            keys = [_sort_key(timestamp) for timestamp in timestamps]
+        first, last = self._seq + 1, self._seq + len(pairs)
+        self._seq = last
+
+        # Columns zipped in C; a repeated username keeps its last pair (earlier ones go stale)
+        self._entries = dict(zip(usernames, zip(keys, range(first, last + 1), timestamps)))
+        self._min_heap = list(zip(keys, range(first, last + 1), usernames))
+        self._max_heap = list(zip(map(float.__neg__, keys), range(-first, -last - 1, -1), usernames))
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
+
+    def discard(self, username):
+        """
+        Remove an L voter if present.
+
+        Args:
+            username: Voter key
+        """
+        if self._entries.pop(username, None) is not None:
+            self._maybe_compact()
+
+    def clear(self):
+        """Remove all voters (new round)."""
+        self._entries.clear()
+        self._min_heap.clear()
+        self._max_heap.clear()
+
+    def first(self):
+        """
+        Get the earliest L voter.
+
+        Returns:
+            tuple: (username, timestamp), or None if queue is empty
+        """
+        heap = self._min_heap
+        while heap:
+            _, seq, username = heap[0]
+            if self._is_current(username, seq):
+                return username, self._entries[username][2]
+            heapq.heappop(heap)
+        return None
+
+    def latest(self):
+        """
+        Get the most recent L voter.
+
+        Returns:
+            tuple: (username, timestamp), or None if queue is empty
+        """
+        heap = self._max_heap
+        while heap:
+            _, neg_seq, username = heap[0]
+            if self._is_current(username, -neg_seq):
+                return username, self._entries[username][2]
+            heapq.heappop(heap)
+        return None
+
+    def top(self, n):
+        """
+        Get the first n L voters in claim order, without modifying the queue.
+
+        Walks the heap as a tree, so cost is O(n log n) plus any stale
+        entries encountered, independent of total queue size.
+
+        Args:
+            n: Maximum number of usernames to return
+
+        Returns:
+            list: Usernames, earliest first
+        """
+        heap = self._min_heap
+        result = []
+        if n <= 0 or not heap:
+            return result
+
+        frontier = [(heap[0], 0)]
+        while frontier and len(result) < n:
+            (_, seq, username), index = heapq.heappop(frontier)
+            if self._is_current(username, seq):
+                result.append(username)
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    def _is_current(self, username, seq):
+        """Check whether a heap entry is the user's live entry."""
+        entry = self._entries.get(username)
+        return entry is not None and entry[1] == seq
+
+    def _maybe_compact(self, force=False):
+        """Rebuild heaps when stale entries outnumber live ones (or when forced)."""
+        if not force and len(self._min_heap) <= 2 * len(self._entries) + 64:
+            return
+        self._min_heap = [
+            (key, seq, username)
+            for username, (key, seq, _) in self._entries.items()
+        ]
+        self._max_heap = [
+            (-key, -seq, username)
+            for username, (key, seq, _) in self._entries.items()
+        ]
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
@@ -0,0 +1,125 @@
+"""
+Single-writer command loop for Selection Protocol.
+
+Vote state is mutated from socket.io handlers, admin handlers and timer
+tasks running on different threads. Instead of locking every method, all
+mutations are funnelled through one queue and applied in order by a single
+worker thread that owns the state (actor style). Callers get results back
+via concurrent.futures.Future.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class CommandLoop:
+    """
+    Ordered command queue with one worker thread.
+
+    Commands submitted from the worker thread itself (e.g. a command that
+    triggers another) run inline, so nested calls cannot deadlock.
+    """
+
+    _STOP = object()
+
+    def __init__(self, name='command-loop'):
+        """
+        Initialize command loop (worker starts on first submit).
+
+        Args:
+            name: Worker thread name (shown in tracebacks/debuggers)
+        """
+        self.name = name
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.commands_processed = 0
+
+    def start(self):
+        """Start the worker thread (no-op if already running)."""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Stop the worker after already-queued commands have run.
+
+        Args:
+            timeout: Seconds to wait for the worker to exit
+        """
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        if not self.in_loop():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def in_loop(self):
+        """Check whether the caller is running on the worker thread."""
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue a command for the worker.
+
+        Args:
+            fn: Callable to run on the worker thread
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            Future: Resolves to fn's return value (or its exception)
+        """
+        future = Future()
+
+        if self.in_loop():
+            self._execute(future, fn, args, kwargs)
+            return future
+
+        if self._thread is None:
+            self.start()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def call(self, fn, *args, timeout=None, **kwargs):
+        """
+        Run a command on the worker and wait for its result.
+
+        Args:
+            fn: Callable to run on the worker thread
+            timeout: Seconds to wait for the result (None = forever)
+            *args, **kwargs: Arguments for fn
+
+        Returns:
+            fn's return value
+
+        Raises:
+            Exception raised by fn, or TimeoutError if timeout expires
+        """
+        return self.submit(fn, *args, **kwargs).result(timeout)
+
+    def _run(self):
+        """Worker: apply commands in submission order."""
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            future, fn, args, kwargs = item
+            self._execute(future, fn, args, kwargs)
+
+    def _execute(self, future, fn, args, kwargs):
+        """Run one command and settle its future."""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            print(f"✗ {self.name}: {getattr(fn, '__name__', fn)} failed: {e}")
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            self.commands_processed += 1
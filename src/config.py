@@ -3,7 +3,7 @@ Configuration values for the Twitch Plays God overlay server.
 
 Contains cooldown durations and other configuration constants.
 
-Note: Game window ID is auto-discovered at runtime via game_controller.discover_game_window()
+Note: Game window ID is auto-discovered at runtime via game_controller.GameWindow.discover()
 """
 
 # Cooldown durations in seconds
@@ -14,3 +14,45 @@ COOLDOWN_DURATIONS = {
     'zoom_out': 5,   # KP- - individual cooldown
     'extend': 30     # x - individual cooldown
 }
+
+# Maximum vote_update broadcasts per second (votes arriving faster are coalesced)
+BROADCAST_MAX_RATE = 10
+
+# Maximum connected-client count updates per second to admin panels (refresh storms are coalesced)
+CLIENT_COUNT_MAX_RATE = 2
+
+# Admin action log (see action_log.py): entries kept in memory (oldest dropped),
+# entries per page (join snapshot and scroll-back), largest page a client may request,
+# maximum incremental log updates per second to admin panels
+ACTION_LOG_SIZE = 10000
+ACTION_LOG_PAGE_SIZE = 50
+ACTION_LOG_PAGE_MAX = 500
+ACTION_LOG_MAX_RATE = 4
+
+# Seconds a whole game action job (focus, keypress, retry) may take before it is
+# reported as failed and its worker and backend connection are replaced
+ACTION_TIMEOUT = 2.0
+
+# Keypress backend: 'auto' (XTest, falling back to xdotool), 'xtest', 'xdotool' or 'dry-run'
+KEYPRESS_BACKEND = 'auto'
+
+# Seconds between background checks that the game window still exists
+WINDOW_CHECK_INTERVAL = 5.0
+
+# Round history database (votes, timer events, outcomes; see history.py)
+HISTORY_DB_PATH = 'data/history.db'
+
+# Recently applied bot vote_ids remembered for replay deduplication
+# (see vote_delivery.RecentVoteIds)
+VOTE_ID_CACHE_SIZE = 100000
+
+# Lineage leaderboard aggregates for !lineage / !stats (see leaderboard.py)
+LEADERBOARD_DB_PATH = 'data/leaderboard.db'
+
+# Crash recovery (see recovery.py): per-arena snapshot + journal directory,
+# seconds between snapshots while votes arrive, seconds between journal writes,
+# journal entries that force an early snapshot (bounds replay time on restore)
+RECOVERY_DIR = 'data/recovery'
+SNAPSHOT_INTERVAL = 5.0
+JOURNAL_FLUSH_INTERVAL = 0.05
+JOURNAL_MAX_ENTRIES = 10000
@@ -3,79 +3,113 @@ Cooldown state management and functions.
 
 Tracks active cooldowns for game actions and provides functions to check/start cooldowns.
 Cooldowns prevent spam and ensure balanced gameplay.
+
+Each arena owns a CooldownTracker; the module-level functions operate on
+the default tracker for single-arena callers.
 """
 
 import time
 from .config import COOLDOWN_DURATIONS
 
-# Cooldown state - tracks active cooldowns and expiry times
-cooldown_state = {
-    'primary': {'active': False, 'expires_at': 0},  # Kill, Lay (15s shared)
-    'camera': {'active': False, 'expires_at': 0},   # Ctrl+G/O/R (10s shared)
-    'zoom_in': {'active': False, 'expires_at': 0},  # KP+ (5s individual)
-    'zoom_out': {'active': False, 'expires_at': 0}, # KP- (5s individual)
-    'extend': {'active': False, 'expires_at': 0}    # x (30s individual)
-}
 
+class CooldownTracker:
+    """Active cooldowns and expiry times for one arena."""
+
+    def __init__(self, durations=None):
+        """
+        Initialize tracker with all groups ready.
+
+        Args:
+            durations: Cooldown seconds per group (defaults to COOLDOWN_DURATIONS)
+        """
+        self.durations = durations or COOLDOWN_DURATIONS
+        # Cooldown state - tracks active cooldowns and expiry times
+        self.state = {
+            group: {'active': False, 'expires_at': 0}
+            for group in self.durations
+        }
+
+    def start(self, group, log_func=None):
+        """
+        Start a cooldown for the given group.
+
+        Args:
+            group: Cooldown group name ('primary', 'camera', 'zoom_in', 'zoom_out', 'extend')
+            log_func: Optional logging function to call with action details
+        """
+        self.state[group]['active'] = True
+        self.state[group]['expires_at'] = time.time() + self.durations[group]
+        if log_func:
+            log_func(f"Cooldown started", f"{group} ({self.durations[group]}s)")
+
+    def check(self, group):
+        """
+        Check if a cooldown is active. Returns remaining time or 0 if ready.
+
+        Args:
+            group: Cooldown group name to check
+
+        Returns:
+            float: Remaining time in seconds, or 0 if cooldown is not active
+        """
+        if not self.state[group]['active']:
+            return 0
+
+        remaining = self.state[group]['expires_at'] - time.time()
+        if remaining <= 0:
+            # Cooldown expired, clear it
+            self.state[group]['active'] = False
+            self.state[group]['expires_at'] = 0
+            return 0
+
+        return remaining
+
+    def as_dict(self):
+        """
+        Get current cooldown state with remaining times for all groups.
+
+        Automatically expires any cooldowns that have passed and returns clean state.
+
+        Returns:
+            dict: Cooldown state for each group with 'active' and 'remaining' fields
+        """
+        current_time = time.time()
+        state = {}
+        for group, entry in self.state.items():
+            if entry['active']:
+                remaining = max(0, entry['expires_at'] - current_time)
+                if remaining <= 0:
+                    entry['active'] = False
+                    entry['expires_at'] = 0
+                state[group] = {
+                    'active': remaining > 0,
+                    'remaining': int(remaining) if remaining > 0 else 0
+                }
+            else:
+                state[group] = {'active': False, 'remaining': 0}
+        return state
+
+
+# Default tracker (single-arena callers)
+_DEFAULT_TRACKER = CooldownTracker()
+cooldown_state = _DEFAULT_TRACKER.state
 
-def start_cooldown(group, log_func=None):
-    """
-    Start a cooldown for the given group.
 
-    Args:
-        group: Cooldown group name ('primary', 'camera', 'zoom_in', 'zoom_out', 'extend')
-        log_func: Optional logging function to call with action details
-    """
-    cooldown_state[group]['active'] = True
-    cooldown_state[group]['expires_at'] = time.time() + COOLDOWN_DURATIONS[group]
-    if log_func:
-        log_func(f"Cooldown started", f"{group} ({COOLDOWN_DURATIONS[group]}s)")
+def start_cooldown(group, log_func=None):
+    """Start a cooldown on the default tracker (see CooldownTracker.start)."""
+    _DEFAULT_TRACKER.start(group, log_func)
 
 
 def check_cooldown(group):
-    """
-    Check if a cooldown is active. Returns remaining time or 0 if ready.
-
-    Args:
-        group: Cooldown group name to check
+    """Check a cooldown on the default tracker (see CooldownTracker.check)."""
+    return _DEFAULT_TRACKER.check(group)
 
-    Returns:
-        float: Remaining time in seconds, or 0 if cooldown is not active
-    """
-    if not cooldown_state[group]['active']:
-        return 0
 
-    remaining = cooldown_state[group]['expires_at'] - time.time()
-    if remaining <= 0:
-        # Cooldown expired, clear it
-        cooldown_state[group]['active'] = False
-        cooldown_state[group]['expires_at'] = 0
-        return 0
-
-    return remaining
+def get_cooldown_state_dict():
+    """Get the default tracker's cooldown state (see CooldownTracker.as_dict)."""
+    return _DEFAULT_TRACKER.as_dict()
 
 
-def get_cooldown_state_dict():
-    """
-    Get current cooldown state with remaining times for all groups.
-
-    Automatically expires any cooldowns that have passed and returns clean state.
-
-    Returns:
-        dict: Cooldown state for each group with 'active' and 'remaining' fields
-    """
-    current_time = time.time()
-    state = {}
-    for group in cooldown_state:
-        if cooldown_state[group]['active']:
-            remaining = max(0, cooldown_state[group]['expires_at'] - current_time)
-            if remaining <= 0:
-                cooldown_state[group]['active'] = False
-                cooldown_state[group]['expires_at'] = 0
-            state[group] = {
-                'active': remaining > 0,
-                'remaining': int(remaining) if remaining > 0 else 0
-            }
-        else:
-            state[group] = {'active': False, 'remaining': 0}
-    return state
+def get_default_cooldowns():
+    """Get the default cooldown tracker."""
+    return _DEFAULT_TRACKER
@@ -1,23 +1,51 @@
 """
-Game controller for sending keypresses to The Bibites using xdotool.
+Game controller for sending keypresses to The Bibites.
 
-Handles window focus and keypress automation for game control.
+Handles window discovery, focus and keypress automation for game control.
+The window handle is cached in a GameWindow registry that revalidates it
+with a cheap X property query (on keypress failure and at a low background
+rate) and rediscovers the window when the game restarts.
+
+Keypresses go through a pluggable backend:
+
+- XTestBackend: persistent X connection via python-xlib (optional
+  dependency); refocuses only when the game window lost focus
+- XdotoolBackend: spawns xdotool per keypress (original path, fallback)
+- RecordingBackend: records keys with timestamps (dry-run, tests, benchmarks)
 """
 
 import subprocess
+import threading
 import time
+from .config import KEYPRESS_BACKEND, WINDOW_CHECK_INTERVAL
+
+# Title searched for during window discovery
+WINDOW_NAME = 'The Bibites'
 
-# Global window ID (discovered at runtime)
-_GAME_WINDOW_ID = None
+# Active keypress backend (created on first keypress if not set)
+_BACKEND = None
 
+# xdotool-style modifier names -> X keysym names
+_MODIFIER_KEYSYMS = {
+    'ctrl': 'Control_L',
+    'control': 'Control_L',
+    'shift': 'Shift_L',
+    'alt': 'Alt_L',
+    'super': 'Super_L',
+    'meta': 'Meta_L',
+}
 
-def discover_game_window():
+
+def discover_game_window(name=WINDOW_NAME):
     """
-    Auto-discover The Bibites window ID.
+    Auto-discover The Bibites window ID using xdotool.
 
     Searches for window with name "The Bibites".
     Fails fast if not found or multiple windows exist.
 
+    Args:
+        name: Window title to search for
+
     Returns:
         int: Window ID
 
@@ -26,7 +54,7 @@ def discover_game_window():
     """
     try:
         result = subprocess.run(
-            ['xdotool', 'search', '--name', 'The Bibites'],
+            ['xdotool', 'search', '--name', name],
             capture_output=True,
             text=True,
             check=True
@@ -35,19 +63,7 @@ def discover_game_window():
         window_ids = result.stdout.strip().split('\n')
         window_ids = [wid for wid in window_ids if wid]  # Filter empty strings
 
-        if len(window_ids) == 0:
-            raise RuntimeError(
-                "The Bibites window not found. "
-                "Please ensure the game is running before starting the server."
-            )
-
-        if len(window_ids) > 1:
-            raise RuntimeError(
-                f"Multiple Bibites windows found ({len(window_ids)}). "
-                f"Please close duplicate windows. IDs: {', '.join(window_ids)}"
-            )
-
-        window_id = int(window_ids[0])
+        window_id = int(_check_window_ids(window_ids))
 
         # Verify we can get the window name
         verify_result = subprocess.run(
@@ -68,55 +84,611 @@ def discover_game_window():
         raise RuntimeError("xdotool not found. Please install xdotool.")
 
 
+def _check_window_ids(window_ids):
+    """Validate discovery results: exactly one window (raises RuntimeError)."""
+    if len(window_ids) == 0:
+        raise RuntimeError(
+            "The Bibites window not found. "
+            "Please ensure the game is running before starting the server."
+        )
+    if len(window_ids) > 1:
+        raise RuntimeError(
+            f"Multiple Bibites windows found ({len(window_ids)}). "
+            f"Please close duplicate windows. IDs: {', '.join(str(wid) for wid in window_ids)}"
+        )
+    return window_ids[0]
+
+
+class GameWindow:
+    """
+    Cached game window handle with liveness revalidation.
+
+    The handle is trusted until a keypress fails or the background monitor
+    finds it gone; revalidation is a WM_NAME property query on a persistent
+    X connection (python-xlib), falling back to `xdotool getwindowname`.
+    When the window is gone it is rediscovered by title. Listeners
+    registered with on_change() are told when the game disappears or
+    comes back.
+    """
+
+    def __init__(self, name=WINDOW_NAME, window_id=None):
+        """
+        Initialize registry (no discovery until discover()/revalidate()).
+
+        Args:
+            name: Window title to search for
+            window_id: Known window ID (None = undiscovered)
+        """
+        self.name = name
+        self.window_id = window_id
+        self.available = window_id is not None
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._display = None      # Xlib display (None = not opened, False = unavailable)
+        self._monitor_call = None
+
+    # ------------------------------------------------------------
+    # X access
+    # ------------------------------------------------------------
+
+    def _x(self):
+        """Open (once) an Xlib connection for property queries, or return None."""
+        if self._display is None:
+            try:
+                from Xlib import display as xdisplay
+                self._display = xdisplay.Display()
+            except Exception:
+                self._display = False
+        return self._display or None
+
+    def _window_name(self, window_id):
+        """Get a window's title, or None if the window no longer exists."""
+        display = self._x()
+        if display:
+            try:
+                window = display.create_resource_object('window', window_id)
+                name = window.get_wm_name()
+            except Exception:
+                return None
+            if isinstance(name, bytes):
+                name = name.decode('utf-8', 'replace')
+            return name
+
+        try:
+            result = subprocess.run(
+                ['xdotool', 'getwindowname', str(window_id)],
+                capture_output=True, text=True, check=True, timeout=1.0
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+            return None
+        return result.stdout.strip()
+
+    def _search(self):
+        """Find window IDs whose title contains self.name."""
+        display = self._x()
+        if not display:
+            return [discover_game_window(self.name)]
+
+        matches = []
+        pending = [display.screen().root]
+        while pending:
+            window = pending.pop()
+            try:
+                name = window.get_wm_name()
+                children = window.query_tree().children
+            except Exception:
+                continue  # Window vanished mid-walk
+            if isinstance(name, bytes):
+                name = name.decode('utf-8', 'replace')
+            if name and self.name in name:
+                matches.append(window.id)
+            pending.extend(children)
+        return matches
+
+    # ------------------------------------------------------------
+    # Registry
+    # ------------------------------------------------------------
+
+    def set(self, window_id):
+        """Set the window ID explicitly (marks the game available)."""
+        with self._lock:
+            self.window_id = window_id
+            self._set_available(window_id is not None)
+
+    def get(self):
+        """
+        Get the cached window ID.
+
+        Raises:
+            RuntimeError: If no window is known or the game is gone
+        """
+        if self.window_id is None:
+            raise RuntimeError("Game window ID not set. Call discover_game_window() first.")
+        if not self.available:
+            raise RuntimeError(f"Game window '{self.name}' not available (waiting for game)")
+        return self.window_id
+
+    def discover(self):
+        """
+        Discover the window by title and cache it.
+
+        Returns:
+            int: Window ID
+
+        Raises:
+            RuntimeError: If window not found or multiple windows found
+        """
+        with self._lock:
+            window_id = _check_window_ids(self._search())
+            if window_id != self.window_id and self._x():
+                print(f"✓ Discovered game window: '{self._window_name(window_id)}' (ID: {window_id})")
+            self.window_id = window_id
+            self._set_available(True)
+            return window_id
+
+    def is_alive(self):
+        """Check the cached window still exists and carries the game title."""
+        if self.window_id is None:
+            return False
+        name = self._window_name(self.window_id)
+        return bool(name) and self.name in name
+
+    def revalidate(self):
+        """
+        Confirm the cached handle, rediscovering the window if it is gone.
+
+        Returns:
+            bool: True if a usable window is known afterwards
+        """
+        with self._lock:
+            if self.is_alive():
+                self._set_available(True)
+                return True
+            try:
+                self.discover()
+                return True
+            except RuntimeError:
+                self._set_available(False)
+                return False
+
+    def on_change(self, listener):
+        """Register listener(available, window_id), called when availability changes."""
+        self._listeners.append(listener)
+
+    def _set_available(self, available):
+        if available == self.available:
+            return
+        self.available = available
+        if available:
+            print(f"✓ Game window available (ID: {self.window_id})")
+        else:
+            print(f"⚠ Game window '{self.name}' lost - pausing game actions until it returns")
+        for listener in self._listeners:
+            try:
+                listener(available, self.window_id)
+            except Exception as e:
+                print(f"✗ Game window listener failed: {e}")
+
+    # ------------------------------------------------------------
+    # Background monitor
+    # ------------------------------------------------------------
+
+    def start_monitor(self, scheduler, interval=WINDOW_CHECK_INTERVAL):
+        """
+        Revalidate the window every interval seconds on a DeadlineScheduler.
+
+        Args:
+            scheduler: DeadlineScheduler to run checks on
+            interval: Seconds between checks
+        """
+        self._monitor_call = scheduler.call_later(interval, self._on_monitor, scheduler, interval)
+
+    def stop_monitor(self):
+        """Stop background revalidation."""
+        if self._monitor_call:
+            self._monitor_call.cancel()
+            self._monitor_call = None
+
+    def _on_monitor(self, scheduler, interval):
+        try:
+            self.revalidate()
+        finally:
+            self._monitor_call = scheduler.call_later(interval, self._on_monitor, scheduler, interval)
+
+
+# Default registry (single game window per server)
+_GAME_WINDOW = GameWindow()
+
+
+def get_game_window():
+    """Get the default game window registry."""
+    return _GAME_WINDOW
+
+
 def set_game_window_id(window_id):
     """Set the game window ID (called at server startup)."""
-    global _GAME_WINDOW_ID
-    _GAME_WINDOW_ID = window_id
+    _GAME_WINDOW.set(window_id)
 
 
 def get_game_window_id():
     """Get the current game window ID."""
-    if _GAME_WINDOW_ID is None:
-        raise RuntimeError("Game window ID not set. Call discover_game_window() first.")
-    return _GAME_WINDOW_ID
+    return _GAME_WINDOW.get()
+
+
+class KeypressBackend:
+    """
+    Base class for keypress backends.
+
+    Subclasses implement send(); errors are raised (RuntimeError,
+    subprocess errors) and turned into result dicts by send_keypress().
+    """
+
+    name = 'base'
+
+    def send(self, window_id, key, timeout=None):
+        """
+        Send one key combination to a window.
+
+        Args:
+            window_id: X window ID of the game
+            key: xdotool-style key (e.g., 'Delete', 'ctrl+g', 'KP_Add')
+            timeout: Seconds the backend may block (None = no limit)
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release backend resources (connections, files)."""
+
+    def reset(self):
+        """
+        Replace connections a timed-out send may have left stuck.
+
+        The stuck send keeps the old connection; later sends use new ones.
+        """
+
+
+class XdotoolBackend(KeypressBackend):
+    """Original backend: `xdotool windowfocus` + `xdotool key` per keypress."""
+
+    name = 'xdotool'
+
+    def __init__(self, focus_delay=0.1):
+        """
+        Args:
+            focus_delay: Seconds to wait between focusing and sending the key
+        """
+        self.focus_delay = focus_delay
+
+    def send(self, window_id, key, timeout=None):
+        # Focus window first
+        subprocess.run(['xdotool', 'windowfocus', str(window_id)], check=True, timeout=timeout)
+        time.sleep(self.focus_delay)  # Brief delay for focus
+
+        # Send keypress
+        subprocess.run(['xdotool', 'key', '--window', str(window_id), key], check=True, timeout=timeout)
 
 
-def send_keypress(key, log_func=None):
+class XTestBackend(KeypressBackend):
     """
-    Send keypress to game window using xdotool.
+    Persistent X connection sending synthetic key events via XTEST.
+
+    No process spawns and no fixed focus delay: the current input focus is
+    queried on the open connection and the window is only refocused when
+    something else has focus. Requires python-xlib (pip install python-xlib).
+    """
+
+    name = 'xtest'
+
+    def __init__(self, display=None):
+        """
+        Open the X connection.
+
+        Args:
+            display: X display name (None = $DISPLAY)
+
+        Raises:
+            RuntimeError: If python-xlib is missing, the display cannot be
+                opened or the XTEST extension is unavailable
+        """
+        try:
+            from Xlib import X, XK, display as xdisplay, error as xerror
+            from Xlib.ext import xtest
+        except ImportError:
+            raise RuntimeError("python-xlib not installed. Install with: pip install python-xlib")
+
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._xerror = xerror
+        self._xdisplay = xdisplay
+        self._display_name = display
+        self._display = self._connect()
+        self._keycodes = {}          # key string -> [keycode, ...]
+        self._lock = threading.Lock()  # Xlib displays are not thread-safe
+        self.refocus_count = 0
+
+    def _connect(self):
+        """Open an X connection with the XTEST extension."""
+        try:
+            display = self._xdisplay.Display(self._display_name)
+        except Exception as e:
+            raise RuntimeError(f"Cannot open X display: {e}")
+        if not display.has_extension('XTEST'):
+            display.close()
+            raise RuntimeError("X server does not support the XTEST extension")
+        return display
+
+    def _resolve(self, display, key):
+        """Translate an xdotool-style key combination to keycodes (cached)."""
+        keycodes = self._keycodes.get(key)
+        if keycodes is not None:
+            return keycodes
+
+        keycodes = []
+        for part in key.split('+'):
+            name = _MODIFIER_KEYSYMS.get(part.lower(), part)
+            keysym = self._XK.string_to_keysym(name)
+            if keysym == 0 and len(name) == 1:
+                keysym = ord(name)
+            keycode = display.keysym_to_keycode(keysym) if keysym else 0
+            if not keycode:
+                raise RuntimeError(f"Unknown key '{part}' in '{key}'")
+            keycodes.append(keycode)
+
+        self._keycodes[key] = keycodes
+        return keycodes
+
+    def _ensure_focus(self, display, window_id):
+        """Focus the game window unless it already has focus."""
+        focus = display.get_input_focus().focus
+        focus_id = getattr(focus, 'id', focus)
+        if focus_id == window_id:
+            return
+        window = display.create_resource_object('window', window_id)
+        caught = self._xerror.CatchError()
+        window.set_input_focus(self._X.RevertToParent, self._X.CurrentTime, onerror=caught)
+        display.sync()
+        if caught.get_error():
+            # Never type into whatever else has focus
+            raise RuntimeError(f"Cannot focus window {window_id}: {caught.get_error()}")
+        self.refocus_count += 1
+
+    def send(self, window_id, key, timeout=None):
+        X = self._X
+        # Bind this send to the current connection: after reset() a stuck
+        # send keeps its own display and lock
+        display, lock = self._display, self._lock
+        if display is None:
+            raise RuntimeError("X connection lost (reconnect failed)")
+        if not lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise RuntimeError(f"X connection busy for {timeout}s")
+        try:
+            keycodes = self._resolve(display, key)
+            self._ensure_focus(display, window_id)
+            for keycode in keycodes:
+                self._xtest.fake_input(display, X.KeyPress, keycode)
+            for keycode in reversed(keycodes):
+                self._xtest.fake_input(display, X.KeyRelease, keycode)
+            display.sync()
+        except self._xerror.XError as e:
+            raise RuntimeError(f"XTest keypress failed: {e}")
+        finally:
+            lock.release()
+
+    def close(self):
+        with self._lock:
+            if self._display is not None:
+                self._display.close()
+
+    def reset(self):
+        # The old connection stays with the stuck send; never wait on its lock
+        try:
+            display = self._connect()
+        except RuntimeError as e:
+            display = None
+            print(f"⚠ XTest reconnect failed: {e}")
+        self._display, self._lock = display, threading.Lock()
+
+
+class RecordingBackend(KeypressBackend):
+    """
+    Records keypresses instead of (or as well as) sending them.
+
+    Without a delegate this is a dry-run backend; with one it records and
+    forwards, which is useful for auditing a live session.
+    """
+
+    name = 'recording'
+
+    def __init__(self, delegate=None):
+        """
+        Args:
+            delegate: Optional backend that actually sends the keys
+        """
+        self.delegate = delegate
+        self.records = []  # (time.time(), window_id, key)
+        self._lock = threading.Lock()
+
+    def send(self, window_id, key, timeout=None):
+        with self._lock:
+            self.records.append((time.time(), window_id, key))
+        if self.delegate:
+            self.delegate.send(window_id, key, timeout=timeout)
+
+    def close(self):
+        if self.delegate:
+            self.delegate.close()
+
+    def reset(self):
+        if self.delegate:
+            self.delegate.reset()
+
+
+class FallbackBackend(KeypressBackend):
+    """Try a primary backend, falling back to a secondary one on error."""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+
+    def send(self, window_id, key, timeout=None):
+        try:
+            self.primary.send(window_id, key, timeout=timeout)
+        except (RuntimeError, OSError) as e:
+            print(f"⚠ {self.primary.name} keypress failed ({e}), using {self.fallback.name}")
+            self.fallback.send(window_id, key, timeout=timeout)
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+    def reset(self):
+        self.primary.reset()
+        self.fallback.reset()
+
+
+def create_keypress_backend(name='auto'):
+    """
+    Create a keypress backend by name.
 
     Args:
-        key: Key to send (e.g., 'Delete', 'Insert', 'ctrl+g')
-        log_func: Optional logging function to call with action details
+        name: 'auto' (XTest with xdotool fallback, or plain xdotool if
+            python-xlib/XTEST is unavailable), 'xtest', 'xdotool' or
+            'dry-run'
 
     Returns:
-        dict: Result with 'success' boolean and optional 'error' message
+        KeypressBackend: New backend
+
+    Raises:
+        RuntimeError: For unknown names, or 'xtest' when unavailable
     """
-    try:
-        window_id = get_game_window_id()
+    if name == 'xdotool':
+        return XdotoolBackend()
+    if name == 'xtest':
+        return XTestBackend()
+    if name == 'dry-run':
+        return RecordingBackend()
+    if name == 'auto':
+        try:
+            return FallbackBackend(XTestBackend(), XdotoolBackend())
+        except RuntimeError as e:
+            print(f"⚠ XTest keypress backend unavailable ({e}), using xdotool")
+            return XdotoolBackend()
+    raise RuntimeError(f"Unknown keypress backend '{name}' (expected auto, xtest, xdotool or dry-run)")
 
-        # Focus window first
-        subprocess.run(['xdotool', 'windowfocus', str(window_id)], check=True)
-        time.sleep(0.1)  # Brief delay for focus
 
-        # Send keypress
-        subprocess.run(['xdotool', 'key', '--window', str(window_id), key], check=True)
+def set_keypress_backend(backend):
+    """Set the active keypress backend (called at server startup)."""
+    global _BACKEND
+    if _BACKEND is not None and _BACKEND is not backend:
+        _BACKEND.close()
+    _BACKEND = backend
 
-        if log_func:
-            log_func(f"Keypress: {key}", f"Sent to window {window_id}")
-        return {'success': True, 'key': key}
-    except subprocess.CalledProcessError as e:
-        error_msg = f"xdotool failed: {e}"
-        if log_func:
-            log_func(f"Keypress FAILED: {key}", error_msg)
-        return {'success': False, 'error': error_msg}
-    except FileNotFoundError:
-        error_msg = "xdotool not found"
-        if log_func:
-            log_func(f"Keypress FAILED: {key}", error_msg)
-        return {'success': False, 'error': error_msg}
-    except RuntimeError as e:
-        error_msg = str(e)
-        if log_func:
-            log_func(f"Keypress FAILED: {key}", error_msg)
-        return {'success': False, 'error': error_msg}
+
+def get_keypress_backend():
+    """Get the active keypress backend, creating the default one if unset."""
+    global _BACKEND
+    if _BACKEND is None:
+        _BACKEND = create_keypress_backend(KEYPRESS_BACKEND)
+    return _BACKEND
+
+
+class GameController:
+    """
+    Sends keypresses to one game window.
+
+    Each arena owns a controller bound to its GameWindow; the backend is
+    shared by default (one X connection serves every window).
+    """
+
+    def __init__(self, window, backend=None):
+        """
+        Args:
+            window: GameWindow registry for the target game
+            backend: KeypressBackend (None = the active module backend)
+        """
+        self.window = window
+        self.backend = backend
+
+    def _send_with_revalidation(self, key, timeout):
+        """
+        Send a key to the cached window; on failure revalidate the handle and
+        retry once if the game came back under a new window ID.
+
+        Returns:
+            int: Window ID the key was sent to
+        """
+        window = self.window
+        window_id = window.get()
+        backend = self.backend or get_keypress_backend()
+        try:
+            backend.send(window_id, key, timeout=timeout)
+            return window_id
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, RuntimeError):
+            if not window.revalidate() or window.window_id == window_id:
+                raise
+        backend.send(window.window_id, key, timeout=timeout)
+        return window.window_id
+
+    def reset_backend(self):
+        """Replace backend connections after a keypress timed out."""
+        (self.backend or get_keypress_backend()).reset()
+
+    def send_keypress(self, key, log_func=None, timeout=None):
+        """
+        Send keypress to game window using the keypress backend.
+
+        Args:
+            key: Key to send (e.g., 'Delete', 'Insert', 'ctrl+g')
+            log_func: Optional logging function to call with action details
+            timeout: Seconds each backend call may block (None = no limit)
+
+        Returns:
+            dict: Result with 'success' boolean and optional 'error' message
+        """
+        try:
+            window_id = self._send_with_revalidation(key, timeout)
+
+            if log_func:
+                log_func(f"Keypress: {key}", f"Sent to window {window_id}")
+            return {'success': True, 'key': key}
+        except subprocess.CalledProcessError as e:
+            error_msg = f"xdotool failed: {e}"
+            if log_func:
+                log_func(f"Keypress FAILED: {key}", error_msg)
+            return {'success': False, 'error': error_msg}
+        except subprocess.TimeoutExpired:
+            error_msg = f"xdotool timed out after {timeout}s"
+            if log_func:
+                log_func(f"Keypress FAILED: {key}", error_msg)
+            return {'success': False, 'error': error_msg}
+        except FileNotFoundError:
+            error_msg = "xdotool not found"
+            if log_func:
+                log_func(f"Keypress FAILED: {key}", error_msg)
+            return {'success': False, 'error': error_msg}
+        except RuntimeError as e:
+            error_msg = str(e)
+            if log_func:
+                log_func(f"Keypress FAILED: {key}", error_msg)
+            return {'success': False, 'error': error_msg}
+
+
+# Default controller (default game window, active backend)
+_DEFAULT_CONTROLLER = GameController(_GAME_WINDOW)
+
+
+def get_default_game_controller():
+    """Get the controller for the default game window."""
+    return _DEFAULT_CONTROLLER
+
+
+def send_keypress(key, log_func=None, timeout=None):
+    """
+    Send keypress to the default game window (see GameController.send_keypress).
+
+    Returns:
+        dict: Result with 'success' boolean and optional 'error' message
+    """
+    return _DEFAULT_CONTROLLER.send_keypress(key, log_func, timeout)
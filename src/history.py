@@ -0,0 +1,342 @@
+"""
+Round history store for Selection Protocol.
+
+Append-only record of every vote, timer event and round outcome in a
+local SQLite database (WAL mode). Recording only puts a tuple on a queue;
+a background writer thread drains the queue and inserts whole batches
+with executemany in one transaction, so persistence never adds latency
+to vote handling.
+
+Rows carry a session ID (one per server start) because round IDs restart
+at 1 with each process. A round restored after a restart (recovery.py)
+keeps the session it started in, so its votes, events and outcome stay
+under one (session, arena, round_id) key.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from .config import HISTORY_DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    session INTEGER NOT NULL,
+    arena TEXT NOT NULL,
+    round_id INTEGER NOT NULL,
+    started_at REAL,
+    ended_at REAL NOT NULL,
+    winner TEXT NOT NULL,
+    source TEXT NOT NULL,
+    claimant TEXT,
+    claimant_id TEXT,
+    k_votes INTEGER NOT NULL,
+    l_votes INTEGER NOT NULL,
+    x_votes INTEGER NOT NULL,
+    timer_limit INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_rounds_ended ON rounds (ended_at);
+CREATE INDEX IF NOT EXISTS idx_rounds_claimant ON rounds (claimant COLLATE NOCASE, ended_at);
+CREATE INDEX IF NOT EXISTS idx_rounds_claimant_id ON rounds (claimant_id, ended_at);
+
+CREATE TABLE IF NOT EXISTS votes (
+    id INTEGER PRIMARY KEY,
+    session INTEGER NOT NULL,
+    arena TEXT NOT NULL,
+    round_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    voter_id TEXT NOT NULL,
+    username TEXT NOT NULL,
+    vote TEXT NOT NULL,
+    previous_vote TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_votes_round ON votes (session, arena, round_id);
+CREATE INDEX IF NOT EXISTS idx_votes_voter ON votes (voter_id, ts);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    session INTEGER NOT NULL,
+    arena TEXT NOT NULL,
+    round_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_round ON events (session, arena, round_id);
+"""
+
+_INSERTS = {
+    'rounds': (
+        "INSERT INTO rounds (session, arena, round_id, started_at, ended_at, winner, source, "
+        "claimant, claimant_id, k_votes, l_votes, x_votes, timer_limit) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+    'votes': (
+        "INSERT INTO votes (session, arena, round_id, ts, voter_id, username, vote, previous_vote) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+    ),
+    'events': (
+        "INSERT INTO events (session, arena, round_id, ts, kind, detail) "
+        "VALUES (?, ?, ?, ?, ?, ?)"
+    ),
+}
+
+_ROUND_COLUMNS = (
+    'session, arena, round_id, started_at, ended_at, winner, source, '
+    'claimant, claimant_id, k_votes, l_votes, x_votes, timer_limit'
+)
+
+
+class HistoryStore:
+    """
+    SQLite-backed append-only history with a batching writer thread.
+
+    record_* methods are safe to call from any thread and never block on
+    disk. Queries open their own read connection (WAL readers do not wait
+    for the writer).
+    """
+
+    def __init__(self, path=HISTORY_DB_PATH, batch_size=1000):
+        """
+        Open (or create) the history database.
+
+        Args:
+            path: SQLite database file
+            batch_size: Maximum rows written per transaction
+        """
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.session = int(time.time() * 1000)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._pending = 0                  # Rows queued but not yet committed
+        self._pending_lock = threading.Lock()
+        self._drained = threading.Condition(self._pending_lock)
+        self.rows_written = 0
+        self.batches_written = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ------------------------------------------------------------
+    # Recording (any thread, non-blocking)
+    # ------------------------------------------------------------
+
+    def for_arena(self, arena):
+        """
+        Get a recorder bound to one arena.
+
+        Args:
+            arena: Arena name
+
+        Returns:
+            ArenaHistory: Recorder for VoteManager
+        """
+        return ArenaHistory(self, arena)
+
+    def _enqueue(self, table, row):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+                    self._thread.start()
+        with self._pending_lock:
+            self._pending += 1
+        self._queue.put((table, row))
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued row is committed.
+
+        Returns:
+            bool: True if drained, False on timeout
+        """
+        with self._drained:
+            return self._drained.wait_for(lambda: self._pending == 0, timeout)
+
+    # ------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------
+
+    def _run(self):
+        """Writer: block for one row, drain what else is queued, insert as one batch."""
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_table = {}
+            for table, row in batch:
+                by_table.setdefault(table, []).append(row)
+
+            try:
+                with conn:
+                    for table, rows in by_table.items():
+                        conn.executemany(_INSERTS[table], rows)
+                self.rows_written += len(batch)
+                self.batches_written += 1
+            except sqlite3.Error as e:
+                print(f"✗ History write failed ({len(batch)} rows dropped): {e}")
+
+            with self._drained:
+                self._pending -= len(batch)
+                if self._pending == 0:
+                    self._drained.notify_all()
+
+    # ------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------
+
+    def _query(self, sql, params):
+        conn = self._connect()
+        try:
+            conn.row_factory = sqlite3.Row
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def rounds_since(self, since, arena=None):
+        """
+        Get rounds that ended at or after a time (uses idx_rounds_ended).
+
+        Args:
+            since: Unix timestamp (e.g. time.time() - 3600 for the last hour)
+            arena: Restrict to one arena (None = all)
+
+        Returns:
+            list: Round dicts, oldest first
+        """
+        sql = f"SELECT {_ROUND_COLUMNS} FROM rounds WHERE ended_at >= ?"
+        params = [since]
+        if arena is not None:
+            sql += " AND arena = ?"
+            params.append(arena)
+        return self._query(sql + " ORDER BY ended_at", params)
+
+    def rounds_won_by(self, user, limit=100):
+        """
+        Get L rounds won with user as first-L claimant, newest first.
+
+        Args:
+            user: Twitch username (case-insensitive) or numeric user ID
+            limit: Maximum rounds returned
+
+        Returns:
+            list: Round dicts
+        """
+        column = "claimant_id = ?" if str(user).isdigit() else "claimant = ? COLLATE NOCASE"
+        sql = (
+            f"SELECT {_ROUND_COLUMNS} FROM rounds WHERE {column} AND winner = 'l' "
+            "ORDER BY ended_at DESC LIMIT ?"
+        )
+        return self._query(sql, [str(user), limit])
+
+    def round_votes(self, session, arena, round_id):
+        """Get all votes cast in one round, in order."""
+        return self._query(
+            "SELECT ts, voter_id, username, vote, previous_vote FROM votes "
+            "WHERE session = ? AND arena = ? AND round_id = ? ORDER BY id",
+            [session, arena, round_id],
+        )
+
+    def get_stats(self):
+        """
+        Get writer counters.
+
+        Returns:
+            dict: pending, rows_written and batches_written
+        """
+        return {
+            'pending': self._pending,
+            'rows_written': self.rows_written,
+            'batches_written': self.batches_written,
+        }
+
+
+class ArenaHistory:
+    """History recorder bound to one arena (what VoteManager holds)."""
+
+    __slots__ = ('store', 'arena', '_resumed')
+
+    def __init__(self, store, arena):
+        self.store = store
+        self.arena = arena
+        self._resumed = None               # (round_id, session) of a restored round
+
+    def session_for(self, round_id):
+        """
+        Get the session a round's rows are recorded under.
+
+        Args:
+            round_id: Round number
+
+        Returns:
+            int: The restored round's original session, else this process's
+        """
+        resumed = self._resumed
+        if resumed is not None and resumed[0] == round_id:
+            return resumed[1]
+        return self.store.session
+
+    def resume_round(self, round_id, session):
+        """
+        Keep recording a round restored after a restart under its original session.
+
+        Args:
+            round_id: Restored round number
+            session: Session the round started in (from session_for())
+        """
+        self._resumed = (round_id, session)
+
+    def record_vote(self, round_id, voter_id, username, vote, previous_vote):
+        """Record a cast or changed vote."""
+        self.store._enqueue('votes', (
+            self.session_for(round_id), self.arena, round_id, time.time(),
+            voter_id, username, vote, previous_vote,
+        ))
+
+    def record_event(self, round_id, kind, detail=None):
+        """Record a round event (timer start/adjust, claim transfer, hold)."""
+        self.store._enqueue('events', (
+            self.session_for(round_id), self.arena, round_id, time.time(), kind, detail,
+        ))
+
+    def record_round(self, round_id, started_at, winner, source, claimant, claimant_id,
+                     counts, timer_limit):
+        """
+        Record a round outcome.
+
+        Args:
+            round_id: Round number within its session
+            started_at: Unix time the round timer started (None if never)
+            winner: Winning action code
+            source: 'vote' (timer expiry) or 'admin' (forced)
+            claimant: First-L claimant display name (or None)
+            claimant_id: First-L claimant user ID (or None)
+            counts: Vote counts by action code
+            timer_limit: Final timer target in seconds
+        """
+        self.store._enqueue('rounds', (
+            self.session_for(round_id), self.arena, round_id, started_at, time.time(),
+            winner, source, claimant, claimant_id,
+            counts.get('k', 0), counts.get('l', 0), counts.get('x', 0), timer_limit,
+        ))
@@ -0,0 +1,333 @@
+"""
+Lineage-claim leaderboard for Selection Protocol.
+
+Per-user aggregates are updated incrementally as each round resolves:
+lineage claims (L rounds won while the user held the first-L claim) and
+K/L/X participation (each voter's final vote in the round). Users are
+ranked by lineage claims; rank lookups use a Fenwick tree over claim
+counts (O(log n)), top-N walks per-score buckets from the highest score
+down (bucket scores are kept sorted as buckets appear and empty).
+
+All reads and writes run on the leaderboard's own command loop. Chat
+responses for !stats and !lineage are cached until the next round is
+applied, so repeated commands cost a dictionary lookup. Aggregates are
+persisted to SQLite (changed rows upserted after each round) and loaded
+on startup.
+"""
+
+import os
+import sqlite3
+from bisect import bisect_left, insort
+from .command_loop import CommandLoop
+from .config import LEADERBOARD_DB_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    claims INTEGER NOT NULL DEFAULT 0,
+    rounds INTEGER NOT NULL DEFAULT 0,
+    k_votes INTEGER NOT NULL DEFAULT 0,
+    l_votes INTEGER NOT NULL DEFAULT 0,
+    x_votes INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS totals (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class UserStats:
+    """Aggregates for one viewer."""
+
+    __slots__ = ('user_id', 'username', 'claims', 'rounds', 'k_votes', 'l_votes', 'x_votes', 'seq')
+
+    def __init__(self, user_id, username, claims=0, rounds=0, k_votes=0, l_votes=0, x_votes=0, seq=0):
+        self.user_id = user_id
+        self.username = username
+        self.claims = claims
+        self.rounds = rounds
+        self.k_votes = k_votes
+        self.l_votes = l_votes
+        self.x_votes = x_votes
+        self.seq = seq          # When the user reached their claim count (tie-break)
+
+    def row(self):
+        return (self.user_id, self.username, self.claims, self.rounds,
+                self.k_votes, self.l_votes, self.x_votes, self.seq)
+
+
+class ScoreIndex:
+    """
+    Fenwick tree of user counts per score (scores >= 0).
+
+    count_above(score) answers "how many users score higher" in
+    O(log max_score); capacity doubles as scores grow.
+    """
+
+    def __init__(self, capacity=64):
+        self._size = capacity
+        self._tree = [0] * (capacity + 1)
+        self.total = 0
+
+    def _grow(self, score):
+        size = self._size
+        while score >= size:
+            size *= 2
+        counts = [self._prefix(i) - self._prefix(i - 1) for i in range(self._size)]
+        self._size = size
+        self._tree = [0] * (size + 1)
+        self.total = 0
+        for score_value, count in enumerate(counts):
+            if count:
+                self.add(score_value, count)
+
+    def add(self, score, delta=1):
+        """Add delta users at score."""
+        if score >= self._size:
+            self._grow(score)
+        self.total += delta
+        i = score + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, score):
+        """Users with score <= score."""
+        i = min(score, self._size - 1) + 1
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def count_above(self, score):
+        """Users with a strictly higher score."""
+        return self.total - self._prefix(score)
+
+
+class Leaderboard:
+    """
+    Incremental per-user aggregates with cached chat responses.
+
+    Call public methods through self.commands (e.g. commands.call(
+    leaderboard.render_stats)); submit_round queues an update and returns.
+    """
+
+    def __init__(self, path=LEADERBOARD_DB_PATH, top_n=3):
+        """
+        Load aggregates from disk.
+
+        Args:
+            path: SQLite database file (None = in-memory only)
+            top_n: Leaders shown in the !stats response
+        """
+        self.top_n = top_n
+        self.commands = CommandLoop('leaderboard')
+
+        self.users = {}          # user_id -> UserStats
+        self._buckets = {}       # claims -> {user_id: None} (insertion order = tie-break)
+        self._scores = []        # Keys of _buckets, ascending
+        self._index = ScoreIndex()
+        self.rounds = 0
+        self.lineage_rounds = 0
+        self._seq = 0
+        self._cache = {}         # Rendered responses, cleared when a round is applied
+        self._conn = None
+
+        if path:
+            directory = os.path.dirname(str(path))
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._load()
+
+    def _load(self):
+        """Rebuild in-memory indexes from the database."""
+        rows = self._conn.execute(
+            "SELECT user_id, username, claims, rounds, k_votes, l_votes, x_votes, seq "
+            "FROM users ORDER BY claims, seq"
+        )
+        for row in rows:
+            stats = UserStats(*row)
+            self.users[stats.user_id] = stats
+            self._bucket_add(stats.claims, stats.user_id)
+            self._index.add(stats.claims)
+            self._seq = max(self._seq, stats.seq)
+
+        totals = dict(self._conn.execute("SELECT name, value FROM totals"))
+        self.rounds = totals.get('rounds', 0)
+        self.lineage_rounds = totals.get('lineage_rounds', 0)
+
+    # ------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------
+
+    def submit_round(self, winner, claimant_id, claimant, voter_ids, usernames, votes):
+        """
+        Queue a resolved round (returns immediately).
+
+        Args:
+            winner: Winning action code
+            claimant_id: First-L claimant user ID at resolution (or None)
+            claimant: First-L claimant display name (or None)
+            voter_ids: Voter IDs with a final vote
+            usernames: Display names, parallel to voter_ids
+            votes: Final vote codes, parallel to voter_ids
+        """
+        self.commands.submit(self.apply_round, winner, claimant_id, claimant, voter_ids, usernames, votes)
+
+    def apply_round(self, winner, claimant_id, claimant, voter_ids, usernames, votes):
+        """Apply a resolved round to the aggregates (command loop)."""
+        changed = {}
+        users = self.users
+
+        for user_id, username, vote in zip(voter_ids, usernames, votes):
+            user_id = str(user_id)
+            stats = users.get(user_id)
+            if stats is None:
+                stats = self._add_user(user_id, username)
+            stats.username = username
+            stats.rounds += 1
+            if vote == 'k':
+                stats.k_votes += 1
+            elif vote == 'l':
+                stats.l_votes += 1
+            else:
+                stats.x_votes += 1
+            changed[user_id] = stats
+
+        self.rounds += 1
+        if winner == 'l' and claimant_id is not None:
+            claimant_id = str(claimant_id)
+            stats = users.get(claimant_id) or self._add_user(claimant_id, claimant)
+            self._set_claims(stats, stats.claims + 1)
+            self.lineage_rounds += 1
+            changed[claimant_id] = stats
+
+        self._cache.clear()
+        self._persist(changed.values())
+
+    def _add_user(self, user_id, username):
+        stats = UserStats(user_id, username)
+        self.users[user_id] = stats
+        self._bucket_add(0, user_id)
+        self._index.add(0)
+        return stats
+
+    def _set_claims(self, stats, claims):
+        """Move a user between score buckets and update the rank index."""
+        bucket = self._buckets[stats.claims]
+        del bucket[stats.user_id]
+        if not bucket:
+            del self._buckets[stats.claims]
+            del self._scores[bisect_left(self._scores, stats.claims)]
+        self._index.add(stats.claims, -1)
+
+        self._seq += 1
+        stats.claims = claims
+        stats.seq = self._seq
+        self._bucket_add(claims, stats.user_id)
+        self._index.add(claims)
+
+    def _bucket_add(self, claims, user_id):
+        """Append a user to a score bucket, creating it (and its sorted key) if new."""
+        bucket = self._buckets.get(claims)
+        if bucket is None:
+            bucket = self._buckets[claims] = {}
+            insort(self._scores, claims)
+        bucket[user_id] = None
+
+    def _persist(self, changed):
+        if self._conn is None:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO users "
+                    "(user_id, username, claims, rounds, k_votes, l_votes, x_votes, seq) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [stats.row() for stats in changed]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO totals (name, value) VALUES (?, ?)",
+                    [('rounds', self.rounds), ('lineage_rounds', self.lineage_rounds)]
+                )
+        except sqlite3.Error as e:
+            print(f"✗ Leaderboard write failed: {e}")
+
+    # ------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------
+
+    def rank(self, user_id):
+        """
+        Get a user's rank by lineage claims (ties share a rank).
+
+        Returns:
+            int: 1-based rank, or None for unknown users
+        """
+        stats = self.users.get(str(user_id))
+        if stats is None:
+            return None
+        return self._index.count_above(stats.claims) + 1
+
+    def top(self, n):
+        """
+        Get the n users with the most lineage claims.
+
+        Returns:
+            list: UserStats, highest first (earlier to reach a score first)
+        """
+        result = []
+        for claims in reversed(self._scores):
+            if claims == 0 or len(result) >= n:
+                break
+            for user_id in self._buckets[claims]:
+                result.append(self.users[user_id])
+                if len(result) >= n:
+                    break
+        return result
+
+    # ------------------------------------------------------------
+    # Chat responses (cached per round)
+    # ------------------------------------------------------------
+
+    def render_stats(self):
+        """Get the !stats chat response."""
+        text = self._cache.get('stats')
+        if text is None:
+            leaders = ' · '.join(
+                f"{i}. {stats.username} ({stats.claims})"
+                for i, stats in enumerate(self.top(self.top_n), start=1)
+            ) or "no lineage claims yet"
+            text = (
+                f"Lineage leaders: {leaders} | {self.rounds} rounds, "
+                f"{self.lineage_rounds} lineages, {len(self.users)} voters"
+            )
+            self._cache['stats'] = text
+        return text
+
+    def render_lineage(self, user_id, username):
+        """Get the !lineage chat response for a user."""
+        key = ('lineage', str(user_id), username)  # Text addresses the caller by name
+        text = self._cache.get(key)
+        if text is None:
+            stats = self.users.get(str(user_id))
+            if stats is None:
+                text = f"@{username} No votes recorded yet - vote k / l / x to join the experiment"
+            else:
+                claims = (
+                    f"Lineage claims: {stats.claims} (rank #{self.rank(user_id)} of {len(self.users)})"
+                    if stats.claims else "No lineage claims yet"
+                )
+                text = (
+                    f"@{username} {claims} · Rounds voted: {stats.rounds} "
+                    f"(K {stats.k_votes} / L {stats.l_votes} / X {stats.x_votes})"
+                )
+            self._cache[key] = text
+        return text
@@ -8,9 +8,15 @@ Handles the full flow:
 3. Exchange code for access + refresh tokens
 4. Cache tokens for future use
 5. Refresh token when expired
+
+TokenManager keeps a long-running process (the bot) supplied with a valid
+token: it refreshes in the background ahead of expiry and swaps the new
+token in atomically.
 """
 
+import asyncio
 import json
+import os
 import requests
 import webbrowser
 from pathlib import Path
@@ -19,6 +25,11 @@ from urllib.parse import urlparse, parse_qs
 import threading
 import time
 
+OAUTH_URL = 'https://id.twitch.tv/oauth2'
+
+# Refresh this long before the token expires (seconds)
+REFRESH_MARGIN = 600
+
 
 class OAuthCallbackHandler(BaseHTTPRequestHandler):
     """HTTP handler to receive OAuth callback from Twitch."""
@@ -91,9 +102,12 @@ def get_cached_token(cache_file='.twitch_token'):
 
 
 def save_token_cache(access_token, refresh_token, expires_in, cache_file='.twitch_token'):
-    """Save tokens to cache file."""
-    cache_path = Path(cache_file)
+    """
+    Save tokens to cache file.
 
+    Written to a temporary file (owner-only permissions) and renamed over
+    the cache, so a crash mid-write never leaves a truncated token file.
+    """
     data = {
         'access_token': access_token,
         'refresh_token': refresh_token,
@@ -101,36 +115,50 @@ def save_token_cache(access_token, refresh_token, expires_in, cache_file='.twitc
         'cached_at': time.time()
     }
 
-    with open(cache_path, 'w') as f:
+    tmp = f"{cache_file}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp, cache_file)
 
     print(f"✓ Tokens cached to {cache_file}")
 
 
-def refresh_access_token(client_id, client_secret, refresh_token):
+def request_token_refresh(client_id, client_secret, refresh_token, oauth_url=OAUTH_URL, timeout=10):
     """
-    Refresh an expired access token.
+    Exchange a refresh token for a new access token.
 
     Returns:
-        New access token string, or None if refresh failed
+        dict: Token response (access_token, refresh_token, expires_in)
+
+    Raises:
+        requests.RequestException: If the request fails or is rejected
     """
-    url = "https://id.twitch.tv/oauth2/token"
     params = {
         'client_id': client_id,
         'client_secret': client_secret,
         'grant_type': 'refresh_token',
         'refresh_token': refresh_token
     }
+    response = requests.post(f"{oauth_url}/token", params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
 
-    try:
-        response = requests.post(url, params=params)
-        response.raise_for_status()
-        data = response.json()
 
-        return data['access_token'], data.get('refresh_token', refresh_token)
+def refresh_access_token(client_id, client_secret, refresh_token, oauth_url=OAUTH_URL):
+    """
+    Refresh an expired access token.
+
+    Returns:
+        Tuple of (access_token, refresh_token, expires_in), or
+        (None, None, None) if refresh failed
+    """
+    try:
+        data = request_token_refresh(client_id, client_secret, refresh_token, oauth_url)
+        return data['access_token'], data.get('refresh_token', refresh_token), data.get('expires_in', 0)
     except Exception as e:
         print(f"✗ Token refresh failed: {e}")
-        return None, None
+        return None, None, None
 
 
 def get_user_access_token(client_id, client_secret, scopes=['chat:read', 'chat:edit', 'user:read:chat', 'user:write:chat', 'user:bot', 'channel:bot'], port=3000):
@@ -252,14 +280,14 @@ def get_token(client_id, client_secret, cache_file='.twitch_token'):
         else:
             # Try to refresh
             print(f"Token expired, attempting refresh...")
-            new_access, new_refresh = refresh_access_token(
+            new_access, new_refresh, new_expires_in = refresh_access_token(
                 client_id,
                 client_secret,
                 cached['refresh_token']
             )
 
             if new_access:
-                save_token_cache(new_access, new_refresh, expires_in, cache_file)
+                save_token_cache(new_access, new_refresh, new_expires_in, cache_file)
                 return new_access
 
     # No cached token or refresh failed - do full OAuth flow
@@ -269,6 +297,193 @@ def get_token(client_id, client_secret, cache_file='.twitch_token'):
     return access_token
 
 
+class _Token:
+    """Immutable token snapshot (replaced as a whole, never mutated)."""
+
+    __slots__ = ('access_token', 'refresh_token', 'expires_at')
+
+    def __init__(self, access_token, refresh_token, expires_at):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_at = expires_at
+
+
+class TokenManager:
+    """
+    User access token kept fresh in the background.
+
+    Calling the manager returns the current access token, so it can be
+    passed anywhere a token callable is accepted (e.g. ChatSender). The
+    token is held in one immutable snapshot that a refresh replaces with a
+    single assignment: callers see either the old or the new token, never
+    a mix of the two.
+
+    start() runs the refresh task on the event loop; the HTTP calls
+    themselves run in a worker thread so the loop is never blocked.
+    """
+
+    def __init__(self, client_id, client_secret, cache_file='.twitch_token', oauth_url=OAUTH_URL,
+                 refresh_margin=REFRESH_MARGIN, retry_min=5, retry_max=300):
+        """
+        Load the token from the cache file written by get_token().
+
+        Args:
+            client_id: Application client ID
+            client_secret: Application client secret
+            cache_file: Token cache file (rewritten after each refresh)
+            oauth_url: OAuth base URL with /token and /validate (point at a
+                local stub for tests)
+            refresh_margin: Seconds before expiry to refresh
+            retry_min: First retry delay after a failed refresh (seconds)
+            retry_max: Longest retry delay (seconds)
+
+        Raises:
+            RuntimeError: If the cache file has no usable token
+        """
+        cached = get_cached_token(cache_file)
+        if not cached:
+            raise RuntimeError(f"No cached token in {cache_file} - run get_token() first")
+
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.cache_file = cache_file
+        self.oauth_url = oauth_url.rstrip('/')
+        self.refresh_margin = refresh_margin
+        self.retry_min = retry_min
+        self.retry_max = retry_max
+        self.refreshes = 0
+        self.failures = 0
+
+        expires_at = cached.get('cached_at', 0) + cached.get('expires_in', 0)
+        self._token = _Token(cached['access_token'], cached['refresh_token'], expires_at)
+        self._validated = False
+        self._refreshing = None
+        self._task = None
+
+    def __call__(self):
+        """Get the current access token."""
+        return self._token.access_token
+
+    @property
+    def access_token(self):
+        return self._token.access_token
+
+    def expires_in(self):
+        """Seconds until the current token expires (estimated until validated)."""
+        return self._token.expires_at - time.time()
+
+    # ------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------
+
+    def start(self):
+        """Start the refresh task (must be called from the event loop)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        """Validate once, then sleep until refresh_margin before expiry and refresh."""
+        delay = self.retry_min
+        while True:
+            if not self._validated:
+                await self._validate()
+
+            wait = self.expires_in() - self.refresh_margin
+            if wait > 0:
+                await asyncio.sleep(wait)
+                if self.expires_in() > self.refresh_margin:
+                    continue  # Already refreshed by renew()
+
+            if await self.refresh():
+                delay = self.retry_min
+                continue
+            # Keep the old token (it may still be valid) and retry with backoff
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max)
+
+    async def _validate(self):
+        """Replace the cache-age expiry estimate with Twitch's answer."""
+        try:
+            response = await asyncio.to_thread(
+                requests.get, f"{self.oauth_url}/validate",
+                headers={'Authorization': f"OAuth {self._token.access_token}"}, timeout=10,
+            )
+        except requests.RequestException as e:
+            print(f"⚠ Token validation failed: {e}")
+            return
+        token = self._token
+        if response.status_code == 401:
+            print("⚠ Access token no longer valid - refreshing now")
+            self._token = _Token(token.access_token, token.refresh_token, 0)
+        elif response.ok:
+            expires_in = response.json().get('expires_in', 0)
+            self._token = _Token(token.access_token, token.refresh_token, time.time() + expires_in)
+        self._validated = True
+
+    async def refresh(self):
+        """
+        Refresh the token now.
+
+        Concurrent callers share one refresh request.
+
+        Returns:
+            bool: True if a new token is in place
+        """
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+        refreshing = self._refreshing
+        try:
+            return await asyncio.shield(refreshing)
+        finally:
+            if refreshing.done() and self._refreshing is refreshing:
+                self._refreshing = None
+
+    async def renew(self, access_token):
+        """
+        Handle a 401 for a request made with access_token.
+
+        Refreshes only if access_token is still the current token, so
+        several requests failing with the same stale token cause one
+        refresh.
+
+        Returns:
+            bool: True if a different token is now available to retry with
+        """
+        if access_token != self._token.access_token:
+            return True
+        return await self.refresh()
+
+    async def _refresh(self):
+        old = self._token
+        try:
+            data = await asyncio.to_thread(
+                request_token_refresh, self.client_id, self.client_secret, old.refresh_token, self.oauth_url,
+            )
+            access_token = data['access_token']
+        except Exception as e:
+            self.failures += 1
+            print(f"✗ Token refresh failed: {e}")
+            return False
+
+        expires_in = data.get('expires_in', 0)
+        refresh_token = data.get('refresh_token', old.refresh_token)
+        self._token = _Token(access_token, refresh_token, time.time() + expires_in)  # Atomic swap
+        self._validated = True
+        self.refreshes += 1
+        try:
+            await asyncio.to_thread(save_token_cache, access_token, refresh_token, expires_in, self.cache_file)
+        except OSError as e:
+            print(f"⚠ Could not write token cache: {e}")
+        print(f"✓ Access token refreshed (valid for {int(expires_in) // 60} min)")
+        return True
+
+
 if __name__ == '__main__':
     """Test OAuth flow."""
     import yaml
@@ -0,0 +1,153 @@
+"""
+Per-client Socket.IO packet serializers.
+
+JSON clients connect on the default Socket.IO path. With --msgpack, the
+server also accepts MessagePack clients on MSGPACK_PATH. Both paths lead
+to the same Engine.IO and Socket.IO servers, so every client shares the
+same handlers, rooms and events; only the encoding of its packets
+differs. Each client opts in by the path it connects on (advertised by
+/socketio-config), so JSON clients keep working unchanged.
+
+- Incoming: MessagePack clients send binary frames and JSON clients send
+  text (their binary attachments are reassembled before decoding), so
+  NegotiatedPacket decodes by frame type.
+- Outgoing: NegotiatingManager encodes each broadcast once per
+  serializer in use among the recipients, not once per client, and
+  re-encodes packets sent to a single client (connect acknowledgements,
+  call acks, disconnects) in that client's serializer.
+
+python-socketio has no public hook for packets sent to a single client,
+so NegotiatingManager wraps the server's _send_packet (checked when the
+server is created; tested with python-socketio 5.17). After upgrading
+python-socketio, run tools/check_packet_negotiation.py.
+
+Requires msgpack (pip install msgpack); serving.socketio_options() checks
+before importing this module.
+"""
+
+import socketio
+from engineio import packet as eio_packet
+from socketio import packet
+from socketio.msgpack_packet import MsgPackPacket
+from .serving import SOCKETIO_PATHS
+
+MSGPACK_PATH = SOCKETIO_PATHS['msgpack']
+
+# JSON packets mark payloads with bytes as binary; MessagePack carries them inline
+_INLINE_TYPES = {packet.BINARY_EVENT: packet.EVENT, packet.BINARY_ACK: packet.ACK}
+
+
+class NegotiatedPacket(packet.Packet):
+    """JSON packet that also decodes MessagePack (binary) frames."""
+
+    def decode(self, encoded_packet):
+        if isinstance(encoded_packet, bytes):
+            decoded = MsgPackPacket(encoded_packet=encoded_packet)
+            self.packet_type, self.data = decoded.packet_type, decoded.data
+            self.namespace, self.id = decoded.namespace, decoded.id
+            return 0
+        return super().decode(encoded_packet)
+
+
+def as_msgpack(pkt):
+    """Re-create a JSON packet as a MessagePack packet."""
+    return MsgPackPacket(
+        _INLINE_TYPES.get(pkt.packet_type, pkt.packet_type),
+        data=pkt.data, namespace=pkt.namespace, id=pkt.id,
+    )
+
+
+def _eio_packets(pkt):
+    """Encode a Socket.IO packet as Engine.IO message packets."""
+    encoded = pkt.encode()
+    if not isinstance(encoded, list):
+        encoded = [encoded]
+    return [eio_packet.Packet(eio_packet.MESSAGE, p) for p in encoded]
+
+
+class NegotiatingManager(socketio.Manager):
+    """Client manager that sends each client packets in its own serializer."""
+
+    def set_server(self, server):
+        super().set_server(server)
+        # Packets addressed to one client bypass the manager
+        send_packet = getattr(server, '_send_packet', None)
+        if send_packet is None:
+            raise RuntimeError(
+                "python-socketio no longer has Server._send_packet; msgpack negotiation needs "
+                "updating (tested with python-socketio 5.17, see tools/check_packet_negotiation.py)"
+            )
+
+        def _send_packet(eio_sid, pkt):
+            if self.uses_msgpack(eio_sid):
+                pkt = as_msgpack(pkt)
+            send_packet(eio_sid, pkt)
+
+        server._send_packet = _send_packet
+
+    def uses_msgpack(self, eio_sid):
+        """Check whether a client connected on the MessagePack path."""
+        environ = self.server.environ.get(eio_sid)
+        return environ is not None and environ.get('PATH_INFO', '').startswith(f"/{MSGPACK_PATH}/")
+
+    def emit(self, event, data, namespace, room=None, skip_sid=None,
+             callback=None, to=None, **kwargs):
+        if callback or namespace not in self.rooms:
+            # Per-recipient packets go through the server's _send_packet
+            return super().emit(event, data, namespace, room=room, skip_sid=skip_sid,
+                                callback=callback, to=to, **kwargs)
+
+        room = to or room
+        if isinstance(data, tuple):
+            data = list(data)
+        elif data is not None:
+            data = [data]
+        else:
+            data = []
+        if not isinstance(skip_sid, list):
+            skip_sid = [skip_sid]
+
+        json_packets = msgpack_packets = None
+        for sid, eio_sid in self.get_participants(namespace, room):
+            if sid in skip_sid:
+                continue
+            if self.uses_msgpack(eio_sid):
+                if msgpack_packets is None:
+                    msgpack_packets = _eio_packets(MsgPackPacket(packet.EVENT, namespace=namespace, data=[event] + data))
+                eio_packets = msgpack_packets
+            else:
+                if json_packets is None:
+                    json_packets = _eio_packets(self.server.packet_class(packet.EVENT, namespace=namespace, data=[event] + data))
+                eio_packets = json_packets
+            for p in eio_packets:
+                self.server.eio.send_packet(eio_sid, p)
+
+
+class MsgPackPathMiddleware(socketio.WSGIApp):
+    """
+    Route MSGPACK_PATH requests to the Flask-SocketIO server.
+
+    Like Flask-SocketIO's own middleware, exposes the Flask app in the
+    WSGI environment so handlers get an application context.
+    """
+
+    def __init__(self, flask_app, server):
+        self.flask_app = flask_app
+        super().__init__(server, flask_app.wsgi_app, socketio_path=MSGPACK_PATH)
+
+    def __call__(self, environ, start_response):
+        environ = environ.copy()
+        environ['flask.app'] = self.flask_app
+        return super().__call__(environ, start_response)
+
+
+def mount_msgpack_path(app, socketio_ext):
+    """
+    Serve MessagePack clients on MSGPACK_PATH.
+
+    Args:
+        app: Flask app
+        socketio_ext: Flask-SocketIO instance created with the options from
+            serving.socketio_options() (NegotiatingManager installed)
+    """
+    app.wsgi_app = MsgPackPathMiddleware(app, socketio_ext.server)
@@ -0,0 +1,313 @@
+"""
+Crash recovery for live round state.
+
+Each arena keeps a snapshot of its VoteManager round (votes, first-L
+claim, timer start, hold flag) plus cooldowns, and a journal of the
+commands applied since that snapshot:
+
+    data/recovery/<arena>/snapshot.json         last full snapshot
+    data/recovery/<arena>/journal.<seq>.jsonl   commands after snapshot <seq>
+
+Journal lines are buffered on the vote manager's command loop and
+written every JOURNAL_FLUSH_INTERVAL. Snapshots are taken every
+SNAPSHOT_INTERVAL while the journal is non-empty, when it reaches
+JOURNAL_MAX_ENTRIES (bounding replay time), and at round boundaries.
+
+Each snapshot starts a new journal file. Buffered entries are written to
+the old journal first, so until the new snapshot is on disk the old
+snapshot plus both journals still replay to the current state. The
+snapshot is written on a separate writer thread (temp file, fsync,
+os.replace, fsync of the directory); journals older than it are deleted
+only after that. Round-boundary checkpoints wait for the write: the
+reset that starts a new round is not journaled, so the command loop
+must not move on until a snapshot of the new round is durable (the
+vote manager dispatches the winner's keypress after the checkpoint, so
+an executed round is never restored).
+
+On startup the newest snapshot is bulk-loaded (with the cyclic garbage
+collector paused) and journals from its seq on are replayed (VoteManager.restore_state). All times are wall-clock, so the
+round keeps its original deadline across the restart.
+"""
+
+import gc
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from .command_loop import CommandLoop
+from .config import SNAPSHOT_INTERVAL, JOURNAL_FLUSH_INTERVAL, JOURNAL_MAX_ENTRIES
+
+SNAPSHOT_VERSION = 1
+
+
+class RoundRecovery:
+    """
+    Snapshot + journal persistence for one arena's VoteManager.
+
+    Journal methods (vote, remove, timer_start, hold, checkpoint) are
+    called by VoteManager on its command loop.
+    """
+
+    def __init__(self, vote_manager, directory, cooldowns=None, scheduler=None,
+                 snapshot_interval=SNAPSHOT_INTERVAL, flush_interval=JOURNAL_FLUSH_INTERVAL,
+                 max_journal=JOURNAL_MAX_ENTRIES):
+        """
+        Initialize recovery (nothing is read or written until start()).
+
+        Args:
+            vote_manager: VoteManager to snapshot and restore
+            directory: Directory for this arena's snapshot and journals
+            cooldowns: CooldownTracker to include in snapshots (optional)
+            scheduler: DeadlineScheduler for periodic flushes and snapshots
+                (None = only round-boundary snapshots; call flush() manually)
+            snapshot_interval: Seconds between snapshots while votes arrive
+            flush_interval: Seconds between journal writes
+            max_journal: Journal entries that trigger an early snapshot
+        """
+        self.manager = vote_manager
+        self.directory = Path(directory)
+        self.cooldowns = cooldowns
+        self.scheduler = scheduler
+        self.snapshot_interval = snapshot_interval
+        self.flush_interval = flush_interval
+        self.max_journal = max_journal
+
+        self.writer = CommandLoop('recovery-writer')
+        self._seq = 0
+        self._journal_file = None
+        self._pending = []        # Journal entries not yet written
+        self._journaled = 0       # Entries written since the last snapshot
+        self._flush_call = None     # Scheduled timer handles (None = not running)
+        self._snapshot_call = None
+        self._stopped = True
+        self._timer_lock = threading.Lock()  # stop() vs. timer callbacks re-arming
+        self.restore_ms = None
+
+    # ------------------------------------------------------------
+    # Journal (called by VoteManager on its command loop)
+    # ------------------------------------------------------------
+
+    def vote(self, voter_id, username, vote, timestamp):
+        """Journal a vote (timestamp in time.monotonic() seconds)."""
+        self._pending.append(('v', timestamp + time.time() - time.monotonic(), voter_id, username, vote))
+
+    def remove(self, voter_id):
+        """Journal a removed vote."""
+        self._pending.append(('r', voter_id))
+
+    def timer_start(self, round_start_time):
+        """Journal the round timer start (monotonic seconds)."""
+        self._pending.append(('t', round_start_time + time.time() - time.monotonic()))
+
+    def hold(self):
+        """Journal a held round."""
+        self._pending.append(('h',))
+
+    def checkpoint(self):
+        """Round boundary: replace the journal with a fresh snapshot (returns once it is on disk)."""
+        self._snapshot(durable=True)
+
+    def flush(self):
+        """Write buffered journal entries (runs on the command loop)."""
+        if not self._pending or self._journal_file is None:
+            return
+        if self._journaled + len(self._pending) >= self.max_journal:
+            self._snapshot()  # Cheaper to restore than a long replay
+            return
+        self._write_pending()
+
+    def _write_pending(self):
+        """Append buffered entries to the current journal (command loop)."""
+        if not self._pending or self._journal_file is None:
+            return
+        entries, self._pending = self._pending, []
+        self._journal_file.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+        self._journal_file.flush()
+        self._journaled += len(entries)
+
+    # ------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------
+
+    def _snapshot(self, durable=False):
+        """
+        Capture state and rotate the journal (command loop); write it off-loop.
+
+        Args:
+            durable: Wait until the snapshot is on disk (round boundaries)
+        """
+        # The old journal must cover everything up to this snapshot until it is durable
+        self._write_pending()
+        state = self.manager.export_state()
+        if self.cooldowns is not None:
+            state['cooldowns'] = {
+                group: dict(entry) for group, entry in self.cooldowns.state.items()
+            }
+        self._seq += 1
+        state['version'] = SNAPSHOT_VERSION
+        state['journal_seq'] = self._seq
+        state['saved_at'] = time.time()
+
+        previous = self._journal_file
+        self._journal_file = open(self.directory / f'journal.{self._seq}.jsonl', 'a')
+        self._journaled = 0
+        if durable:
+            self.writer.call(self._write_snapshot, state, previous)
+        else:
+            self.writer.submit(self._write_snapshot, state, previous)
+
+    def _write_snapshot(self, state, previous_journal=None):
+        """
+        Write snapshot durably, then drop journals it covers (writer thread).
+
+        Args:
+            state: Snapshot dict
+            previous_journal: Journal file replaced by this snapshot (synced and closed first)
+        """
+        if previous_journal is not None:
+            os.fsync(previous_journal.fileno())
+            previous_journal.close()
+
+        path = self.directory / 'snapshot.json'
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._sync_directory()
+
+        for seq, journal in self._journals():
+            if seq < state['journal_seq']:
+                journal.unlink(missing_ok=True)
+
+    def _sync_directory(self):
+        """fsync the directory so the snapshot rename survives a power loss."""
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _journals(self):
+        """Journal files as sorted (seq, path) pairs."""
+        journals = []
+        for path in self.directory.glob('journal.*.jsonl'):
+            try:
+                journals.append((int(path.name.split('.')[1]), path))
+            except ValueError:
+                continue
+        return sorted(journals)
+
+    # ------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------
+
+    def start(self):
+        """
+        Restore the last round (if any), then start journaling.
+
+        Returns:
+            bool: True if a round was restored
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # New journals must not reuse a seq left on disk (e.g. journals without a snapshot)
+        self._seq = max((seq for seq, _ in self._journals()), default=0)
+        restored = self.manager.commands.call(self._restore)
+
+        self.manager.journal = self
+        self.manager.commands.call(self._snapshot, True)  # Returns once the fresh snapshot is on disk
+
+        if self.scheduler is not None:
+            with self._timer_lock:
+                self._stopped = False
+                self._flush_call = self.scheduler.call_later(self.flush_interval, self._on_flush_timer)
+                self._snapshot_call = self.scheduler.call_later(self.snapshot_interval, self._on_snapshot_timer)
+        return restored
+
+    def stop(self):
+        """Flush the journal and stop periodic work."""
+        with self._timer_lock:
+            self._stopped = True
+            for call in (self._flush_call, self._snapshot_call):
+                if call is not None:
+                    call.cancel()
+            self._flush_call = self._snapshot_call = None
+        self.manager.commands.call(self.flush)
+
+    def _restore(self):
+        """Load snapshot + newer journals into the vote manager (command loop)."""
+        path = self.directory / 'snapshot.json'
+        if not path.exists():
+            return False
+
+        start = time.perf_counter()
+        # Bulk load allocates ~100k objects; generational collections would rescan them repeatedly
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self._load(path, start)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _load(self, path, start):
+        """Read the snapshot and journals and restore them (gc paused by _restore)."""
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠ Recovery snapshot unreadable ({e}) - starting fresh")
+            return False
+        if state.get('version') != SNAPSHOT_VERSION:
+            print(f"⚠ Recovery snapshot version {state.get('version')} not supported - starting fresh")
+            return False
+
+        entries = []
+        for seq, journal in self._journals():
+            if seq < state['journal_seq']:
+                continue  # Older than the snapshot: already covered by it
+            self._seq = max(self._seq, seq)
+            with open(journal) as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break  # Torn final line from a crash mid-write
+
+        self.manager.restore_state(state, entries)
+        if self.cooldowns is not None and 'cooldowns' in state:
+            for group, entry in state['cooldowns'].items():
+                if group in self.cooldowns.state:
+                    self.cooldowns.state[group].update(entry)
+
+        self.restore_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"✓ Restored round {self.manager.round_id}: {len(self.manager.votes)} votes "
+            f"({len(entries)} journaled) in {self.restore_ms:.0f}ms"
+        )
+        return True
+
+    # ------------------------------------------------------------
+    # Periodic work (scheduler thread -> command loop)
+    # ------------------------------------------------------------
+
+    def _on_flush_timer(self):
+        with self._timer_lock:
+            if self._stopped:
+                return  # Fired while stop() ran; stop() flushes itself
+            self.manager.commands.submit(self.flush)
+            self._flush_call = self.scheduler.call_later(self.flush_interval, self._on_flush_timer)
+
+    def _on_snapshot_timer(self):
+        with self._timer_lock:
+            if self._stopped:
+                return
+            self.manager.commands.submit(self._periodic_snapshot)
+            self._snapshot_call = self.scheduler.call_later(self.snapshot_interval, self._on_snapshot_timer)
+
+    def _periodic_snapshot(self):
+        """Snapshot if anything was journaled since the last one."""
+        if self._journaled or self._pending:
+            self._snapshot()
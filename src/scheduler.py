@@ -0,0 +1,123 @@
+"""
+Deadline scheduler for Selection Protocol.
+
+Runs callbacks at exact time.monotonic() deadlines on a single thread,
+sleeping until the next deadline instead of polling. Used for round
+expiry and per-second display ticks; nothing wakes up while no round
+is running.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class ScheduledCall:
+    """Handle for a scheduled callback (cancel with cancel())."""
+
+    __slots__ = ('deadline', 'fn', 'args', 'cancelled')
+
+    def __init__(self, deadline, fn, args):
+        self.deadline = deadline
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Cancel the callback (no-op if it already ran)."""
+        self.cancelled = True
+
+
+class DeadlineScheduler:
+    """
+    Single-threaded deadline scheduler.
+
+    Callbacks run on the scheduler thread and should be short - hand real
+    work to the owner's command loop (e.g. call_at(t, loop.submit, fn)).
+    """
+
+    def __init__(self, name='scheduler'):
+        """
+        Initialize scheduler (thread starts on start() or first schedule).
+
+        Args:
+            name: Scheduler thread name
+        """
+        self.name = name
+        self._cond = threading.Condition()
+        self._heap = []                  # (deadline, seq, ScheduledCall)
+        self._seq = itertools.count()
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Start the scheduler thread (no-op if already running)."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread; pending callbacks are dropped."""
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._cond.notify()
+
+    def call_at(self, deadline, fn, *args):
+        """
+        Schedule fn(*args) at a monotonic deadline.
+
+        Args:
+            deadline: time.monotonic() value to run at
+            fn: Callback
+
+        Returns:
+            ScheduledCall: Handle for cancellation
+        """
+        call = ScheduledCall(deadline, fn, args)
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._seq), call))
+            # Wake the thread if this is the new earliest deadline
+            if self._heap[0][2] is call:
+                self._cond.notify()
+        if not self._running:
+            self.start()
+        return call
+
+    def call_later(self, delay, fn, *args):
+        """
+        Schedule fn(*args) after delay seconds.
+
+        Returns:
+            ScheduledCall: Handle for cancellation
+        """
+        return self.call_at(time.monotonic() + delay, fn, *args)
+
+    def _run(self):
+        """Scheduler thread: sleep until the earliest deadline, run due callbacks."""
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    # Drop cancelled calls at the top
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait > 0:
+                        self._cond.wait(wait)
+                        continue
+                    _, _, call = heapq.heappop(self._heap)
+                    break
+
+            try:
+                call.fn(*call.args)
+            except Exception as e:
+                print(f"✗ {self.name}: scheduled {getattr(call.fn, '__name__', call.fn)} failed: {e}")
@@ -8,20 +8,60 @@ Designed to be added as a Browser Source in OBS with "lighten" blend mode.
 Full-page layout with black background (#000000) for clean compositing.
 
 Includes left-side admin control panel for testing and game automation.
+
+Usage:
+    python -m src.server                              # dev server (debug, reloader)
+    python -m src.server --mode eventlet              # green-thread server for streaming
+    python -m src.server --mode gevent --websocket-only
+    python -m src.server --mode eventlet --msgpack     # also serve MessagePack clients
 """
 
-from flask import Flask, render_template
+import sys
+from .serving import (
+    configure, current_options, socketio_options, page_serializer, client_options, client_config, run_server,
+    CLIENT_BUNDLES, SOCKETIO_PATHS,
+)
+
+# Serving options come from the command line when run as a script (tools that
+# import the server call serving.configure() first; default: threading).
+# Green-thread modes patch the standard library before anything below is imported.
+serving = configure(sys.argv[1:]) if __name__ == '__main__' else current_options()
+
+from flask import Flask, render_template, request, abort, jsonify
 from flask_socketio import SocketIO
 from datetime import datetime
 
-from .websocket import setup_socketio_handlers
-from .vote_manager import VoteManager
-from .game_controller import discover_game_window, set_game_window_id
+from .websocket import setup_socketio_handlers, ClientRooms
+from .action_log import ActionLog
+from .arena import load_arena_config, create_arenas
+from .history import HistoryStore
+from .leaderboard import Leaderboard
+from .vote_delivery import RecentVoteIds
+from .vote_manager import BOT_NAMESPACE
+from .scheduler import DeadlineScheduler
+from .game_controller import create_keypress_backend, set_keypress_backend
+from .config import KEYPRESS_BACKEND, WINDOW_CHECK_INTERVAL, VOTE_ID_CACHE_SIZE
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'bibites-twitch-overlay-secret'
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", **socketio_options(serving))
+if serving.msgpack:
+    from .packet_negotiation import mount_msgpack_path
+    mount_msgpack_path(app, socketio)
+
+
+@app.context_processor
+def inject_socketio_options():
+    """
+    Give pages the io() options and client bundle for the server's
+    transports and the page's serializer (?serializer=msgpack opts in).
+    """
+    serializer = page_serializer(serving, request.args.get('serializer'))
+    return {
+        'socketio_options': client_options(serving, serializer),
+        'socketio_bundle': CLIENT_BUNDLES[serializer],
+    }
 
 # Admin state
 admin_state = {
@@ -33,73 +73,110 @@ admin_state = {
     'last_action': None,
     'last_action_time': None,
     'connected_clients': 0,
-    'action_log': [],
     'time_remaining': 60,
     'timer_paused': False
 }
 
+# Admin action log (ring buffer; admin panels get new entries incrementally)
+action_log = ActionLog()
+
+# Role rooms (overlay / admin / bot) shared by all namespaces
+rooms = ClientRooms(socketio, admin_state, action_log)
+
 
 def log_action(action, details=""):
-    """Log an admin action with timestamp."""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    log_entry = f"{timestamp} - {action}"
-    if details:
-        log_entry += f": {details}"
-    admin_state['action_log'].insert(0, log_entry)
-    admin_state['action_log'] = admin_state['action_log'][:10]  # Keep last 10
-    admin_state['last_action'] = action
-    admin_state['last_action_time'] = timestamp
-    print(log_entry)
-
-
-# Initialize vote manager (owns vote state)
-vote_manager = VoteManager(socketio, log_action)
-
-# Setup WebSocket handlers (legacy vote_state for backward compat with admin panel)
+    """
+    Log an admin action with timestamp.
+
+    Called on every vote: the entry is only appended here. It is printed
+    and sent to admin panels (with last_action) in coalesced batches.
+    """
+    action_log.append(action, details)
+    rooms.action_logged()
+
+
+# Round timer scheduler (exact expiry deadlines, ticks only while a round runs)
+scheduler = DeadlineScheduler('round-timer')
+
+# Round history (append-only SQLite, written by a background thread) and
+# lineage leaderboard for !lineage / !stats (updated once per round).
+# Opened by start_persistence() at startup, so importing the server
+# creates no database files or writer threads.
+history = None
+leaderboard = None
+
+# Arenas (one VoteManager + game window per channel, sharing the scheduler)
+arenas = create_arenas(socketio, log_action, scheduler, load_arena_config())
+
+# Bot votes already applied (replays after a lost ack are discarded)
+delivered_votes = RecentVoteIds(VOTE_ID_CACHE_SIZE)
+
+# Default arena's vote manager (owns vote state for single-arena setups)
+vote_manager = arenas.default.vote_manager
+
+# Setup WebSocket handlers per arena namespace
+# (legacy vote_state for backward compat with admin panel)
 vote_state = {}  # Deprecated - vote_manager owns state now
-broadcast_states = setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_manager)
+for arena in arenas:
+    arena_broadcast = setup_socketio_handlers(
+        socketio, vote_state, admin_state, arena.log_action, arena.vote_manager, arena.namespace, rooms
+    )
+    if arena.default:
+        broadcast_states = arena_broadcast
+
+# The bot joins its room on '/' even when no arena uses that namespace
+rooms.register(BOT_NAMESPACE)
 
 
-# Background timer task
-def timer_background_task():
+def start_persistence():
     """
-    Background task that ticks the vote timer every second.
+    Open round history and the leaderboard and attach them to every arena.
 
-    Runs continuously, calling vote_manager.tick() to decrement timer
-    and check for expiry/execution.
+    Called at startup before arena recovery.
     """
-    import time
-    while True:
-        time.sleep(1)
-        vote_manager.tick()
+    global history, leaderboard
+    history = HistoryStore()
+    leaderboard = Leaderboard()
+    for arena in arenas:
+        arena.attach_stores(history, leaderboard)
 
 
-# Start background timer when socketio is ready
-@socketio.on('connect')
-def handle_first_connect():
-    """Start background timer on first client connection."""
-    if not hasattr(handle_first_connect, 'timer_started'):
-        socketio.start_background_task(timer_background_task)
-        handle_first_connect.timer_started = True
-        print("Background timer task started")
+def render_arena_template(template):
+    """Render a page bound to the arena named in ?arena= (default arena if omitted)."""
+    name = request.args.get('arena')
+    arena = arenas.get(name) if name else arenas.default
+    if arena is None:
+        abort(404, f"Unknown arena '{name}'")
+    return render_template(template, namespace=arena.namespace, arena=arena.name)
 
 
 @app.route('/')
 def index():
     """Serve the combined admin + overlay page."""
-    return render_template('index.html')
+    return render_arena_template('index.html')
 
 
 @app.route('/admin')
 def admin():
     """Serve the admin panel only (for split deployment)."""
-    return render_template('admin_only.html')
+    return render_arena_template('admin_only.html')
 
 
 @app.route('/overlay')
 def overlay():
     """Serve the overlay only (for OBS Browser Source)."""
-    return render_template('overlay_only.html')
+    return render_arena_template('overlay_only.html')
+
+
+@app.route('/socketio-config')
+def socketio_config():
+    """
+    Return the serializers (with their Socket.IO paths) and transports
+    the server accepts.
+
+    The bot reads this before connecting and uses msgpack only if offered.
+    """
+    return jsonify(client_config(serving))
 
 
 # Bot integration endpoints
@@ -116,6 +193,61 @@ def handle_get_actions():
     return actions
 
 
+@socketio.on('get_rounds')
+def handle_get_rounds():
+    """
+    Return each arena's namespace, channel IDs and current round ID.
+
+    The bot maps its channels to arenas with this and keys its per-round
+    duplicate-vote cache on the round ID (updated by round_started events).
+    """
+    return [
+        {
+            'namespace': arena.namespace,
+            'channel_ids': sorted(arena.channel_ids),
+            'default': arena.default,
+            'round_id': arena.vote_manager.round_id,
+        }
+        for arena in arenas
+    ]
+
+
+@socketio.on('get_broadcast_stats')
+def handle_get_broadcast_stats():
+    """
+    Return vote_update broadcast counters (sent vs. suppressed) per arena.
+
+    Used to check coalescing effectiveness during chat floods.
+    """
+    return {arena.name: arena.vote_manager.get_broadcast_stats() for arena in arenas}
+
+
+@socketio.on('leaderboard_stats')
+def handle_leaderboard_stats():
+    """
+    Return the !stats chat response (top lineage claimants and totals).
+
+    Rendered once per round; repeated calls return the cached text.
+    """
+    if leaderboard is None:
+        return "Stats unavailable (leaderboard not running)"
+    return leaderboard.commands.call(leaderboard.render_stats)
+
+
+@socketio.on('leaderboard_lineage')
+def handle_leaderboard_lineage(data):
+    """
+    Return the !lineage chat response for one viewer.
+
+    Expected data: {'user_id': '12345', 'username': 'viewer'}
+    """
+    if leaderboard is None:
+        return f"@{data.get('username', 'viewer')} Lineage stats unavailable right now"
+    return leaderboard.commands.call(
+        leaderboard.render_lineage, data.get('user_id'), data.get('username', 'viewer')
+    )
+
+
 @socketio.on('bot_connected')
 def handle_bot_connected(data):
     """
@@ -138,25 +270,30 @@ def handle_bot_connected(data):
 @socketio.on('vote_cast')
 def handle_vote_cast(data):
     """
-    Handle vote from Twitch bot.
+    Handle vote from Twitch bot (routed to the arena for its channel).
+
+    Votes replayed by the bot after a reconnect are discarded if their
+    vote_id was already applied.
 
     Args:
-        data: {username: str, vote: str, timestamp: str}
+        data: {username: str, user_id: str, channel_id: str, vote: str,
+               timestamp: str, vote_id: str}
     """
+    if not delivered_votes.filter_new([data]):
+        return {'success': True, 'duplicate': True}
+
     username = data.get('username')
+    user_id = data.get('user_id')
     vote = data.get('vote')
-    timestamp_str = data.get('timestamp')
-
-    # Parse timestamp if provided
-    timestamp = None
-    if timestamp_str:
-        try:
-            timestamp = datetime.fromisoformat(timestamp_str)
-        except (ValueError, TypeError):
-            timestamp = datetime.now()
+    timestamp = parse_vote_timestamp(data.get('timestamp'))
+    manager = arenas.for_channel(data.get('channel_id')).vote_manager
 
     # Record vote
-    success = vote_manager.cast_vote(username, vote, timestamp)
+    try:
+        success = manager.commands.call(manager.cast_vote, username, vote, timestamp, user_id)
+    except Exception:
+        delivered_votes.forget([data])
+        raise
 
     if success:
         print(f"Vote recorded: {username} → {vote.upper()}")
@@ -166,30 +303,106 @@ def handle_vote_cast(data):
     return {'success': success}
 
 
+@socketio.on('vote_cast_batch')
+def handle_vote_cast_batch(data):
+    """
+    Handle a batch of votes from Twitch bot.
+
+    Votes are split by channel into per-arena batches and applied in
+    order; each arena's timer and broadcast are updated once. Votes whose
+    vote_id was already applied (bot replays) are discarded.
+
+    Args:
+        data: {votes: [{username: str, user_id: str, channel_id: str, vote: str,
+                        timestamp: str, vote_id: str}, ...]}
+    """
+    votes = data.get('votes') or []
+    fresh = delivered_votes.filter_new(votes)
+    batches = {}
+    for item in fresh:
+        item['timestamp'] = parse_vote_timestamp(item.get('timestamp'))
+        batches.setdefault(arenas.for_channel(item.get('channel_id')), []).append(item)
+
+    recorded = 0
+    pending = list(batches.items())
+    try:
+        while pending:
+            manager = pending[0][0].vote_manager
+            recorded += manager.commands.call(manager.cast_votes, pending[0][1])
+            pending.pop(0)
+    except Exception:
+        # Let the bot's resend apply what this call did not
+        delivered_votes.forget([item for _, batch in pending for item in batch])
+        raise
+    duplicates = len(votes) - len(fresh)
+    print(f"Vote batch recorded: {recorded}/{len(votes)}" + (f" ({duplicates} replayed)" if duplicates else ""))
+
+    return {
+        'success': recorded > 0 or duplicates > 0,
+        'recorded': recorded,
+        'rejected': len(fresh) - recorded,
+        'duplicates': duplicates,
+    }
+
+
+def parse_vote_timestamp(timestamp_str):
+    """
+    Parse an ISO timestamp sent by the bot.
+
+    Returns:
+        datetime: Parsed timestamp, now() if malformed, or None if not provided
+    """
+    if not timestamp_str:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp_str)
+    except (ValueError, TypeError):
+        return datetime.now()
+
+
 if __name__ == '__main__':
     print("=" * 60)
     print("Selection Protocol - Overlay Server")
     print("=" * 60)
 
-    # Auto-discover game window (fail fast if not found)
+    # Auto-discover game windows (fail fast if the default arena's is not found)
     try:
-        window_id = discover_game_window()
-        set_game_window_id(window_id)
+        start_persistence()
+        for arena in arenas:
+            arena.start(scheduler)
+            arena.start_recovery()
+        backend = create_keypress_backend(KEYPRESS_BACKEND)
+        set_keypress_backend(backend)
+        print(f"✓ Keypress backend: {backend.name}")
     except RuntimeError as e:
         print(f"\n✗ ERROR: {e}")
         print("\nServer startup aborted. Please fix the issue and try again.\n")
         exit(1)
 
-    print("\nOverlay URL: http://localhost:5000")
+    print(f"✓ Serving mode: {serving.mode} (async_mode {socketio.async_mode}"
+          f"{', websocket only' if serving.websocket_only else ''})")
+    print(f"✓ Packets: JSON on /{SOCKETIO_PATHS['json']}"
+          + (f", MessagePack on /{SOCKETIO_PATHS['msgpack']}" if serving.msgpack else ""))
+
+    print(f"\nOverlay URL: http://localhost:{serving.port}")
     print("\nAdd this URL as a Browser Source in OBS:")
     print("  1. Add new Browser Source")
-    print("  2. URL: http://localhost:5000")
+    print(f"  2. URL: http://localhost:{serving.port}")
     print("  3. Width: 1920, Height: 1080 (or your canvas size)")
     print("  4. Blend Mode: Lighten (in OBS transform settings)")
     print("  5. Crop/resize as needed in OBS")
+    scheduler.start()
+    print("\nRound timer scheduler started (game windows checked every "
+          f"{WINDOW_CHECK_INTERVAL:g}s)")
+
     print("\nVote Manager initialized")
+    print(f"Round history: {history.path} (session {history.session})")
+    print(f"Leaderboard: {len(leaderboard.users)} viewers, {leaderboard.lineage_rounds} lineage claims")
     print(f"Enabled actions: {vote_manager.get_enabled_actions()}")
+    for arena in arenas:
+        channels = ', '.join(sorted(arena.channel_ids)) or 'unmapped channels'
+        print(f"Arena '{arena.name}': namespace {arena.namespace}, {channels}")
     print("\nWaiting for Twitch bot to connect...")
     print("=" * 60)
 
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True, allow_unsafe_werkzeug=True)
+    run_server(socketio, app, serving)
@@ -0,0 +1,199 @@
+"""
+Serving modes for the overlay server.
+
+- dev: Werkzeug threaded server with the debugger and reloader (one OS
+  thread per connection; fine for local testing)
+- threading: the same server without debugger/reloader
+- eventlet / gevent: green-thread WSGI server; every connection,
+  background task and command-loop thread becomes a greenlet, so
+  thousands of idle overlay sockets cost memory, not threads
+
+Green-thread modes monkey-patch the standard library, which must happen
+before flask, requests or threading objects are created - server.py calls
+configure() before its other imports (tools that import the server call
+configure() first to pick a mode). This module imports only the standard
+library for that reason.
+
+--websocket-only makes the server refuse long-polling, and the pages
+connect with the websocket transport directly instead of starting on
+polling and upgrading.
+
+--msgpack additionally accepts clients that encode Socket.IO packets as
+MessagePack, on their own path (see packet_negotiation). JSON stays on
+the default path, so each client chooses: pages opened with
+?serializer=msgpack load the socket.io bundle built with the msgpack
+parser, and the bot uses msgpack when configured to and the server's
+/socketio-config offers it.
+"""
+
+import argparse
+
+SERVING_MODES = ('dev', 'threading', 'eventlet', 'gevent')
+
+# Flask-SocketIO async_mode per serving mode
+ASYNC_MODES = {
+    'dev': 'threading',
+    'threading': 'threading',
+    'eventlet': 'eventlet',
+    'gevent': 'gevent',
+}
+
+# Socket.IO packet serializers clients can choose
+SERIALIZERS = ('json', 'msgpack')
+
+# Socket.IO path per serializer (msgpack only served with --msgpack)
+SOCKETIO_PATHS = {
+    'json': 'socket.io',
+    'msgpack': 'socket.io-msgpack',
+}
+
+# socket.io client bundle per serializer (the msgpack build includes its parser)
+CLIENT_BUNDLES = {
+    'json': 'https://cdn.socket.io/4.5.4/socket.io.min.js',
+    'msgpack': 'https://cdn.socket.io/4.5.4/socket.io.msgpack.min.js',
+}
+
+_options = None
+
+
+def configure(argv):
+    """
+    Parse serving options and monkey-patch for the chosen mode (once).
+
+    Args:
+        argv: Arguments (without program name)
+
+    Returns:
+        argparse.Namespace: mode, host, port, websocket_only, msgpack
+    """
+    global _options
+    if _options is None:
+        _options = parse_serving_args(argv)
+        monkey_patch(_options.mode)
+    return _options
+
+
+def current_options():
+    """Get the configured serving options (plain threading if never configured)."""
+    return _options or configure([])
+
+
+def parse_serving_args(argv):
+    """
+    Parse server command line options.
+
+    Args:
+        argv: Arguments (without program name)
+
+    Returns:
+        argparse.Namespace: mode, host, port, websocket_only, msgpack
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m src.server',
+        description="Selection Protocol overlay server",
+    )
+    parser.add_argument('--mode', choices=SERVING_MODES, default='dev',
+                        help="Serving mode (default: dev; eventlet or gevent for streaming)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--websocket-only', action='store_true',
+                        help="Refuse long-polling; clients connect with websocket directly")
+    parser.add_argument('--msgpack', action='store_true',
+                        help=f"Also serve MessagePack clients on /{SOCKETIO_PATHS['msgpack']} "
+                             f"(JSON stays on /{SOCKETIO_PATHS['json']}; needs pip install msgpack)")
+    return parser.parse_args(argv)
+
+
+def monkey_patch(mode):
+    """
+    Patch the standard library for green-thread modes (no-op otherwise).
+
+    Raises:
+        RuntimeError: If the mode's package is not installed
+    """
+    if mode == 'eventlet':
+        try:
+            import eventlet
+        except ImportError:
+            raise RuntimeError("eventlet not installed. Install with: pip install eventlet")
+        eventlet.monkey_patch()
+    elif mode == 'gevent':
+        try:
+            from gevent import monkey
+        except ImportError:
+            raise RuntimeError("gevent not installed. Install with: pip install gevent")
+        monkey.patch_all()
+
+
+def socketio_options(options):
+    """
+    Get SocketIO() keyword arguments for the serving options.
+
+    The async mode is always explicit: left to auto-detection,
+    Flask-SocketIO picks eventlet whenever it is installed, even unpatched.
+    """
+    kwargs = {'async_mode': ASYNC_MODES[options.mode]}
+    if options.msgpack:
+        packet_serializer('msgpack')  # install check before importing the negotiation module
+        from .packet_negotiation import NegotiatedPacket, NegotiatingManager
+        kwargs['serializer'] = NegotiatedPacket
+        kwargs['client_manager'] = NegotiatingManager()
+    if options.websocket_only:
+        kwargs['transports'] = ['websocket']
+    return kwargs
+
+
+def packet_serializer(name):
+    """
+    Get the python-socketio serializer argument for a serializer name.
+
+    Used by the bot's AsyncClient (and as the server's msgpack install check).
+
+    Raises:
+        RuntimeError: If msgpack is requested but not installed
+    """
+    if name == 'msgpack':
+        try:
+            import msgpack  # noqa: F401
+        except ImportError:
+            raise RuntimeError("msgpack not installed. Install with: pip install msgpack")
+        return 'msgpack'
+    return 'default'
+
+
+def page_serializer(options, requested):
+    """
+    Get the serializer a page uses: the one requested (?serializer=) if
+    the server offers it, otherwise JSON.
+    """
+    return 'msgpack' if requested == 'msgpack' and options.msgpack else 'json'
+
+
+def client_options(options, serializer='json'):
+    """Get the io() options pages must connect with (JSON-serialisable)."""
+    kwargs = {'transports': ['websocket']} if options.websocket_only else {}
+    if serializer != 'json':
+        kwargs['path'] = f"/{SOCKETIO_PATHS[serializer]}"
+    return kwargs
+
+
+def client_config(options):
+    """
+    Get what a client needs to connect (served as /socketio-config).
+
+    Returns:
+        dict: {'serializers': {name: Socket.IO path, ...}, 'transports': [...]}
+    """
+    offered = SERIALIZERS if options.msgpack else ('json',)
+    transports = ['websocket'] if options.websocket_only else ['polling', 'websocket']
+    return {'serializers': {name: SOCKETIO_PATHS[name] for name in offered}, 'transports': transports}
+
+
+def run_server(socketio, app, options):
+    """Serve until interrupted."""
+    if options.mode == 'dev':
+        socketio.run(app, host=options.host, port=options.port, debug=True, allow_unsafe_werkzeug=True)
+    elif options.mode == 'threading':
+        socketio.run(app, host=options.host, port=options.port, allow_unsafe_werkzeug=True)
+    else:
+        socketio.run(app, host=options.host, port=options.port)
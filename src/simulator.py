@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Vectorized voting-rules simulator for Selection Protocol.
+
+Evaluates the round timer and winner rules (src/voting_rules.py) over
+large numbers of synthetic rounds at once using NumPy, to compare rule
+tweaks from docs/VOTING_RULES.md and docs/IDEAS.md before they go live.
+
+Model (per round, 1-second steps):
+- New voters arrive as Poisson processes per action (rate × K/L/X mix)
+- Existing voters switch to another action with a per-second probability
+- Optional raid: a burst of voters with its own mix at a random second
+- Timer starts at the first K/L vote; the round ends at the first whole
+  second where elapsed >= timer_limit(current counts)
+
+Reports round-length distribution, winner rates and first-L claimant
+churn. The vectorized rule functions are checked against the scalar
+voting_rules functions on a grid of vote counts before every run, so
+simulation and production cannot silently drift.
+
+Requires numpy (in requirements-extras.txt; not needed by the server or bot).
+
+Usage:
+    python -m src.simulator
+    python -m src.simulator --rounds 2000000 --rate 3 --mix 0.5,0.3,0.2
+    python -m src.simulator --raid-prob 0.1 --raid-size 500 --raid-mix 0.1,0.8,0.1
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from . import voting_rules
+
+WINNER_CODES = ('k', 'l', 'x')
+
+
+# ============================================================
+# VECTORIZED RULES (mirror voting_rules, checked by check_rules_parity)
+# ============================================================
+
+def timer_limit_array(k, l, x, base_time=voting_rules.BASE_TIME):
+    """
+    Vectorized voting_rules.timer_limit.
+
+    Args:
+        k, l, x: Integer arrays of vote counts (same shape)
+        base_time: Minimum timer duration
+
+    Returns:
+        ndarray: Timer limit in seconds per element
+    """
+    total = k + l + x
+    safe_total = np.maximum(total, 1)
+
+    k_pct = k / safe_total
+    l_pct = l / safe_total
+    x_pct = x / safe_total
+
+    # Same operation order as the scalar rule (entropy -= p * log2(p))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = 0.0
+        for pct in (k_pct, l_pct, x_pct):
+            entropy = entropy - np.where(pct > 0, pct * np.log2(pct), 0.0)
+
+    uncertainty = np.minimum(entropy / voting_rules.MAX_ENTROPY, 1.0)
+    uncertainty_bonus = uncertainty * voting_rules.UNCERTAINTY_BONUS
+    x_bonus = x_pct * voting_rules.X_BONUS
+
+    total_time = base_time + uncertainty_bonus + x_bonus
+    limit = np.minimum(np.trunc(total_time).astype(np.int64), voting_rules.MAX_TIME)
+    return np.where(total == 0, base_time, limit)
+
+
+def winner_array(k, l, total):
+    """
+    Vectorized voting_rules.winner.
+
+    Args:
+        k, l: Integer arrays of K and L counts
+        total: Integer array of total votes
+
+    Returns:
+        ndarray: Winner index per element (0=k, 1=l, 2=x; see WINNER_CODES)
+    """
+    safe_total = np.maximum(total, 1)
+    k_percent = (k / safe_total) * 100
+    l_percent = (l / safe_total) * 100
+
+    k_wins = (total > 0) & (k_percent > voting_rules.WIN_THRESHOLD_PCT) & (k > l)
+    l_wins = (total > 0) & (l_percent > voting_rules.WIN_THRESHOLD_PCT) & (l > k)
+    return np.where(k_wins, 0, np.where(l_wins, 1, 2))
+
+
+def check_rules_parity(max_votes=40, base_time=voting_rules.BASE_TIME):
+    """
+    Check vectorized rules against voting_rules on every (k, l, x) count grid point.
+
+    Args:
+        max_votes: Largest per-action count to check
+
+    Raises:
+        RuntimeError: If any grid point disagrees
+    """
+    grid = np.arange(max_votes + 1)
+    k, l, x = (a.ravel() for a in np.meshgrid(grid, grid, grid, indexing='ij'))
+
+    limits = timer_limit_array(k, l, x, base_time)
+    winners = winner_array(k, l, k + l + x)
+
+    for i in range(len(k)):
+        kc, lc, xc = int(k[i]), int(l[i]), int(x[i])
+        expected_limit = voting_rules.timer_limit(kc, lc, xc, base_time)
+        expected_winner = voting_rules.winner(kc, lc, kc + lc + xc)
+        if limits[i] != expected_limit or WINNER_CODES[winners[i]] != expected_winner:
+            raise RuntimeError(
+                f"Simulator rules drifted from voting_rules at k={kc} l={lc} x={xc}: "
+                f"limit {limits[i]} vs {expected_limit}, "
+                f"winner {WINNER_CODES[winners[i]]} vs {expected_winner}"
+            )
+
+
+# ============================================================
+# SIMULATION
+# ============================================================
+
+def _switch(rng, counts, switch_prob, mix, has_claimant, claimant_leaves):
+    """
+    Move a binomial share of each action's voters to the other two (by mix).
+
+    Leavers are drawn from the counts before any move, so a voter switches
+    at most once per second. The claimant is one of the L voters: its
+    (already drawn) switch is part of the L leavers.
+    """
+    leaving = rng.binomial(counts - has_claimant * np.array([[0], [1], [0]]), switch_prob)
+    leaving[1] += claimant_leaves
+    for source in range(3):
+        others = [a for a in range(3) if a != source]
+        share = mix[others[0]] / max(mix[others[0]] + mix[others[1]], 1e-12)
+        to_first = rng.binomial(leaving[source], share)
+        counts[source] -= leaving[source]
+        counts[others[0]] += to_first
+        counts[others[1]] += leaving[source] - to_first
+
+
+def simulate_chunk(rng, rounds, rate, mix, switch_prob=0.0, raid_prob=0.0,
+                   raid_size=0, raid_mix=None, base_time=voting_rules.BASE_TIME,
+                   max_idle=600):
+    """
+    Simulate a chunk of independent rounds in lockstep.
+
+    Args:
+        rng: numpy Generator
+        rounds: Number of rounds in this chunk
+        rate: Mean new voters per second
+        mix: (k, l, x) preference probabilities for new voters
+        switch_prob: Per-second probability an existing voter switches
+        raid_prob: Probability a round contains a raid
+        raid_size: Mean raid size (voters)
+        raid_mix: (k, l, x) preference of raiders (defaults to mix)
+        base_time: Minimum timer duration
+        max_idle: Seconds to wait for a first K/L vote before giving up
+
+    Returns:
+        dict: Per-round arrays 'length', 'winner', 'churn' (times the
+            first-L claim passed to another voter), 'votes', 'started'
+    """
+    mix = np.asarray(mix, dtype=float)
+    raid_mix = mix if raid_mix is None else np.asarray(raid_mix, dtype=float)
+    horizon = max_idle + voting_rules.MAX_TIME + 1
+
+    counts = np.zeros((3, rounds), dtype=np.int64)
+    started = np.zeros(rounds, dtype=bool)
+    done = np.zeros(rounds, dtype=bool)
+    start_step = np.zeros(rounds, dtype=np.int64)
+    length = np.zeros(rounds, dtype=np.int64)
+    winner = np.full(rounds, 2, dtype=np.int64)
+    churn = np.zeros(rounds, dtype=np.int64)
+    has_claimant = np.zeros(rounds, dtype=np.int64)   # an L voter holds the claim
+    claimed = np.zeros(rounds, dtype=bool)            # the claim was ever held
+
+    has_raid = rng.random(rounds) < raid_prob
+    raid_step = rng.integers(0, voting_rules.MAX_TIME, rounds)
+
+    for step in range(horizon):
+        active = ~done
+        if not active.any():
+            break
+
+        # Existing voters switch. When the claimant switches away the claim
+        # passes to the earliest remaining L voter, or is vacant until the
+        # next L vote; every voter who switches to L joins the queue behind
+        # the current claimant.
+        if switch_prob > 0:
+            claimant_leaves = has_claimant * active * (rng.random(rounds) < switch_prob)
+            _switch(rng, counts, switch_prob, mix, has_claimant, claimant_leaves)
+            left = claimant_leaves.astype(bool)
+            transferred = left & (counts[1] > 0)
+            churn += transferred
+            has_claimant[left & ~transferred] = 0
+
+        # New voters arrive (plus raid burst)
+        arrivals = rng.poisson(rate * mix[:, None], size=(3, rounds))
+        raid_now = has_raid & (raid_step == step - start_step) & started
+        if raid_now.any():
+            arrivals += rng.poisson(raid_size * raid_mix[:, None], size=(3, rounds)) * raid_now
+        arrivals *= active
+        counts += arrivals
+
+        # A vacant claim goes to the first L voter (a new holder after the
+        # round's first claimant counts as a change)
+        claiming = active & (has_claimant == 0) & (counts[1] > 0)
+        churn += claiming & claimed
+        has_claimant[claiming] = 1
+        claimed |= claiming
+
+        # Timer starts on first K/L vote
+        newly_started = active & ~started & ((counts[0] + counts[1]) > 0)
+        start_step[newly_started] = step
+        started |= newly_started
+
+        # Expiry check at whole seconds
+        elapsed = step - start_step + 1
+        limit = timer_limit_array(counts[0], counts[1], counts[2], base_time)
+        expired = active & started & (elapsed >= limit)
+        length[expired] = elapsed[expired]
+        ended = counts[:, expired]
+        winner[expired] = winner_array(ended[0], ended[1], ended.sum(axis=0))
+        done |= expired
+
+    return {
+        'length': length,
+        'winner': winner,
+        'churn': churn,
+        'votes': counts.sum(axis=0),
+        'started': started,
+    }
+
+
+def simulate(rounds, rate, mix, chunk_size=200_000, seed=None, **kwargs):
+    """
+    Simulate many rounds in chunks and concatenate the results.
+
+    Checks rule parity with voting_rules first.
+
+    Returns:
+        dict: Per-round arrays (see simulate_chunk)
+    """
+    check_rules_parity(base_time=kwargs.get('base_time', voting_rules.BASE_TIME))
+
+    rng = np.random.default_rng(seed)
+    parts = []
+    remaining = rounds
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        parts.append(simulate_chunk(rng, size, rate, mix, **kwargs))
+        remaining -= size
+
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def summarize(results):
+    """
+    Summarize simulation results.
+
+    Returns:
+        dict: Round-length percentiles, winner rates, churn and vote stats
+    """
+    started = results['started']
+    length = results['length'][started]
+    winner = results['winner'][started]
+    churn = results['churn'][started]
+    votes = results['votes'][started]
+
+    return {
+        'rounds': int(len(started)),
+        'never_started': int((~started).sum()),
+        'length_mean': float(length.mean()) if len(length) else 0.0,
+        'length_pct': {p: float(np.percentile(length, p)) for p in (5, 25, 50, 75, 95)} if len(length) else {},
+        'length_hist': np.histogram(length, bins=range(0, voting_rules.MAX_TIME + 11, 10))[0].tolist() if len(length) else [],
+        'winner_rates': {code: float((winner == i).mean()) for i, code in enumerate(WINNER_CODES)} if len(winner) else {},
+        'churn_mean': float(churn.mean()) if len(churn) else 0.0,
+        'churn_p95': float(np.percentile(churn, 95)) if len(churn) else 0.0,
+        'votes_mean': float(votes.mean()) if len(votes) else 0.0,
+    }
+
+
+def _parse_mix(text):
+    """Parse 'k,l,x' probabilities and normalize them."""
+    values = [float(v) for v in text.split(',')]
+    if len(values) != 3 or sum(values) <= 0:
+        raise argparse.ArgumentTypeError("mix must be three comma-separated weights: k,l,x")
+    total = sum(values)
+    return tuple(v / total for v in values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate Selection Protocol voting rules")
+    parser.add_argument('--rounds', type=int, default=1_000_000, help="Rounds to simulate")
+    parser.add_argument('--rate', type=float, default=1.0, help="New voters per second")
+    parser.add_argument('--mix', type=_parse_mix, default=(0.4, 0.4, 0.2), help="K,L,X preference weights")
+    parser.add_argument('--switch-prob', type=float, default=0.02, help="Per-second vote switch probability")
+    parser.add_argument('--raid-prob', type=float, default=0.0, help="Probability a round contains a raid")
+    parser.add_argument('--raid-size', type=int, default=300, help="Mean raid size (voters)")
+    parser.add_argument('--raid-mix', type=_parse_mix, default=None, help="K,L,X preference of raiders")
+    parser.add_argument('--base-time', type=int, default=voting_rules.BASE_TIME, help="Minimum timer duration")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Selection Protocol - Voting Rules Simulator")
+    print("=" * 60)
+    print(f"Rounds: {args.rounds:,} | Rate: {args.rate}/s | Mix K/L/X: "
+          f"{args.mix[0]:.2f}/{args.mix[1]:.2f}/{args.mix[2]:.2f}")
+    if args.raid_prob:
+        print(f"Raids: p={args.raid_prob} size~{args.raid_size}")
+
+    start = time.perf_counter()
+    results = simulate(
+        args.rounds, args.rate, args.mix,
+        seed=args.seed,
+        switch_prob=args.switch_prob,
+        raid_prob=args.raid_prob,
+        raid_size=args.raid_size,
+        raid_mix=args.raid_mix,
+        base_time=args.base_time,
+    )
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+
+    print(f"✓ Rules parity with voting_rules verified")
+    print(f"Simulated in {elapsed:.2f}s ({args.rounds / elapsed:,.0f} rounds/s)")
+    print("-" * 60)
+    print(f"Never started (no K/L vote): {summary['never_started']:,}")
+    print(f"Round length: mean {summary['length_mean']:.1f}s | " + " | ".join(
+        f"p{p} {v:.0f}s" for p, v in summary['length_pct'].items()))
+    print("Length histogram (10s buckets):")
+    for i, count in enumerate(summary['length_hist']):
+        if count:
+            print(f"  {i * 10:>3}-{i * 10 + 9:<3}s {count:>10,}")
+    print("Winner rates: " + " | ".join(
+        f"{code.upper()} {rate * 100:.1f}%" for code, rate in summary['winner_rates'].items()))
+    print(f"Claimant churn: mean {summary['churn_mean']:.2f} | p95 {summary['churn_p95']:.0f} per round")
+    print(f"Votes per round: mean {summary['votes_mean']:.1f}")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -49,7 +49,71 @@ socket.on('admin_state_update', function(data) {
         document.getElementById('camera-mode').textContent = data.camera_mode;
     }
     if (data.connected_clients !== undefined) {
-        document.getElementById('client-count').textContent = data.connected_clients;
+        const countEl = document.getElementById('client-count');
+        countEl.textContent = data.connected_clients;
+        if (data.client_roles) {
+            countEl.title = Object.entries(data.client_roles)
+                .map(([role, count]) => `${role}: ${count}`).join(', ');
+        }
+    }
+});
+
+// Action log (newest first). The server sends the newest page on join,
+// then only entries added since; older pages are fetched with "Older".
+const ACTION_LOG_CLIENT_MAX = 500;   // Entries kept in the page (oldest trimmed)
+let actionLogNewestId = 0;
+
+function actionLogItem(entry) {
+    const item = document.createElement('li');
+    item.className = 'admin-log__entry';
+    item.dataset.id = entry.id;
+    const time = document.createElement('span');
+    time.className = 'admin-log__time';
+    time.textContent = entry.time;
+    item.append(time, entry.details ? `${entry.action}: ${entry.details}` : entry.action);
+    return item;
+}
+
+function setActionLogHasMore(hasMore) {
+    document.getElementById('action-log-older').hidden = !hasMore;
+}
+
+function loadOlderActions() {
+    const list = document.getElementById('action-log');
+    const oldest = list.lastElementChild;
+    const request = oldest ? {before: Number(oldest.dataset.id)} : {};
+    socket.emit('action_log_page', request, function(page) {
+        if (!page || !page.entries) return;
+        // Entries arrive oldest first; append newest-to-oldest below the current list
+        for (let i = page.entries.length - 1; i >= 0; i--) {
+            list.append(actionLogItem(page.entries[i]));
+        }
+        setActionLogHasMore(page.has_more);
+    });
+}
+
+socket.on('action_log', function(data) {
+    const list = document.getElementById('action-log');
+    if (!list) return;
+    if (data.reset) {
+        list.replaceChildren();
+        actionLogNewestId = 0;
+        setActionLogHasMore(data.has_more);
+    }
+    let newest = null;
+    for (const entry of data.entries) {
+        if (entry.id <= actionLogNewestId) continue;   // Already shown (join snapshot overlap)
+        list.prepend(actionLogItem(entry));
+        actionLogNewestId = entry.id;
+        newest = entry;
+    }
+    while (list.childElementCount > ACTION_LOG_CLIENT_MAX) {
+        list.lastElementChild.remove();
+        setActionLogHasMore(true);
+    }
+    if (newest) {
+        document.getElementById('last-action-display').textContent =
+            `${newest.action} @ ${newest.time}`;
     }
 });
 
@@ -63,9 +127,18 @@ socket.on('keypress_result', function(data) {
     }
 });
 
-// Vote update handler (from vote_manager)
-socket.on('vote_update', function(data) {
-    console.log('Vote update:', data);
+// Round action result handler (keypress executed off the timer thread)
+socket.on('action_result', function(data) {
+    console.log('Action result:', data);
+    const lastActionEl = document.getElementById('last-action-display');
+    if (lastActionEl) {
+        const status = data.success ? 'done' : `FAILED (${data.error})`;
+        lastActionEl.textContent = `${data.action.toUpperCase()} ${status} @ ${data.duration_ms}ms`;
+    }
+});
+
+// Vote state handler (from vote_manager, via voteSync)
+voteSync.onUpdate(function(data) {
 
     // Update admin panel vote counts
     const kCountEl = document.getElementById('admin-k-count');
@@ -77,7 +150,9 @@ socket.on('vote_update', function(data) {
     if (kCountEl) kCountEl.textContent = data.k_votes;
     if (lCountEl) lCountEl.textContent = data.l_votes;
     if (xCountEl) xCountEl.textContent = data.x_votes;
-    if (timerEl && data.time_remaining !== null) {
+    if (timerEl && data.round_held) {
+        timerEl.textContent = 'HELD (game missing)';
+    } else if (timerEl && data.time_remaining !== null) {
         timerEl.textContent = data.time_remaining + 's';
     }
     if (firstLEl) {
@@ -124,11 +124,10 @@ function drawPieChart(kVotes, lVotes, xVotes) {
 }
 
 /**
- * Handle vote updates from server
+ * Handle vote state updates from server (via voteSync)
  * Renders current state - no client-side state tracking
  */
-socket.on('vote_update', function(data) {
-    console.log('Vote update:', data);
+voteSync.onUpdate(function(data) {
 
     // Update vote counts
     const kCountEl = document.getElementById('k-count');
@@ -194,5 +193,17 @@ socket.on('vote_update', function(data) {
     }
 });
 
+/**
+ * Handle round action results (keypress executed after round resolution)
+ * Logged only - the next round's state arrives via voteSync immediately
+ */
+socket.on('action_result', function(data) {
+    if (data.success) {
+        console.log(`Action ${data.action.toUpperCase()} executed (${data.duration_ms}ms)`);
+    } else {
+        console.error(`Action ${data.action.toUpperCase()} failed:`, data.error);
+    }
+});
+
 // Initial draw
 drawPieChart(0, 0, 0);
@@ -0,0 +1,74 @@
+/**
+ * Vote state sync - Versioned snapshot + patch protocol
+ *
+ * Server sends a full snapshot as vote_update (on join / resync) and
+ * only changed fields as vote_patch {seq, changes}. Each patch bumps seq
+ * by one; a gap means a patch was missed, so a fresh snapshot is
+ * requested via vote_resync. Renderers subscribe with voteSync.onUpdate.
+ */
+
+const voteSync = (function() {
+    let state = null;
+    let seq = -1;
+    let resyncPending = false;
+    const listeners = [];
+
+    function notify() {
+        listeners.forEach(fn => fn(state));
+    }
+
+    function applySnapshot(snapshot) {
+        resyncPending = false;
+        if (!snapshot || snapshot.seq < seq) {
+            return; // Stale snapshot (newer patch already applied)
+        }
+        seq = snapshot.seq;
+        state = Object.assign({}, snapshot);
+        notify();
+    }
+
+    function requestResync() {
+        if (resyncPending) {
+            return;
+        }
+        resyncPending = true;
+        socket.emit('vote_resync', applySnapshot);
+    }
+
+    socket.on('vote_update', applySnapshot);
+
+    socket.on('vote_patch', function(patch) {
+        if (state === null || patch.seq > seq + 1) {
+            // Missed one or more patches - fetch full state
+            requestResync();
+            return;
+        }
+        if (patch.seq <= seq) {
+            return; // Already covered by a snapshot
+        }
+        seq = patch.seq;
+        Object.assign(state, patch.changes);
+        notify();
+    });
+
+    socket.on('disconnect', function() {
+        // Server sends a fresh snapshot when the page re-joins after
+        // reconnecting. Its seq restarts at 0 if the server restarted, so
+        // forget ours: any snapshot after a reconnect is accepted.
+        resyncPending = false;
+        seq = -1;
+        state = null;
+    });
+
+    return {
+        onUpdate: function(fn) {
+            listeners.push(fn);
+            if (state !== null) {
+                fn(state);
+            }
+        },
+        getState: function() {
+            return state;
+        }
+    };
+})();
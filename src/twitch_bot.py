@@ -7,6 +7,10 @@ Passes vote data to the vote manager for tracking and resolution.
 """
 
 import asyncio
+import json
+import os
+import time
+import aiohttp
 import requests
 import socketio
 from twitchio.ext import commands
@@ -14,6 +18,100 @@ from twitchio import eventsub, eventsub_
 from datetime import datetime
 import sys
 
+from .oauth_flow import TokenManager, get_token
+from .serving import packet_serializer, SOCKETIO_PATHS
+from .vote_delivery import VoteOutbox, VoteSender, OUTBOX_MAX_VOTES, BACKOFF_MIN, BACKOFF_MAX
+from .chat_sender import (
+    ChatSender, HELIX_URL, PRIORITY_RESULT, PRIORITY_REPLY, PRIORITY_UPDATE, PRIORITY_CTA,
+)
+
+VOTE_PROMPT = "Vote: k (kill) | l (lay) | x (extend)"
+
+# Resolved login -> user ID cache (logins can be renamed, so entries expire)
+USER_ID_CACHE = 'data/twitch_user_ids.json'
+USER_ID_TTL = 7 * 24 * 3600
+
+
+class StartupTimer:
+    """Wall-clock timings of startup phases, reported once the bot is listening."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self._open = {}
+
+    def now(self):
+        """Milliseconds since startup began."""
+        return (time.perf_counter() - self.started) * 1000
+
+    def begin(self, name):
+        """Mark the start of a phase."""
+        self._open[name] = self.now()
+
+    def end(self, name, detail=""):
+        """Mark the end of a phase started with begin()."""
+        if name in self._open:
+            self.phases.append((name, self._open.pop(name), self.now(), detail))
+
+    def report(self):
+        """Print each phase's start/end offsets and the total."""
+        print("Startup timing (ms since start):")
+        for name, start, end, detail in self.phases:
+            suffix = f"  ({detail})" if detail else ""
+            print(f"  {name:<14}{start:8.1f} → {end:8.1f}{suffix}")
+        print(f"✓ Listening {self.now():.0f}ms after start")
+
+
+async def fetch_socketio_config(flask_url):
+    """
+    Get the packet serializers the Flask server accepts.
+
+    Servers without /socketio-config only speak JSON on the default path.
+
+    Returns:
+        dict: {'serializers': {name: Socket.IO path, ...}, ...}
+    """
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
+            async with session.get(f"{flask_url}/socketio-config") as response:
+                if response.status == 404:
+                    return {'serializers': {'json': SOCKETIO_PATHS['json']}}
+                response.raise_for_status()
+                return await response.json()
+    except aiohttp.ClientError as e:
+        raise RuntimeError(f"Flask server unreachable at {flask_url}: {e}")
+
+
+async def connect_flask(flask_url, serializer='json'):
+    """
+    Open the socket.io link to Flask and fetch enabled actions.
+
+    Needs no Twitch credentials, so it can run while the bot authenticates.
+
+    Args:
+        flask_url: Flask server URL
+        serializer: Preferred packet serializer ('json' or 'msgpack');
+            JSON is used if the server does not offer it
+
+    Returns:
+        tuple: (socketio.AsyncClient, list of enabled action codes)
+    """
+    offered = (await fetch_socketio_config(flask_url)).get('serializers') or {'json': SOCKETIO_PATHS['json']}
+    if serializer not in offered:
+        print(f"⚠ Flask server does not offer {serializer} packets, using json")
+        serializer = 'json'
+    sio = socketio.AsyncClient(
+        reconnection=True,
+        reconnection_attempts=0,  # Retry forever
+        reconnection_delay=BACKOFF_MIN,
+        reconnection_delay_max=BACKOFF_MAX,
+        serializer=packet_serializer(serializer),
+    )
+    # Websocket directly: no polling upgrade round trips
+    await sio.connect(flask_url, transports=['websocket'], socketio_path=offered[serializer])
+    actions = await sio.call('get_actions', timeout=5)
+    return sio, actions
+
 
 class SelectionBot(commands.AutoBot):
     """
@@ -25,7 +123,7 @@ class SelectionBot(commands.AutoBot):
     - x: Extend, keep watching (do nothing)
     """
 
-    def __init__(self, client_id, client_secret, bot_id, owner_id, channel_id, access_token, bot_username, flask_url="http://localhost:5000"):
+    def __init__(self, client_id, client_secret, bot_id, owner_id, channel_id, access_token, bot_username, flask_url="http://localhost:5000", vote_batch_ms=5, extra_channel_ids=None, outbox_path=None, outbox_size=OUTBOX_MAX_VOTES, helix_url=HELIX_URL, announce_rounds=True, cta_interval=60, startup=None, serializer='json'):
         """
         Initialize the TwitchIO EventSub bot.
 
@@ -35,9 +133,26 @@ class SelectionBot(commands.AutoBot):
             bot_id: Bot user ID (numeric, from Twitch)
             owner_id: Channel owner user ID (numeric) - same as bot_id for personal bot
             channel_id: Channel ID (numeric) to monitor chat in
-            access_token: User access token for sending messages
+            access_token: User access token for sending messages, or a
+                TokenManager (refreshed in the background once connected)
             bot_username: Bot's Twitch username (for filtering own messages)
             flask_url: Flask server URL for SocketIO connection
+            vote_batch_ms: Window for accumulating votes into one
+                vote_cast_batch call (0 = send as soon as the previous
+                send is acknowledged)
+            extra_channel_ids: Additional channel IDs to collect votes from
+                (the server routes each vote to the arena for its channel)
+            outbox_path: JSONL file holding undelivered votes across bot
+                restarts (None = memory only)
+            outbox_size: Maximum undelivered votes held while Flask is down
+            helix_url: Helix API base URL for chat sends
+            announce_rounds: Announce round openings and results in chat
+            cta_interval: Seconds without votes before a call to action
+                is posted (0 = never)
+            startup: StartupTimer holding earlier phases (auth, Flask);
+                the report is printed once chat events are subscribed
+            serializer: Preferred Socket.IO packet serializer for Flask
+                ('json' or 'msgpack', used if the server offers it)
         """
         # Initialize with EventSub support
         super().__init__(
@@ -49,6 +164,7 @@ class SelectionBot(commands.AutoBot):
             force_subscribe=True,  # Auto-subscribe to EventSub events
         )
         self.channel_id = channel_id
+        self.channel_ids = [channel_id] + [c for c in (extra_channel_ids or []) if c != channel_id]
         self.start_time = datetime.now()
         self.votes_received = 0
         self.messages_received = 0
@@ -58,45 +174,84 @@ class SelectionBot(commands.AutoBot):
         self._access_token = access_token
         self._bot_username = bot_username.lower()
         self._flask_url = flask_url
+        self._serializer = serializer
 
         # SocketIO client (will be initialized in connect_to_flask)
         self.sio = None
         self.valid_actions = set()
 
-    async def connect_to_flask(self):
+        # Outbound votes: held until Flask acknowledges them, replayed after reconnects
+        self._vote_batch_window = vote_batch_ms / 1000
+        self.outbox = VoteOutbox(outbox_size, outbox_path, on_drop=self._forget_vote)
+        self.vote_sender = None      # Started by connect_to_flask
+
+        # Outbound chat: prioritised, rate-limited, sent from a pooled async session
+        renew = access_token.renew if isinstance(access_token, TokenManager) else None
+        self.chat = ChatSender(client_id, access_token, bot_id, channel_id, helix_url, on_unauthorized=renew)
+        self.announce_rounds = announce_rounds
+        self.cta_interval = cta_interval
+        self._last_vote_time = time.monotonic()
+
+        # Per-round duplicate-vote suppression (synced to server round IDs)
+        self._channel_arenas = {}    # channel_id -> arena namespace
+        self._round_ids = {}         # namespace -> current round ID
+        self._last_votes = {}        # namespace -> {user_id: (vote, username)} forwarded this round
+        self.votes_suppressed = 0
+
+        # Startup phase timings (reported once listening)
+        self.startup = startup or StartupTimer()
+
+    async def connect_to_flask(self, connection=None):
         """
         Connect to Flask server via SocketIO and fetch enabled actions.
 
         This MUST succeed before connecting to Twitch.
-        Exits immediately if connection fails.
+        Exits immediately if connection fails. Later disconnects (e.g. a
+        Flask restart) are retried with backoff; votes are held in the
+        outbox meanwhile and replayed once reconnected.
+
+        Args:
+            connection: (sio, actions) from connect_flask(), or the exception
+                it raised, if the link was opened concurrently with
+                authentication (None = connect now)
         """
         print("=" * 60)
         print("Connecting to Flask server...")
         print("=" * 60)
 
         try:
-            # Create async SocketIO client
-            self.sio = socketio.AsyncClient()
-
-            # Connect to Flask
-            print(f"Connecting to {self._flask_url}...")
-            await self.sio.connect(self._flask_url)
-            print("✓ Connected to Flask server")
-
-            # Fetch enabled actions
-            print("Fetching enabled actions...")
-            actions = await self.sio.call('get_actions', timeout=5)
+            if connection is None:
+                print(f"Connecting to {self._flask_url}...")
+                connection = await connect_flask(self._flask_url, self._serializer)
+            if isinstance(connection, BaseException):
+                raise connection
+            self.sio, actions = connection
+            print(f"✓ Connected to Flask server ({self._flask_url})")
+
+            self.sio.on('connect', self._on_flask_connect)
+            self.sio.on('disconnect', self._on_flask_disconnect)
+            self.sio.on('round_started', self._on_round_started)
+            self.sio.on('vote_revoked', self._on_vote_revoked)
+            self.sio.on('round_opened', self._on_round_opened)
+            self.sio.on('round_result', self._on_round_result)
+
+            self.startup.begin("flask sync")
             self.valid_actions = set(actions)
             print(f"✓ Loaded {len(self.valid_actions)} valid actions: {sorted(self.valid_actions)}")
 
+            # Sync round IDs for duplicate-vote suppression
+            await self._sync_rounds()
+            print(f"✓ Synced rounds for {len(self._round_ids)} arena(s)")
+
             # Send bot connection status
-            await self.sio.emit('bot_connected', {
-                'bot_id': self.bot_id,
-                'bot_username': self._bot_username,
-                'timestamp': datetime.now().isoformat()
-            })
+            await self.sio.emit('bot_connected', self._bot_status())
             print("✓ Bot status sent to Flask")
 
+            # Start vote delivery (flushes votes left in the outbox file)
+            self.vote_sender = VoteSender(self.sio, self.outbox, self._vote_batch_window)
+            self.vote_sender.start()
+            self.startup.end("flask sync")
+
             print("=" * 60)
             return True
 
@@ -108,33 +263,131 @@ class SelectionBot(commands.AutoBot):
             print("=" * 60)
             sys.exit(1)
 
+    def _bot_status(self):
+        """Payload for the bot_connected event."""
+        return {
+            'bot_id': self.bot_id,
+            'bot_username': self._bot_username,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    async def _on_flask_connect(self):
+        """Reconnected to Flask: resync rounds and deliver held votes."""
+        if self.vote_sender is None:
+            return  # Initial connect - connect_to_flask does the setup
+        print(f"✓ Reconnected to Flask server ({len(self.outbox)} vote(s) held)")
+        asyncio.create_task(self._resync_after_reconnect())
+
+    async def _resync_after_reconnect(self):
+        try:
+            await self._sync_rounds()
+            await self.sio.emit('bot_connected', self._bot_status())
+        except Exception as e:
+            print(f"⚠ Resync after reconnect failed: {e}")
+        self.vote_sender.wake()
+
+    async def _on_flask_disconnect(self, reason=None):
+        """Lost Flask: votes stay in the outbox until the client reconnects."""
+        print(f"⚠ Disconnected from Flask server ({reason or 'connection lost'}) - holding votes, reconnecting")
+
+    async def _sync_rounds(self):
+        """Join the bot room, map our channels to server arenas and start a fresh duplicate-vote cache."""
+        await self.sio.call('join', {'role': 'bot'}, timeout=5)  # Round notices go to the bot room only
+        arenas = await self.sio.call('get_rounds', timeout=5)
+        default = next((arena['namespace'] for arena in arenas if arena['default']), None)
+        by_channel = {
+            channel_id: arena['namespace']
+            for arena in arenas for channel_id in arena['channel_ids']
+        }
+        self._channel_arenas = {
+            str(channel_id): by_channel.get(str(channel_id), default) for channel_id in self.channel_ids
+        }
+        self._round_ids = {arena['namespace']: arena['round_id'] for arena in arenas}
+        self._last_votes = {namespace: {} for namespace in self._round_ids}
+
+    async def _on_round_started(self, data):
+        """Server started a new round: forget last round's votes for that arena."""
+        namespace = data.get('namespace')
+        if self._round_ids.get(namespace) != data.get('round_id'):
+            self._round_ids[namespace] = data.get('round_id')
+            self._last_votes[namespace] = {}
+
+    async def _on_vote_revoked(self, data):
+        """Server removed a vote (admin): forward that voter's next vote again."""
+        last_votes = self._last_votes.get(data.get('namespace'))
+        if last_votes is not None:
+            last_votes.pop(data.get('voter_id'), None)
+
+    def _is_repeat_vote(self, channel_id, user_id, username, vote):
+        """
+        Check a vote against this round's last forwarded vote per user.
+
+        The server keeps each user's latest vote, so repeating a K or X
+        (same name) within a round changes nothing there and need not be
+        sent. A repeated L is always sent: the server re-stamps it, which
+        moves the voter to the back of the claim queue.
+
+        Returns:
+            bool: True if the vote can be dropped
+        """
+        if vote == 'l':
+            return False
+        last_votes = self._last_votes.get(self._channel_arenas.get(channel_id))
+        if last_votes is None:
+            return False  # Arena unknown (not synced yet) - forward everything
+        return last_votes.get(user_id) == (vote, username)
+
+    def _remember_vote(self, vote):
+        """Record a vote the outbox accepted as the user's last forwarded vote."""
+        last_votes = self._last_votes.get(self._channel_arenas.get(vote['channel_id']))
+        if last_votes is not None:
+            last_votes[vote['user_id']] = (vote['vote'], vote['username'])
+
+    def _forget_vote(self, vote):
+        """Outbox dropped an undelivered vote: forward that user's next repeat again."""
+        last_votes = self._last_votes.get(self._channel_arenas.get(vote.get('channel_id')))
+        if last_votes is not None and last_votes.get(vote.get('user_id')) == (vote.get('vote'), vote.get('username')):
+            del last_votes[vote['user_id']]
+
     async def event_ready(self):
         """Called when bot connects to Twitch EventSub."""
+        self.startup.end("twitch login")
         print(f"\n{'='*60}")
         print(f"TwitchIO EventSub Bot Connected!")
         print(f"{'='*60}")
         print(f"Bot ID: {self.bot_id}")
         print(f"Channel ID: {self.channel_id}")
+        if len(self.channel_ids) > 1:
+            print(f"Extra channel IDs: {', '.join(self.channel_ids[1:])}")
         print(f"Connected at: {self.start_time.strftime('%H:%M:%S')}")
         print(f"\nListening for commands: k (kill), l (lay), x (extend)")
         print(f"{'='*60}\n")
 
-        # Subscribe to chat messages for our channel
+        # Subscribe to chat messages for our channel(s)
         try:
             subs = [
                 eventsub.ChatMessageSubscription(
-                    broadcaster_user_id=self.channel_id,
+                    broadcaster_user_id=channel_id,
                     user_id=self.bot_id
-                ),
+                )
+                for channel_id in self.channel_ids
             ]
+            self.startup.begin("subscribe")
             await self.multi_subscribe(subs)
+            self.startup.end("subscribe", f"{len(subs)} channel(s)")
             print("✓ Subscribed to chat message events")
         except Exception as e:
             print(f"✗ Failed to subscribe to EventSub: {e}")
             raise
+        self.startup.report()
 
-        # Start heartbeat task
+        # Start token refresh, chat sender, heartbeat and call-to-action tasks
+        if isinstance(self._access_token, TokenManager):
+            self._access_token.start()
+        self.chat.start()
         asyncio.create_task(self._heartbeat())
+        if self.cta_interval > 0:
+            asyncio.create_task(self._call_to_action())
 
         # Send startup announcement to chat
         asyncio.create_task(self._send_startup_announcement())
@@ -170,19 +423,25 @@ class SelectionBot(commands.AutoBot):
         # Check if message is a valid vote command
         if text_lower in self.valid_actions:
             self.votes_received += 1
+            self._last_vote_time = time.monotonic()
+
+            # Drop exact repeats within the round before they reach Flask
+            if self._is_repeat_vote(payload.broadcaster.id, payload.chatter.id, username, text_lower):
+                self.votes_suppressed += 1
+                return
 
             # Log vote (highlighted)
             print(f"  → VOTE: {text_lower.upper()}")
 
-            # Send vote to Flask via SocketIO
-            try:
-                await self.sio.emit('vote_cast', {
-                    'username': username,
-                    'vote': text_lower,
-                    'timestamp': datetime.now().isoformat()
-                })
-            except Exception as e:
-                print(f"  ⚠ Failed to send vote to Flask: {e}")
+            # Send vote to Flask via SocketIO (batched, held while disconnected)
+            vote = self.vote_sender.send({
+                'username': username,
+                'user_id': payload.chatter.id,
+                'channel_id': payload.broadcaster.id,
+                'vote': text_lower,
+                'timestamp': datetime.now().isoformat()
+            })
+            self._remember_vote(vote)
 
     async def event_error(self, error, data=None):
         """Handle bot errors - print details and crash."""
@@ -220,95 +479,287 @@ class SelectionBot(commands.AutoBot):
         # Wait a moment for EventSub to be fully ready
         await asyncio.sleep(2)
 
-        try:
-            # Send message using Twitch API (EventSub doesn't send via WebSocket)
-            # We'll use the chat send endpoint
-            url = "https://api.twitch.tv/helix/chat/messages"
-            headers = {
-                "Client-ID": self._client_id,
-                "Authorization": f"Bearer {self._access_token}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "broadcaster_id": self.channel_id,
-                "sender_id": self.bot_id,
-                "message": "Selection Protocol online. Democracy initialized. Vote: k (kill) | l (lay) | x (extend)"
-            }
-
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
+        # Sent through the chat queue (Helix POST, never blocks EventSub handling)
+        message = f"Selection Protocol online. Democracy initialized. {VOTE_PROMPT}"
+        if not await self.chat.send(message, PRIORITY_UPDATE):
+            print("⚠ Failed to send startup announcement")
+            print("  Bot will continue (receiving still works)")
+            return
 
-            print("✓ Startup announcement sent to chat")
+        print("✓ Startup announcement sent to chat")
 
-            # Wait up to 5 seconds for verification
-            for i in range(50):
-                if self.startup_message_verified:
-                    break
-                await asyncio.sleep(0.1)
+        # Wait up to 5 seconds for verification
+        for i in range(50):
+            if self.startup_message_verified:
+                break
+            await asyncio.sleep(0.1)
 
-            if not self.startup_message_verified:
-                print("⚠ Startup message not verified (didn't see reflection in 5s)")
-                print("  Chat sending may work, but EventSub reflection not confirmed")
-        except Exception as e:
-            print(f"⚠ Failed to send startup announcement: {e}")
-            print("  Bot will continue (receiving still works)")
+        if not self.startup_message_verified:
+            print("⚠ Startup message not verified (didn't see reflection in 5s)")
+            print("  Chat sending may work, but EventSub reflection not confirmed")
+
+    def _arena_channel(self, namespace):
+        """Our first channel whose votes go to an arena (None if we have none)."""
+        return next(
+            (channel_id for channel_id, ns in self._channel_arenas.items() if ns == namespace), None
+        )
+
+    async def _on_round_opened(self, data):
+        """Announce who opened voting (first K/L vote of a round)."""
+        channel_id = self._arena_channel(data.get('namespace'))
+        if not self.announce_rounds or channel_id is None:
+            return
+        self.chat.send(
+            f"Voting opened by {data.get('username')}: {str(data.get('vote')).upper()}. {VOTE_PROMPT}",
+            PRIORITY_UPDATE, key=('opened', channel_id), ttl=20, channel_id=channel_id
+        )
+
+    async def _on_round_result(self, data):
+        """Announce a round outcome (replaces an unsent older result)."""
+        channel_id = self._arena_channel(data.get('namespace'))
+        if not self.announce_rounds or channel_id is None:
+            return
+        counts = data.get('counts') or {}
+        tally = f"K {counts.get('k', 0)} / L {counts.get('l', 0)} / X {counts.get('x', 0)}"
+        winner = data.get('winner')
+        if winner == 'k':
+            outcome = "K wins - bibite killed"
+        elif winner == 'l':
+            outcome = f"L wins - egg laid, lineage claimed by {data.get('claimant') or 'nobody'}"
+        else:
+            outcome = "X wins - we keep watching"
+        self.chat.send(
+            f"Round {data.get('round_id')}: {outcome} ({tally})",
+            PRIORITY_RESULT, key=('result', channel_id), ttl=60, channel_id=channel_id
+        )
+
+    async def _call_to_action(self):
+        """Post a vote prompt when chat has been quiet for cta_interval seconds."""
+        while True:
+            await asyncio.sleep(self.cta_interval)
+            if time.monotonic() - self._last_vote_time >= self.cta_interval:
+                self.chat.send(f"The bibites await judgement. {VOTE_PROMPT}",
+                               PRIORITY_CTA, key='cta', ttl=self.cta_interval)
 
     async def _heartbeat(self):
         """Print periodic stats to show bot is alive."""
         while True:
             await asyncio.sleep(10)
             uptime = (datetime.now() - self.start_time).seconds
-            print(f"[Heartbeat] Uptime: {uptime}s | Messages: {self.messages_received} | Votes: {self.votes_received}")
+            print(
+                f"[Heartbeat] Uptime: {uptime}s | Messages: {self.messages_received} | "
+                f"Votes: {self.votes_received} | Repeats suppressed: {self.votes_suppressed} | "
+                f"Outbox: {len(self.outbox)} held, {self.outbox.dropped} dropped | "
+                f"Chat: {self.chat.sent} sent, {self.chat.dropped + self.chat.failed} dropped, "
+                f"{self.chat.pending()} queued"
+            )
 
     @commands.command(name='lineage')
     async def lineage_command(self, ctx):
-        """Show user's lineage stats (future implementation)."""
+        """Show the user's lineage claims, rank and vote participation."""
         username = ctx.author.name
-        await ctx.send(f"@{username} Lineage tracking coming soon! 🔥")
+        try:
+            reply = await self.sio.call('leaderboard_lineage', {
+                'user_id': str(ctx.author.id),
+                'username': username,
+            }, timeout=5)
+        except Exception as e:
+            print(f"⚠ Leaderboard lookup failed: {e}")
+            reply = f"@{username} Lineage stats unavailable right now"
+        self.chat.send(reply, PRIORITY_REPLY, key=('lineage', username), ttl=15,
+                       channel_id=ctx.broadcaster.id)
 
     @commands.command(name='stats')
     async def stats_command(self, ctx):
-        """Show overall voting stats (future implementation)."""
-        await ctx.send(f"Stats: {self.votes_received} votes received since bot started.")
+        """Show the lineage leaderboard and round totals."""
+        try:
+            reply = await self.sio.call('leaderboard_stats', timeout=5)
+        except Exception as e:
+            print(f"⚠ Leaderboard lookup failed: {e}")
+            reply = f"Stats: {self.votes_received} votes received since bot started."
+        # Repeated !stats while one is queued collapse into a single message
+        self.chat.send(reply, PRIORITY_REPLY, key=('stats', ctx.broadcaster.id), ttl=15,
+                       channel_id=ctx.broadcaster.id)
 
 
-def get_user_id(username, client_id, token):
+def _load_user_id_cache(cache_file, ttl):
+    """Load unexpired login -> ID entries from the cache file."""
+    try:
+        with open(cache_file) as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    now = time.time()
+    return {
+        login: entry for login, entry in entries.items()
+        if isinstance(entry, dict) and now - entry.get('resolved_at', 0) < ttl
+    }
+
+
+def _save_user_id_cache(cache_file, entries):
+    """Write the cache atomically (a crash mid-write leaves the old file)."""
+    directory = os.path.dirname(cache_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{cache_file}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp, cache_file)
+
+
+def resolve_user_ids(logins, client_id, token, helix_url=HELIX_URL, cache_file=USER_ID_CACHE, ttl=USER_ID_TTL):
+    """
+    Get numeric user IDs for several usernames.
+
+    Cached IDs younger than ttl are used as-is; the rest are fetched in a
+    single Helix "Get Users" request (up to 100 logins each) and cached.
+
+    Args:
+        logins: Twitch usernames
+        client_id: Application client ID
+        token: OAuth access token (without 'oauth:' prefix)
+        helix_url: Helix API base URL
+        cache_file: JSON cache of resolved IDs (None = no cache)
+        ttl: Seconds a cached ID is trusted
+
+    Returns:
+        dict: Lowercase username -> numeric user ID string
+
+    Raises:
+        ValueError: If a username does not exist
+    """
+    wanted = list(dict.fromkeys(login.lower() for login in logins))
+    cached = _load_user_id_cache(cache_file, ttl) if cache_file else {}
+    ids = {login: cached[login]['id'] for login in wanted if login in cached}
+    missing = [login for login in wanted if login not in ids]
+
+    if missing:
+        headers = {
+            "Client-ID": client_id,
+            "Authorization": f"Bearer {token}"
+        }
+        for i in range(0, len(missing), 100):
+            chunk = missing[i:i + 100]
+            response = requests.get(
+                f"{helix_url.rstrip('/')}/users",
+                params=[('login', login) for login in chunk],
+                headers=headers,
+                timeout=10,
+            )
+            response.raise_for_status()
+            for user in response.json().get("data", []):
+                login = user["login"].lower()
+                ids[login] = user["id"]
+                cached[login] = {'id': user["id"], 'resolved_at': time.time()}
+
+        unknown = [login for login in missing if login not in ids]
+        if unknown:
+            raise ValueError(f"User(s) not found: {', '.join(unknown)}")
+        if cache_file:
+            _save_user_id_cache(cache_file, cached)
+
+    return ids
+
+
+def get_user_id(username, client_id, token, helix_url=HELIX_URL, cache_file=USER_ID_CACHE):
     """
-    Get numeric user ID from username using Twitch API.
+    Get numeric user ID from username using Twitch API (cached).
 
     Args:
         username: Twitch username
         client_id: Application client ID
         token: OAuth access token (without 'oauth:' prefix)
+        helix_url: Helix API base URL
+        cache_file: JSON cache of resolved IDs (None = no cache)
 
     Returns:
         Numeric user ID string
     """
-    url = f"https://api.twitch.tv/helix/users?login={username}"
-    headers = {
-        "Client-ID": client_id,
-        "Authorization": f"Bearer {token}"
-    }
+    return resolve_user_ids([username], client_id, token, helix_url, cache_file)[username.lower()]
+
+
+def authenticate(client_id, client_secret, logins, helix_url=HELIX_URL, startup=None):
+    """
+    Get a user access token and resolve user IDs (blocking).
+
+    Args:
+        client_id: Application client ID
+        client_secret: Application client secret
+        logins: Usernames to resolve (bot, channel, extra channels)
+        helix_url: Helix API base URL
+        startup: StartupTimer to record phases in (optional)
+
+    Returns:
+        tuple: (TokenManager, dict of lowercase username -> user ID)
+    """
+    startup = startup or StartupTimer()
+
+    startup.begin("auth")
+    if not get_token(client_id, client_secret):
+        raise RuntimeError("Failed to get access token")
+    token = TokenManager(client_id, client_secret)
+    startup.end("auth")
+
+    startup.begin("user IDs")
+    cached = _load_user_id_cache(USER_ID_CACHE, USER_ID_TTL)
+    fetched = len({login.lower() for login in logins} - cached.keys())
+    ids = resolve_user_ids(logins, client_id, token(), helix_url)
+    startup.end("user IDs", f"{len(ids) - fetched} cached, {fetched} fetched")
+    return token, ids
 
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
 
-    data = response.json()
-    if not data.get("data"):
-        raise ValueError(f"User '{username}' not found")
+async def prepare_startup(client_id, client_secret, logins, flask_url, helix_url=HELIX_URL, startup=None, serializer='json'):
+    """
+    Authenticate with Twitch and connect to Flask concurrently.
 
-    return data["data"][0]["id"]
+    Twitch auth (token cache / refresh, user ID lookup) runs in a worker
+    thread while the socket.io link to Flask is opened on the event loop.
 
+    Args:
+        client_id: Application client ID
+        client_secret: Application client secret
+        logins: Usernames to resolve
+        flask_url: Flask server URL
+        helix_url: Helix API base URL
+        startup: StartupTimer to record phases in (optional)
+        serializer: Preferred Socket.IO packet serializer for Flask
 
-async def run_bot(client_id, client_secret, bot_id, owner_id, channel_id, access_token, bot_username, flask_url="http://localhost:5000"):
+    Returns:
+        tuple: (TokenManager, dict of username -> user ID, Flask connection
+            for SelectionBot.connect_to_flask, or the exception if Flask
+            could not be reached)
+    """
+    startup = startup or StartupTimer()
+
+    async def flask():
+        startup.begin("flask")
+        connection = await connect_flask(flask_url, serializer)
+        startup.end("flask")
+        return connection
+
+    auth, connection = await asyncio.gather(
+        asyncio.to_thread(authenticate, client_id, client_secret, logins, helix_url, startup),
+        flask(),
+        return_exceptions=True,
+    )
+    if isinstance(auth, BaseException):
+        if not isinstance(connection, BaseException):
+            await connection[0].disconnect()
+        raise auth
+    token, ids = auth
+    return token, ids, connection
+
+
+async def run_bot(client_id, client_secret, bot_id, owner_id, channel_id, access_token, bot_username, flask_url="http://localhost:5000", vote_batch_ms=5, extra_channel_ids=None, outbox_path=None, helix_url=HELIX_URL, announce_rounds=True, cta_interval=60, connection=None, startup=None, serializer='json'):
     """
     Run the Twitch EventSub bot.
 
     Startup sequence:
-    1. Connect to Flask (exit if fail)
+    1. Connect to Flask (exit if fail) - already done if connection is
+       given (see prepare_startup)
     2. Fetch enabled actions (exit if fail)
     3. Connect to Twitch EventSub (exit if fail)
-    4. Report readiness
+    4. Report readiness and startup timings
     5. Announce to chat
 
     Args:
@@ -317,16 +768,31 @@ async def run_bot(client_id, client_secret, bot_id, owner_id, channel_id, access
         bot_id: Bot user ID (numeric)
         owner_id: Channel owner user ID (numeric)
         channel_id: Channel ID (numeric) to monitor
-        access_token: User access token for sending messages
+        access_token: User access token or TokenManager
         bot_username: Bot's Twitch username
         flask_url: Flask server URL
+        vote_batch_ms: Vote batching window in milliseconds
+        extra_channel_ids: Additional channel IDs to collect votes from
+        outbox_path: JSONL file for undelivered votes (None = memory only)
+        helix_url: Helix API base URL for chat sends
+        announce_rounds: Announce round openings and results in chat
+        cta_interval: Seconds without votes before a call to action (0 = never)
+        connection: Flask connection from prepare_startup (None = connect now)
+        startup: StartupTimer from prepare_startup (None = start timing now)
+        serializer: Preferred Socket.IO packet serializer for Flask
     """
-    bot = SelectionBot(client_id, client_secret, bot_id, owner_id, channel_id, access_token, bot_username, flask_url)
+    bot = SelectionBot(
+        client_id, client_secret, bot_id, owner_id, channel_id, access_token, bot_username,
+        flask_url, vote_batch_ms, extra_channel_ids, outbox_path,
+        helix_url=helix_url, announce_rounds=announce_rounds, cta_interval=cta_interval,
+        startup=startup, serializer=serializer,
+    )
 
     # Step 1: Connect to Flask (MUST succeed)
-    await bot.connect_to_flask()
+    await bot.connect_to_flask(connection)
 
     # Step 2: Connect to Twitch EventSub
+    bot.startup.begin("twitch login")
     await bot.start()
 
 
@@ -340,6 +806,8 @@ if __name__ == '__main__':
         python -m src.twitch_bot          # Run forever (daemon mode)
         python -m src.twitch_bot --test   # Run for 30s then exit (test mode)
     """
+    startup = StartupTimer()
+
     import yaml
     import sys
     from pathlib import Path
@@ -369,39 +837,46 @@ if __name__ == '__main__':
         config = yaml.safe_load(f)
 
     twitch_config = config['twitch']
+    vote_batch_ms = config.get('bot', {}).get('vote_batch_ms', 5)
+    outbox_path = config.get('bot', {}).get('outbox_path')
+    helix_url = twitch_config.get('helix_url', HELIX_URL)
+    announce_rounds = config.get('bot', {}).get('announce_rounds', True)
+    cta_interval = config.get('bot', {}).get('cta_interval', 60)
+    serializer = config.get('bot', {}).get('serializer', 'json')
 
     mode_str = "TEST MODE (30s then exit)" if test_mode else "DAEMON MODE (runs forever)"
     print(f"Starting TwitchIO EventSub bot in {mode_str}")
-    print("Getting user access token...")
+    print("Getting user access token and connecting to Flask...")
 
-    # Get user access token (from cache or OAuth flow)
-    try:
-        from .oauth_flow import get_token
-        token = get_token(
+    flask_url = 'http://localhost:5000'
+    nick = twitch_config['nick']
+    channel = twitch_config['channel']
+    extra_channels = twitch_config.get('extra_channels') or []
+
+    async def main():
+        # Twitch auth + user ID lookup (cached) overlap the Flask connection
+        token, user_ids, connection = await prepare_startup(
             twitch_config['client_id'],
-            twitch_config['client_secret']
+            twitch_config['client_secret'],
+            [nick, channel] + extra_channels,
+            flask_url,
+            helix_url,
+            startup,
+            serializer,
         )
-
-        if not token:
-            print("✗ Failed to get access token")
-            exit(1)
-
         print(f"✓ User access token obtained")
 
-        # Auto-fetch bot_id and channel_id from usernames
-        bot_id = get_user_id(
-            twitch_config['nick'],
-            twitch_config['client_id'],
-            token
-        )
-        print(f"✓ Bot ID obtained: {bot_id} (for user: {twitch_config['nick']})")
+        bot_id = user_ids[nick.lower()]
+        print(f"✓ Bot ID obtained: {bot_id} (for user: {nick})")
+        channel_id = user_ids[channel.lower()]
+        print(f"✓ Channel ID obtained: {channel_id} (for channel: {channel})")
 
-        channel_id = get_user_id(
-            twitch_config['channel'],
-            twitch_config['client_id'],
-            token
-        )
-        print(f"✓ Channel ID obtained: {channel_id} (for channel: {twitch_config['channel']})")
+        # Extra channels (votes routed to arenas by channel ID on the server)
+        extra_channel_ids = []
+        for extra_channel in extra_channels:
+            extra_id = user_ids[extra_channel.lower()]
+            extra_channel_ids.append(extra_id)
+            print(f"✓ Channel ID obtained: {extra_id} (for channel: {extra_channel})")
 
         # For personal bot, owner_id = bot_id
         owner_id = bot_id
@@ -410,52 +885,72 @@ if __name__ == '__main__':
             print(f"\nTest mode: Will run for 30 seconds then exit")
         print(f"\nType k, l, or x in chat to test command parsing\n")
 
-        # Run bot
-        if test_mode:
-            # Test mode: run for 30s then exit cleanly
-            async def run_test():
-                bot = SelectionBot(
-                    twitch_config['client_id'],
-                    twitch_config['client_secret'],
-                    bot_id,
-                    owner_id,
-                    channel_id,
-                    token,
-                    twitch_config['nick'],
-                    'http://localhost:5000'
-                )
-
-                # Step 1: Connect to Flask (MUST succeed)
-                await bot.connect_to_flask()
-
-                # Step 2: Start Twitch bot in background
-                bot_task = asyncio.create_task(bot.start())
-
-                # Wait 30 seconds
-                await asyncio.sleep(30)
-
-                # Clean shutdown
-                print(f"\n{'='*60}")
-                print("Test complete! Shutting down...")
-                print(f"{'='*60}\n")
-                await bot.close()
-                if bot.sio:
-                    await bot.sio.disconnect()
-                bot_task.cancel()
-
-            asyncio.run(run_test())
-        else:
+        if not test_mode:
             # Daemon mode: run forever
-            asyncio.run(run_bot(
+            await run_bot(
                 client_id=twitch_config['client_id'],
                 client_secret=twitch_config['client_secret'],
                 bot_id=bot_id,
                 owner_id=owner_id,
                 channel_id=channel_id,
                 access_token=token,
-                bot_username=twitch_config['nick'],
-                flask_url='http://localhost:5000'
-            ))
+                bot_username=nick,
+                flask_url=flask_url,
+                vote_batch_ms=vote_batch_ms,
+                extra_channel_ids=extra_channel_ids,
+                outbox_path=outbox_path,
+                helix_url=helix_url,
+                announce_rounds=announce_rounds,
+                cta_interval=cta_interval,
+                connection=connection,
+                startup=startup,
+                serializer=serializer,
+            )
+            return
+
+        # Test mode: run for 30s then exit cleanly
+        bot = SelectionBot(
+            twitch_config['client_id'],
+            twitch_config['client_secret'],
+            bot_id,
+            owner_id,
+            channel_id,
+            token,
+            nick,
+            flask_url,
+            vote_batch_ms,
+            extra_channel_ids,
+            outbox_path,
+            helix_url=helix_url,
+            announce_rounds=announce_rounds,
+            cta_interval=cta_interval,
+            startup=startup,
+            serializer=serializer,
+        )
+
+        # Step 1: Finish Flask setup (MUST succeed)
+        await bot.connect_to_flask(connection)
+
+        # Step 2: Start Twitch bot in background
+        startup.begin("twitch login")
+        bot_task = asyncio.create_task(bot.start())
+
+        # Wait 30 seconds
+        await asyncio.sleep(30)
+
+        # Clean shutdown
+        print(f"\n{'='*60}")
+        print("Test complete! Shutting down...")
+        print(f"{'='*60}\n")
+        await bot.close()
+        await bot.chat.close()
+        await token.close()
+        if bot.sio:
+            await bot.sio.disconnect()
+        bot_task.cancel()
+
+    try:
+        asyncio.run(main())
     except Exception as e:
         print(f"✗ Failed to initialize bot: {e}")
         print("\nCheck that your client_id, client_secret, and nick are correct")
@@ -0,0 +1,294 @@
+"""
+Reliable vote delivery between the Twitch bot and the Flask server.
+
+Bot side: VoteOutbox holds every vote until the server acknowledges it
+(bounded deque, optionally mirrored to a JSONL file so a bot restart
+keeps them too). VoteSender drains the outbox over socket.io with
+call(), batching whatever accumulated, and backs off while the link is
+down. Each vote carries a vote_id idempotency key and keeps its original
+chat timestamp, so replayed votes are ordered as they were cast.
+
+Server side: RecentVoteIds remembers recently applied vote_ids (LRU), so
+a replay after a lost acknowledgement is discarded instead of applied
+twice.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from pathlib import Path
+
+# Votes held while Flask is unreachable (oldest dropped beyond this)
+OUTBOX_MAX_VOTES = 20000
+
+# Reconnect / resend backoff (seconds)
+BACKOFF_MIN = 0.5
+BACKOFF_MAX = 10.0
+
+
+class VoteOutbox:
+    """
+    FIFO of unacknowledged votes.
+
+    With a path, every vote is appended to a JSONL file and acknowledged
+    (or dropped) votes are recorded as {"done": n} lines; the file is
+    compacted on load and whenever the outbox drains.
+    """
+
+    def __init__(self, maxlen=OUTBOX_MAX_VOTES, path=None, on_drop=None):
+        """
+        Initialize outbox (loads unacknowledged votes from path, if any).
+
+        Args:
+            maxlen: Maximum votes held (oldest dropped first)
+            path: JSONL file for votes that must survive a bot restart
+                (None = memory only)
+            on_drop: Called with each vote dropped for space (never delivered)
+        """
+        self.maxlen = maxlen
+        self.path = Path(path) if path else None
+        self.on_drop = on_drop
+        self.dropped = 0
+        self._votes = deque()
+        self._prefix = uuid.uuid4().hex[:12]
+        self._ids = itertools.count(1)
+        self._file = None
+        self._lines = 0           # Lines in the file since the last compaction
+
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def __len__(self):
+        return len(self._votes)
+
+    def add(self, vote):
+        """
+        Queue a vote, assigning its vote_id.
+
+        Args:
+            vote: Vote dict (username, user_id, channel_id, vote, timestamp)
+
+        Returns:
+            dict: The queued vote (with vote_id)
+        """
+        vote['vote_id'] = f"{self._prefix}-{next(self._ids)}"
+        if len(self._votes) >= self.maxlen:
+            dropped = self._votes.popleft()
+            self.dropped += 1
+            self._write({'done': 1})
+            if self.on_drop is not None:
+                self.on_drop(dropped)
+        self._votes.append(vote)
+        self._write(vote)
+        return vote
+
+    def peek(self, limit):
+        """Get up to limit oldest votes (not removed until ack)."""
+        return list(itertools.islice(self._votes, limit))
+
+    def ack(self, votes):
+        """
+        Remove delivered votes.
+
+        Args:
+            votes: Batch returned by peek() (some may already have been
+                dropped for space while it was in flight)
+        """
+        ids = {vote['vote_id'] for vote in votes}
+        removed = 0
+        while self._votes and self._votes[0]['vote_id'] in ids:
+            self._votes.popleft()
+            removed += 1
+        if self._file is not None and removed:
+            if not self._votes or self._lines > 2 * self.maxlen:
+                self._compact()
+            else:
+                self._write({'done': removed})
+
+    # ------------------------------------------------------------
+    # Disk mirror
+    # ------------------------------------------------------------
+
+    def _write(self, entry):
+        if self._file is not None:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            self._lines += 1
+
+    def _load(self):
+        """Restore unacknowledged votes from the file, then compact it."""
+        votes = []
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn final line from a crash mid-write
+                    if 'done' in entry:
+                        del votes[:entry['done']]
+                    else:
+                        votes.append(entry)
+        self._votes.extend(votes[-self.maxlen:])
+        if self._votes:
+            print(f"✓ Outbox: {len(self._votes)} undelivered vote(s) loaded from {self.path}")
+        self._compact()
+
+    def _compact(self):
+        """Rewrite the file with only the pending votes."""
+        if self._file is not None:
+            self._file.close()
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            f.write(''.join(json.dumps(vote) + '\n' for vote in self._votes))
+        os.replace(tmp, self.path)
+        self._file = open(self.path, 'a')
+        self._lines = len(self._votes)
+
+
+class VoteSender:
+    """
+    Drains a VoteOutbox to the server over an AsyncClient.
+
+    Votes are removed from the outbox only after the server's handler
+    returns, so anything in flight when the link drops is resent after
+    reconnecting.
+    """
+
+    def __init__(self, sio, outbox, batch_window=0.005, max_batch=500, timeout=5):
+        """
+        Initialize sender (call start() from the event loop).
+
+        Args:
+            sio: socketio.AsyncClient (reconnects on its own)
+            outbox: VoteOutbox to drain
+            batch_window: Seconds to let votes accumulate before sending
+                (0 = send as soon as the previous send is acknowledged)
+            max_batch: Maximum votes per vote_cast_batch
+            timeout: Seconds to wait for the server's acknowledgement
+        """
+        self.sio = sio
+        self.outbox = outbox
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.sent = 0
+        self.failures = 0
+        self._wake = asyncio.Event()     # Votes pending
+        self._retry = asyncio.Event()    # Cut the current backoff short
+        self._task = None
+
+    def start(self):
+        """Start the send loop (also flushes votes loaded from disk)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if len(self.outbox):
+            self._wake.set()
+
+    def send(self, vote):
+        """
+        Queue a vote for delivery and return immediately.
+
+        Returns:
+            dict: The queued vote (with vote_id)
+        """
+        vote = self.outbox.add(vote)
+        self._wake.set()
+        return vote
+
+    def wake(self):
+        """Retry now (e.g. right after a reconnect) instead of waiting out the backoff."""
+        self._retry.set()
+        self._wake.set()
+
+    async def _run(self):
+        """Send loop: peek a batch, call, ack; back off while the server is unreachable."""
+        delay = BACKOFF_MIN
+        while True:
+            await self._wake.wait()
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+
+            batch = self.outbox.peek(self.max_batch)
+            if not batch:
+                self._wake.clear()
+                continue
+
+            try:
+                if not self.sio.connected:
+                    raise ConnectionError("not connected")
+                if len(batch) == 1:
+                    await self.sio.call('vote_cast', batch[0], timeout=self.timeout)
+                else:
+                    await self.sio.call('vote_cast_batch', {'votes': batch}, timeout=self.timeout)
+            except Exception as e:
+                if delay == BACKOFF_MIN:
+                    print(f"  ⚠ Flask unreachable ({str(e) or type(e).__name__}) - holding {len(self.outbox)} vote(s)")
+                self.failures += 1
+                self._retry.clear()
+                try:
+                    await asyncio.wait_for(self._retry.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, BACKOFF_MAX)
+                continue
+
+            if delay != BACKOFF_MIN:
+                print(f"  ✓ Flask reachable again - delivering {len(self.outbox)} held vote(s)")
+                delay = BACKOFF_MIN
+            self.outbox.ack(batch)
+            self.sent += len(batch)
+            if not len(self.outbox):
+                self._wake.clear()
+
+
+class RecentVoteIds:
+    """
+    Thread-safe LRU of applied vote_ids (server side).
+
+    Votes without a vote_id (older bots) are always treated as new.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.duplicates = 0
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def filter_new(self, votes):
+        """
+        Keep votes whose vote_id has not been seen, and remember them.
+
+        Args:
+            votes: Vote dicts (optionally with 'vote_id')
+
+        Returns:
+            list: Votes to apply, in order
+        """
+        fresh = []
+        with self._lock:
+            for vote in votes:
+                vote_id = vote.get('vote_id')
+                if vote_id is None:
+                    fresh.append(vote)
+                    continue
+                if vote_id in self._ids:
+                    self._ids.move_to_end(vote_id)
+                    self.duplicates += 1
+                    continue
+                self._ids[vote_id] = None
+                fresh.append(vote)
+            while len(self._ids) > self.capacity:
+                self._ids.popitem(last=False)
+        return fresh
+
+    def forget(self, votes):
+        """Forget vote_ids whose application failed (so a resend is applied)."""
+        with self._lock:
+            for vote in votes:
+                self._ids.pop(vote.get('vote_id'), None)
@@ -5,10 +5,30 @@ Tracks k/l/x votes from chat, manages first-L claimant logic,
 and broadcasts state updates to overlay via SocketIO.
 """
 
+import time
 from datetime import datetime
-from math import log2
+from itertools import compress
 from .actions import ACTIONS, is_valid_action
-from .game_controller import send_keypress
+from .action_executor import ActionExecutor
+from . import voting_rules
+from .vote_tally import VoteTally
+from .claimant_queue import ClaimantQueue
+from .vote_store import VoteStore
+from .broadcast import BroadcastCoalescer, VersionedState, ROOM_BOT, VOTE_ROOMS
+from .command_loop import CommandLoop
+
+# Namespace the Twitch bot connects on (round and revoke notices go here)
+BOT_NAMESPACE = '/'
+
+
+def is_twitch_voter(voter_id, username):
+    """
+    Check whether a voter is keyed by a Twitch user ID.
+
+    Votes cast without a user_id (admin test votes, overlay clients) are
+    keyed by username and never count towards the leaderboard.
+    """
+    return voter_id is not None and voter_id != username and str(voter_id).isdigit()
 
 
 class VoteManager:
@@ -20,50 +40,172 @@ class VoteManager:
     - First L voter gets naming claim
     - Switching away from L loses claim
     - Switching back to L = new timestamp (back of queue)
+
+    Threading: state is owned by a single-writer CommandLoop. Callers on
+    other threads (socket.io handlers, timer) must run mutating methods
+    through self.commands, e.g. commands.call(manager.cast_vote, ...).
     """
 
-    def __init__(self, socketio, log_action=None):
+    def __init__(self, socketio, log_action=None, verify_tally=False, scheduler=None,
+                 game_window=None, game=None, namespace='/', history=None, leaderboard=None):
         """
         Initialize vote manager.
 
         Args:
             socketio: Flask-SocketIO instance for broadcasting
             log_action: Optional logging function for admin panel
+            verify_tally: Check incremental counts against a full recount
+                after every change (debugging aid, O(n) per vote)
+            scheduler: DeadlineScheduler for round expiry and display ticks
+                (None = caller drives the timer by calling tick())
+            game_window: GameWindow registry; rounds that expire while the
+                game is gone are held until it returns (None = never hold)
+            game: GameController for winning keypresses (None = default game window)
+            namespace: Socket.IO namespace this manager broadcasts on
+            history: ArenaHistory recorder for votes, timer events and
+                round outcomes (None = no persistence)
+            leaderboard: Leaderboard fed with vote-decided round outcomes
+                (None = not ranked)
         """
         self.socketio = socketio
         self.log_action = log_action or (lambda *args: None)
+        self.scheduler = scheduler
+        self.namespace = namespace
+        self.history = history
+        self.leaderboard = leaderboard
+        self.journal = None            # RoundRecovery journal (attached by recovery)
+        self._bot_notices = True       # Round notices to the bot (off during restore)
+
+        # Single writer for all state mutations
+        self.commands = CommandLoop('vote-manager' if namespace == '/' else f'vote-manager:{namespace}')
+
+        # Keypresses run off the command loop (a slow xdotool can't stall rounds)
+        self.executor = ActionExecutor(socketio, self.log_action, game=game, namespace=namespace)
+
+        # Game window availability (expired rounds wait for the game)
+        self.game_window = game_window
+        self.round_held = False
+        if game_window is not None:
+            game_window.on_change(self._on_game_window_change)
+
+        # Rate-capped, versioned vote state broadcasting
+        # (see config.BROADCAST_MAX_RATE and broadcast.VersionedState)
+        self.broadcaster = BroadcastCoalescer(socketio, self._submit_emit_state)
+        self.vote_sync = VersionedState()
 
-        # Vote tracking
-        # Format: {username: {'vote': 'k', 'timestamp': datetime}}
-        self.votes = {}
+        # Vote tracking (columnar, keyed by Twitch user ID)
+        self.votes = VoteStore()
+
+        # Incremental per-action counts (kept in sync with self.votes)
+        self.tally = VoteTally()
+        self.verify_tally = verify_tally
 
         # First-L claimant tracking
         # username of current first-L claimant, or None
         self.first_l_claimant = None
+        self.first_l_claimant_id = None
         self.first_l_timestamp = None
 
+        # Current L voter IDs ordered by vote timestamp (claim queue)
+        self.l_queue = ClaimantQueue()
+        self.l_queue_preview = 3       # Queued claimants included in vote_update
+
         # Action registry
         self.actions = ACTIONS
 
+        # Round counter (incremented on every reset)
+        self.round_id = 1
+
         # Cycle management
         self.cycle_active = False
         self.cycle_start_time = None
 
         # Timer system (elapsed-time-based, dynamic target)
-        self.base_time = 30            # Minimum timer duration
+        self.base_time = voting_rules.BASE_TIME  # Minimum timer duration
         self.timer_limit = None        # Target duration in seconds (30-120s)
         self.time_remaining = None     # Calculated: target - elapsed
         self.timer_started = False     # Whether timer is running
-        self.round_start_time = None   # When current round started (wall clock)
+        self.round_start_time = None   # When current round started (time.monotonic())
+        self._expiry_call = None       # Scheduled round expiry (ScheduledCall)
+        self._tick_call = None         # Scheduled display tick (ScheduledCall)
 
-    def cast_vote(self, username, vote, timestamp=None):
+        # Publish initial state (seq 1) so first snapshot is complete
+        self.vote_sync.update(self.get_vote_state())
+
+    def cast_vote(self, username, vote, timestamp=None, user_id=None):
         """
         Record or update a vote from a user.
 
         Args:
-            username: Twitch username
+            username: Twitch display name
             vote: Vote code ('k', 'l', 'x')
-            timestamp: Vote timestamp (defaults to now)
+            timestamp: Vote timestamp - datetime (wall clock) or
+                time.monotonic() float (defaults to now)
+            user_id: Twitch numeric user ID (defaults to username)
+
+        Returns:
+            bool: True if vote was recorded, False if invalid
+        """
+        if not self._apply_vote(username, vote, timestamp, user_id):
+            return False
+
+        # Recalculate timer limit based on new ratios
+        if self.timer_started:
+            self._update_timer_limit()
+
+        # Log the vote
+        self.log_action(f"Vote: {username}", f"{vote.upper()}")
+
+        # Broadcast updated state
+        self._broadcast_state()
+
+        return True
+
+    def cast_votes(self, batch):
+        """
+        Record a batch of votes in arrival order.
+
+        Each vote gets the same first-L and timer-start handling as
+        cast_vote, but the timer limit is recomputed, logged and broadcast
+        once for the whole batch.
+
+        Args:
+            batch: List of dicts with 'username', 'vote' and optional
+                'timestamp' and 'user_id' keys (as in cast_vote)
+
+        Returns:
+            int: Number of votes recorded (invalid votes are skipped)
+        """
+        recorded = 0
+        for item in batch:
+            if self._apply_vote(
+                item.get('username'),
+                item.get('vote'),
+                item.get('timestamp'),
+                item.get('user_id')
+            ):
+                recorded += 1
+
+        if recorded == 0:
+            return 0
+
+        if self.timer_started:
+            self._update_timer_limit()
+
+        counts = ', '.join(
+            f"{code.upper()}={count}" for code, count in self.tally.counts.items()
+        )
+        self.log_action(f"Votes: {recorded} batched", counts)
+
+        self._broadcast_state()
+
+        return recorded
+
+    def _apply_vote(self, username, vote, timestamp=None, user_id=None):
+        """
+        Record a single vote without timer recomputation or broadcast.
+
+        Shared by cast_vote and cast_votes.
 
         Returns:
             bool: True if vote was recorded, False if invalid
@@ -72,35 +214,44 @@ class VoteManager:
         if not is_valid_action(vote):
             return False
 
-        timestamp = timestamp or datetime.now()
-        previous_vote = self.votes.get(username, {}).get('vote')
+        voter_id = str(user_id) if user_id else username
+        timestamp = self._to_monotonic(timestamp)
 
         # Record vote
-        self.votes[username] = {
-            'vote': vote,
-            'timestamp': timestamp
-        }
+        previous_vote = self.votes.cast(voter_id, username, vote, timestamp)
+        self.tally.apply(vote, previous_vote)
+        self._check_tally()
+        if self.history is not None:
+            self.history.record_vote(self.round_id, voter_id, username, vote, previous_vote)
+        if self.journal is not None:
+            self.journal.vote(voter_id, username, vote, timestamp)
 
         # Update first-L claimant logic
-        self._update_first_l_claim(username, vote, previous_vote, timestamp)
+        self._update_first_l_claim(voter_id, username, vote, previous_vote, timestamp)
 
         # Start timer on first K or L vote (X requires K/L to unlock)
         if not self.timer_started and vote in ['k', 'l']:
             self._start_timer()
+            self._notify_bot('round_opened', {'round_id': self.round_id, 'username': username, 'vote': vote})
 
-        # Recalculate timer limit based on new ratios
-        if self.timer_started:
-            self._update_timer_limit()
-
-        # Log the vote
-        self.log_action(f"Vote: {username}", f"{vote.upper()}")
+        return True
 
-        # Broadcast updated state
-        self._broadcast_state()
+    @staticmethod
+    def _to_monotonic(timestamp):
+        """
+        Convert a vote timestamp to time.monotonic() seconds.
 
-        return True
+        Wall-clock datetimes (e.g. from the bot) are mapped by their age,
+        so ordering between bot-stamped and server-stamped votes holds.
+        """
+        now = time.monotonic()
+        if timestamp is None:
+            return now
+        if isinstance(timestamp, datetime):
+            return now - (datetime.now() - timestamp).total_seconds()
+        return float(timestamp)
 
-    def _update_first_l_claim(self, username, new_vote, previous_vote, timestamp):
+    def _update_first_l_claim(self, voter_id, username, new_vote, previous_vote, timestamp):
         """
         Update first-L claimant based on vote change.
 
@@ -109,18 +260,25 @@ class VoteManager:
         - Switching away from L loses claim
         - If current claimant switches away, find next earliest L voter
         """
+        # Keep claim queue ordered by latest L vote timestamp
+        if new_vote == 'l':
+            self.l_queue.add(voter_id, timestamp)
+        elif previous_vote == 'l':
+            self.l_queue.discard(voter_id)
+
         # User switched TO L
         if new_vote == 'l' and previous_vote != 'l':
             # If no current claimant, this user gets it
-            if self.first_l_claimant is None:
+            if self.first_l_claimant_id is None:
                 self.first_l_claimant = username
+                self.first_l_claimant_id = voter_id
                 self.first_l_timestamp = timestamp
                 self.log_action("First-L claim", username)
 
         # User switched AWAY from L
         elif previous_vote == 'l' and new_vote != 'l':
             # If this user was the claimant, find new claimant
-            if username == self.first_l_claimant:
+            if voter_id == self.first_l_claimant_id:
                 self._find_new_first_l_claimant()
 
     def _find_new_first_l_claimant(self):
@@ -129,54 +287,78 @@ class VoteManager:
 
         Called when current claimant switches away from L.
         """
-        # Find all current L voters
-        l_voters = [
-            (uname, data['timestamp'])
-            for uname, data in self.votes.items()
-            if data['vote'] == 'l'
-        ]
+        earliest = self.l_queue.first()
 
-        if l_voters:
+        if earliest:
             # Earliest L voter becomes claimant
-            new_claimant, new_timestamp = min(l_voters, key=lambda x: x[1])
-            self.first_l_claimant = new_claimant
+            new_claimant_id, new_timestamp = earliest
+            previous = self.first_l_claimant
+            self.first_l_claimant = self.votes.username_of(new_claimant_id)
+            self.first_l_claimant_id = new_claimant_id
             self.first_l_timestamp = new_timestamp
-            self.log_action("First-L claim transferred", new_claimant)
+            self.log_action("First-L claim transferred", self.first_l_claimant)
+            if self.history is not None:
+                self.history.record_event(
+                    self.round_id, 'claim_transfer', f"{previous or '-'} → {self.first_l_claimant}"
+                )
         else:
             # No L voters left
             self.first_l_claimant = None
+            self.first_l_claimant_id = None
             self.first_l_timestamp = None
             self.log_action("First-L claim", "None (no L voters)")
 
+    def get_claimant_queue(self, n=None):
+        """
+        Get queued first-L claimants in claim order.
+
+        Args:
+            n: Maximum number of usernames (defaults to l_queue_preview)
+
+        Returns:
+            list: Usernames, earliest L vote first
+        """
+        voter_ids = self.l_queue.top(self.l_queue_preview if n is None else n)
+        return [self.votes.username_of(voter_id) for voter_id in voter_ids]
+
     def get_vote_counts(self):
         """
         Get current vote counts for each action.
 
+        Counts are maintained incrementally by the tally, so this is
+        O(number of actions), not O(number of voters).
+
         Returns:
             dict: {action_code: count} (e.g., {'k': 5, 'l': 3, 'x': 2})
         """
-        counts = {'k': 0, 'l': 0, 'x': 0}
+        return self.tally.as_dict()
 
-        for vote_data in self.votes.values():
-            vote = vote_data['vote']
-            if vote in counts:
-                counts[vote] += 1
-
-        return counts
+    def _check_tally(self):
+        """Verify tally against a full recount when verify_tally is enabled."""
+        if self.verify_tally:
+            self.tally.verify(self.votes)
 
     def _start_timer(self):
         """
         Start the vote timer.
 
         Called when first K or L vote is cast.
-        Records wall clock start time and calculates initial target duration.
+        Records monotonic start time, calculates initial target duration
+        and schedules the expiry deadline and first display tick.
         """
-        self.round_start_time = datetime.now()
-        counts = self.get_vote_counts()
+        self.round_start_time = time.monotonic()
+        counts = self.tally.counts
         self.timer_limit = self.get_timer_limit(counts['k'], counts['l'], counts['x'])
         self.time_remaining = self.timer_limit
         self.timer_started = True
         self.log_action("Timer started", f"{self.timer_limit}s target")
+        if self.history is not None:
+            self.history.record_event(self.round_id, 'timer_start', f"{self.timer_limit}s")
+        if self.journal is not None:
+            self.journal.timer_start(self.round_start_time)
+
+        self._schedule_expiry()
+        self._schedule_tick()
 
     def _update_timer_limit(self):
         """
@@ -185,7 +367,10 @@ class VoteManager:
         Called whenever a vote changes.
         Updates timer_limit (target), but time_remaining recalculates from elapsed time.
         """
-        counts = self.get_vote_counts()
+        if self.round_held:
+            return  # Expired round waiting for the game; timer stays at 0
+
+        counts = self.tally.counts
         new_limit = self.get_timer_limit(counts['k'], counts['l'], counts['x'])
 
         if new_limit != self.timer_limit:
@@ -194,29 +379,25 @@ class VoteManager:
 
             # Calculate current elapsed time
             if self.round_start_time is not None:
-                elapsed = (datetime.now() - self.round_start_time).total_seconds()
+                elapsed = time.monotonic() - self.round_start_time
                 new_remaining = max(0, int(new_limit - elapsed))
+                self.time_remaining = new_remaining
 
                 self.log_action(
                     "Target adjusted",
                     f"{old_limit}s → {new_limit}s (elapsed: {int(elapsed)}s, remaining: {new_remaining}s)"
                 )
+                if self.history is not None:
+                    self.history.record_event(self.round_id, 'timer_adjust', f"{old_limit}s → {new_limit}s")
+
+            # Move the expiry deadline to the new target
+            self._schedule_expiry()
 
     def get_timer_limit(self, k_count, l_count, x_count):
         """
         Calculate timer limit based purely on vote distribution.
 
-        Uses Shannon entropy to measure vote uncertainty/split:
-        - Unanimous (100% one option) → 30s (certain, quick)
-        - 50/50 split → ~68s (uncertain, debate)
-        - Perfect 3-way split → ~100s (maximum complexity)
-        - X dominant → extends further (deliberation request)
-
-        Formula:
-            time = base_time + uncertainty_bonus + x_bonus
-            - uncertainty_bonus: 0-60s based on entropy (how split)
-            - x_bonus: 0-60s based on X percentage (deliberation)
-            - Capped at 120s maximum
+        Entropy-based rule defined in voting_rules.timer_limit.
 
         Args:
             k_count: Number of K votes
@@ -226,62 +407,85 @@ class VoteManager:
         Returns:
             int: Timer limit in seconds (30-120)
         """
-        total = k_count + l_count + x_count
-
-        if total == 0:
-            return self.base_time
-
-        # Convert to percentages
-        k_pct = k_count / total
-        l_pct = l_count / total
-        x_pct = x_count / total
-
-        # Calculate Shannon entropy (measures uncertainty)
-        # Entropy = -Σ(p_i * log2(p_i)) for each vote type
-        # Range: 0 (unanimous) to log2(3)≈1.585 (perfect 3-way split)
-        entropy = 0
-        for pct in [k_pct, l_pct, x_pct]:
-            if pct > 0:
-                entropy -= pct * log2(pct)
-
-        # Normalize entropy to 0-1 scale
-        max_possible_entropy = 1.585  # log2(3) for 3 options
-        uncertainty = min(entropy / max_possible_entropy, 1.0)
-
-        # Additive components
-        uncertainty_bonus = uncertainty * 60  # How split votes are (0-60s)
-        x_bonus = x_pct * 60                  # Deliberation request (0-60s)
-
-        # Combine and cap
-        total_time = self.base_time + uncertainty_bonus + x_bonus
-        return min(int(total_time), 120)
+        return voting_rules.timer_limit(k_count, l_count, x_count, self.base_time)
 
     def get_vote_state(self):
         """
         Get complete vote state for broadcasting.
 
+        Contains only fields that describe the round, so unchanged state
+        produces an empty patch (see get_vote_snapshot for the wire form).
+
         Returns:
             dict: Vote state including counts, claimant, etc.
         """
-        counts = self.get_vote_counts()
-
-        return {
-            'k_votes': counts['k'],
-            'l_votes': counts['l'],
-            'x_votes': counts['x'],
-            'total_votes': len(self.votes),
+        state = {
+            f'{code}_votes': count
+            for code, count in self.tally.counts.items()
+        }
+        state.update({
+            'total_votes': self.tally.total,
             'first_l_claimant': self.first_l_claimant,
+            'l_queue': self.get_claimant_queue(),
             'voting_active': self.cycle_active,
             'time_remaining': self.time_remaining,
+            'game_available': self.game_available(),
+            'round_held': self.round_held,
             # Additional metadata
-            'voter_count': len(self.votes),
-            'timestamp': datetime.now().isoformat()
-        }
+            'voter_count': self.tally.total
+        })
+        return state
+
+    def _schedule_expiry(self):
+        """(Re)schedule round expiry at round_start_time + timer_limit."""
+        if self.scheduler is None:
+            return
+        if self._expiry_call:
+            self._expiry_call.cancel()
+        self._expiry_call = self.scheduler.call_at(
+            self.round_start_time + self.timer_limit,
+            self.commands.submit, self._on_expiry_deadline, self.round_id
+        )
+
+    def _schedule_tick(self):
+        """Schedule the next display tick at the next whole second of the round."""
+        if self.scheduler is None:
+            return
+        if self._tick_call:
+            self._tick_call.cancel()
+        elapsed = time.monotonic() - self.round_start_time
+        self._tick_call = self.scheduler.call_at(
+            self.round_start_time + int(elapsed) + 1,
+            self.commands.submit, self._on_display_tick, self.round_id
+        )
+
+    def _cancel_timers(self):
+        """Cancel scheduled expiry and display tick (round over)."""
+        for call in (self._expiry_call, self._tick_call):
+            if call:
+                call.cancel()
+        self._expiry_call = None
+        self._tick_call = None
+
+    def _on_expiry_deadline(self, round_id):
+        """Scheduled round expiry (runs on the command loop; stale rounds ignored)."""
+        if round_id == self.round_id:
+            self.tick()
+
+    def _on_display_tick(self, round_id):
+        """Scheduled per-second display tick (runs on the command loop; stale rounds ignored)."""
+        if round_id != self.round_id:
+            return
+        self.tick()
+        if round_id == self.round_id and self.timer_started:
+            self._schedule_tick()
 
     def tick(self):
         """
-        Timer tick - called every second by background task.
+        Timer tick - updates time_remaining and checks for expiry.
 
+        Driven by the scheduler at each whole second and at the exact
+        expiry deadline (or called manually when no scheduler is set).
         Calculates time_remaining from elapsed time and target duration.
         When elapsed >= target, executes winner and resets round.
         """
@@ -289,7 +493,7 @@ class VoteManager:
             return
 
         # Calculate elapsed time since round start
-        elapsed = (datetime.now() - self.round_start_time).total_seconds()
+        elapsed = time.monotonic() - self.round_start_time
         self.time_remaining = max(0, int(self.timer_limit - elapsed))
 
         # Broadcast updated timer
@@ -297,41 +501,121 @@ class VoteManager:
 
         # Check for expiry (elapsed time >= target duration)
         if elapsed >= self.timer_limit:
+            if not self.game_available():
+                self._hold_round()
+                return
             self.log_action("Timer expired", f"Target {self.timer_limit}s reached")
             self._execute_winner()
 
+    def game_available(self):
+        """Whether game actions can run (always True without a game window registry)."""
+        return self.game_window is None or self.game_window.available
+
+    def _hold_round(self):
+        """
+        Hold an expired round while the game window is missing.
+
+        Votes keep being accepted; the winner is resolved when the window
+        comes back (see _on_game_window_change).
+        """
+        if self.round_held:
+            return
+        self.round_held = True
+        self._cancel_timers()
+        self.log_action("Round held", "Game window missing - waiting for game")
+        if self.history is not None:
+            self.history.record_event(self.round_id, 'hold', "Game window missing")
+        if self.journal is not None:
+            self.journal.hold()
+        print("⚠ Round expired while game window is missing - holding round")
+        self._broadcast_state(immediate=True)
+
+    def _on_game_window_change(self, available, window_id):
+        """GameWindow listener (any thread): handle availability on the command loop."""
+        self.commands.submit(self._apply_game_window_change, available)
+
+    def _apply_game_window_change(self, available):
+        """Resolve a held round once the game is back; publish availability."""
+        self.log_action("Game window", "Available" if available else "Missing")
+        if available and self.round_held:
+            self.round_held = False
+            self.log_action("Round resumed", "Game window back")
+            self._execute_winner()
+            return
+        self._broadcast_state(immediate=True)
+
     def _execute_winner(self):
         """
-        Execute the winning action and reset for next round.
+        Resolve the round and reset for next round.
 
         Called when timer expires.
-        Determines winner, sends keypress if K or L, resets votes.
+        Determines winner, resets votes, then hands its keypress (K or L)
+        to the action executor - the next round does not wait for the
+        keypress to finish. The reset comes first so the recovery
+        checkpoint of the new round is on disk before the keypress is
+        sent: a crash can lose the action, but never restores (and
+        executes again) a round that was already executed.
         """
         winner = self.get_winner()
-
-        if winner == 'k':
-            self.log_action("Winner: K", "Sending Delete keypress")
-            result = send_keypress('Delete', self.log_action)
-            if result['success']:
-                print("✓ EXECUTED: Delete keypress (K wins)")
-            else:
-                print(f"✗ FAILED: Delete keypress - {result.get('error', 'Unknown error')}")
-        elif winner == 'l':
-            claimant = self.first_l_claimant or "Unknown"
-            self.log_action("Winner: L", f"Sending Insert keypress (Claimant: {claimant})")
-            result = send_keypress('Insert', self.log_action)
-            if result['success']:
-                print(f"✓ EXECUTED: Insert keypress (L wins, claimant: {claimant})")
-            else:
-                print(f"✗ FAILED: Insert keypress - {result.get('error', 'Unknown error')}")
+        keypress = self.actions[winner]['keypress']
+        round_id = self.round_id
+        claimant = self.first_l_claimant if winner == 'l' else None
+        self._record_round(winner, 'vote')
+        self._notify_bot('round_result', {
+            'round_id': round_id,
+            'winner': winner,
+            'claimant': claimant,
+            'counts': dict(self.tally.counts),
+        })
+
+        if keypress:
+            detail = f"Sending {keypress} keypress"
+            if winner == 'l':
+                detail += f" (Claimant: {claimant or 'Unknown'})"
+            self.log_action(f"Winner: {winner.upper()}", detail)
         else:
             # X wins or tie
             self.log_action("Winner: X", "No action (extend)")
             print("→ No action (X wins)")
 
-        # Reset for next round
+        # Reset for next round (checkpointed before the keypress is dispatched)
         self.reset_votes()
 
+        if keypress:
+            self.executor.execute(winner, keypress, source='vote', round_id=round_id, claimant=claimant)
+
+    def _record_round(self, winner, source):
+        """Record the round outcome in history and the leaderboard (before votes are reset)."""
+        if self.leaderboard is not None and source == 'vote':
+            self._submit_leaderboard(winner)
+        if self.history is None:
+            return
+        started_at = None
+        if self.round_start_time is not None:
+            started_at = time.time() - (time.monotonic() - self.round_start_time)
+        self.history.record_round(
+            self.round_id, started_at, winner, source,
+            self.first_l_claimant, self.first_l_claimant_id,
+            self.tally.counts, self.timer_limit,
+        )
+
+    def _submit_leaderboard(self, winner):
+        """Feed the round's Twitch voters and claimant to the leaderboard."""
+        voter_ids, usernames, votes = [], [], []
+        for voter_id, username, vote in zip(*self.votes.columns()[:3]):
+            if is_twitch_voter(voter_id, username):
+                voter_ids.append(voter_id)
+                usernames.append(username)
+                votes.append(vote)
+
+        claimant_id, claimant = self.first_l_claimant_id, self.first_l_claimant
+        if not is_twitch_voter(claimant_id, claimant):
+            claimant_id = claimant = None
+
+        # Rounds decided only by test votes are not leaderboard rounds
+        if voter_ids or claimant_id is not None:
+            self.leaderboard.submit_round(winner, claimant_id, claimant, voter_ids, usernames, votes)
+
     def reset_votes(self):
         """
         Reset all votes for a new cycle.
@@ -340,17 +624,36 @@ class VoteManager:
         Clears votes, timer state, and waits for next round to start.
         """
         self.votes.clear()
+        self.tally.reset()
+        self.l_queue.clear()
         self.first_l_claimant = None
+        self.first_l_claimant_id = None
         self.first_l_timestamp = None
 
         # Reset timer state (waiting for first K/L vote)
+        self._cancel_timers()
         self.timer_limit = None
         self.time_remaining = None
         self.timer_started = False
         self.round_start_time = None
+        self.round_held = False
+        self.round_id += 1
 
         self.log_action("Votes reset", "Awaiting next round")
-        self._broadcast_state()
+        if self.journal is not None:
+            self.journal.checkpoint()
+        self._announce_round()
+        self._broadcast_state(immediate=True)
+
+    def _announce_round(self):
+        """Tell the bot the current round ID (it keys its duplicate-vote cache on it)."""
+        self._notify_bot('round_started', {'round_id': self.round_id})
+
+    def _notify_bot(self, event, data):
+        """Emit a round notice to the bot room (vote cache sync, chat announcements)."""
+        if self._bot_notices:
+            data['namespace'] = self.namespace
+            self.socketio.emit(event, data, namespace=BOT_NAMESPACE, to=ROOM_BOT)
 
     def start_cycle(self):
         """Start a new voting cycle."""
@@ -358,64 +661,213 @@ class VoteManager:
         self.cycle_start_time = datetime.now()
         self.reset_votes()
         self.log_action("Vote cycle started")
-        self._broadcast_state()
+        self._broadcast_state(immediate=True)
 
     def end_cycle(self):
         """End current voting cycle."""
         self.cycle_active = False
         self.log_action("Vote cycle ended")
+        if self.journal is not None:
+            self.journal.checkpoint()
         # Don't reset votes yet - need them for resolution
-        self._broadcast_state()
+        self._broadcast_state(immediate=True)
 
     def get_winner(self):
         """
         Determine winner of current vote cycle per VOTING_RULES.md.
 
-        Rules:
-        - K wins IF: K > 33% AND K > L
-        - L wins IF: L > 33% AND L > K
-        - X wins (no action) IF: Neither K nor L > 33%, OR K = L (tie)
+        Threshold rule defined in voting_rules.winner.
 
         Returns:
             str: Winning action code ('k', 'l', or 'x')
         """
-        counts = self.get_vote_counts()
-        total = sum(counts.values())
+        counts = self.tally.counts
+        return voting_rules.winner(counts['k'], counts['l'], self.tally.total)
 
-        # No votes = X wins (no action)
-        if total == 0:
-            return 'x'
+    def get_enabled_actions(self):
+        """
+        Get list of currently enabled action codes.
 
-        k_count = counts['k']
-        l_count = counts['l']
+        Returns:
+            list: Action codes (e.g., ['k', 'l', 'x'])
+        """
+        return [code for code, action in self.actions.items() if action['enabled']]
 
-        k_percent = (k_count / total) * 100
-        l_percent = (l_count / total) * 100
+    def _broadcast_state(self, immediate=False):
+        """
+        Schedule a vote state broadcast to all connected clients.
 
-        # K wins: K > 33% AND K > L
-        if k_percent > 33 and k_count > l_count:
-            return 'k'
+        Regular changes are coalesced and rate-capped by the broadcaster;
+        round boundaries (reset, cycle start/end) flush immediately.
+
+        Args:
+            immediate: Bypass the rate cap and emit now
+        """
+        if immediate:
+            self.broadcaster.flush()
+        else:
+            self.broadcaster.mark_dirty()
 
-        # L wins: L > 33% AND L > K
-        if l_percent > 33 and l_count > k_count:
-            return 'l'
+    def _submit_emit_state(self):
+        """Run _emit_state on the command loop (broadcaster may flush from its own thread)."""
+        self.commands.submit(self._emit_state)
 
-        # X wins: Neither K nor L > 33%, OR K = L (tie)
-        return 'x'
+    def _emit_state(self):
+        """Emit changed vote state fields as a vote_patch (called by the broadcaster)."""
+        patch = self.vote_sync.update(self.get_vote_state())
+        if patch:
+            self.socketio.emit('vote_patch', patch, namespace=self.namespace, to=VOTE_ROOMS)
 
-    def get_enabled_actions(self):
+    def get_vote_snapshot(self):
         """
-        Get list of currently enabled action codes.
+        Get the last published vote state as a full snapshot.
+
+        Sent as vote_update to newly connected clients and to clients that
+        detect a sequence gap in vote_patch events.
 
         Returns:
-            list: Action codes (e.g., ['k', 'l', 'x'])
+            dict: Full vote state with 'seq' and 'timestamp'
         """
-        return [code for code, action in self.actions.items() if action['enabled']]
+        return self.vote_sync.snapshot()
+
+    def get_broadcast_stats(self):
+        """
+        Get vote_update broadcast counters.
+
+        Returns:
+            dict: requested, sent and suppressed emit counts
+        """
+        return self.broadcaster.get_stats()
+
+    # ============================================================
+    # CRASH RECOVERY (see recovery.py)
+    # ============================================================
+
+    def export_state(self):
+        """
+        Export the live round for a recovery snapshot.
+
+        Times are wall-clock (time.time()) so a restored round keeps its
+        real deadline across a restart.
+
+        Returns:
+            dict: JSON-serializable round state
+        """
+        wall_offset = time.time() - time.monotonic()
+        voter_ids, usernames, votes, timestamps = self.votes.columns(wall_offset)
+        return {
+            'round_id': self.round_id,
+            'history_session': None if self.history is None else self.history.session_for(self.round_id),
+            'cycle_active': self.cycle_active,
+            'votes': {
+                'voter_ids': voter_ids,
+                'usernames': usernames,
+                'votes': votes,
+                'timestamps': timestamps,
+            },
+            'first_l_claimant_id': self.first_l_claimant_id,
+            'timer': {
+                'started': self.timer_started,
+                'start': None if self.round_start_time is None else self.round_start_time + wall_offset,
+                'held': self.round_held,
+            },
+        }
+
+    def restore_state(self, state, journal=()):
+        """
+        Restore a round from export_state() output plus journal entries.
+
+        Journal entries replay commands recorded after the snapshot:
+            ('v', wall_ts, voter_id, username, vote)  vote cast/changed
+            ('r', voter_id)                           vote removed
+            ('t', wall_start)                         timer started
+            ('h',)                                    round held
 
-    def _broadcast_state(self):
-        """Broadcast current vote state to all connected clients."""
-        state = self.get_vote_state()
-        self.socketio.emit('vote_update', state)
+        The timer resumes with the time remaining until its original
+        deadline (expiring immediately if that passed while down).
+        History, journal recording and bot notices are suspended during replay;
+        afterwards history keeps recording the round under its original session.
+
+        Args:
+            state: Snapshot dict from export_state()
+            journal: Iterable of journal entries, in order
+        """
+        history, journal_hook, log_action = self.history, self.journal, self.log_action
+        self.history, self.journal = None, None
+        self.log_action = lambda *args: None
+        self._bot_notices = False
+        try:
+            mono_offset = time.monotonic() - time.time()
+            self._cancel_timers()
+
+            # Snapshot: bulk-load columns, rebuild derived indexes
+            votes = state['votes']
+            self.votes.load(
+                votes['voter_ids'], votes['usernames'], votes['votes'], votes['timestamps'],
+                time_offset=mono_offset,
+            )
+            self.tally.rebuild(self.votes)
+            self.l_queue.load(compress(
+                zip(votes['voter_ids'], map(mono_offset.__add__, votes['timestamps'])),
+                map('l'.__eq__, votes['votes']),
+            ))
+
+            claimant_id = state.get('first_l_claimant_id')
+            if claimant_id is not None and self.votes.vote_of(claimant_id) == 'l':
+                self.first_l_claimant_id = claimant_id
+                self.first_l_claimant = self.votes.username_of(claimant_id)
+                self.first_l_timestamp = self.votes.get(claimant_id).timestamp
+            else:
+                self._find_new_first_l_claimant()
+
+            self.round_id = state['round_id']
+            self.cycle_active = state['cycle_active']
+            timer = state['timer']
+            self.timer_started = timer['started']
+            self.round_start_time = None if timer['start'] is None else timer['start'] + mono_offset
+            self.round_held = timer['held']
+
+            # Journal: replay commands since the snapshot
+            for entry in journal:
+                op = entry[0]
+                if op == 'v':
+                    _, ts, voter_id, username, vote = entry
+                    self._apply_vote(username, vote, ts + mono_offset, voter_id)
+                elif op == 'r':
+                    self._remove_vote(entry[1])
+                elif op == 't':
+                    self.round_start_time = entry[1] + mono_offset
+                elif op == 'h':
+                    self.round_held = True
+        finally:
+            self.history, self.journal, self.log_action = history, journal_hook, log_action
+            self._bot_notices = True
+
+        # Rows for the rest of the round join those recorded before the restart
+        if self.history is not None and state.get('history_session') is not None:
+            self.history.resume_round(self.round_id, state['history_session'])
+
+        # Resume the timer against the original deadline
+        self._cancel_timers()
+        if self.timer_started:
+            counts = self.tally.counts
+            self.timer_limit = self.get_timer_limit(counts['k'], counts['l'], counts['x'])
+            elapsed = time.monotonic() - self.round_start_time
+            self.time_remaining = max(0, int(self.timer_limit - elapsed))
+            if not self.round_held:
+                self._schedule_expiry()
+                self._schedule_tick()
+        else:
+            self.timer_limit = None
+            self.time_remaining = None
+
+        self.log_action(
+            "Round restored",
+            f"Round {self.round_id}: {len(self.votes)} votes, "
+            f"{self.time_remaining if self.time_remaining is not None else '-'}s remaining"
+        )
+        self._announce_round()
+        self._broadcast_state(immediate=True)
 
     # ============================================================
     # ADMIN TESTING METHODS
@@ -425,6 +877,9 @@ class VoteManager:
         """
         Add a test vote with a random username (admin panel testing).
 
+        Test votes have no Twitch user ID, so they count in the round but
+        not on the leaderboard.
+
         Args:
             vote_type: Vote code ('k', 'l', or 'x')
 
@@ -446,27 +901,23 @@ class VoteManager:
         Returns:
             bool: True if a vote was removed, False if no votes of that type
         """
-        # Find all voters of this type
-        voters_of_type = [
-            (username, data['timestamp'])
-            for username, data in self.votes.items()
-            if data['vote'] == vote_type
-        ]
+        # Find most recent voter (L voters are indexed by timestamp)
+        if vote_type == 'l':
+            most_recent = self.l_queue.latest()
+        else:
+            most_recent = self.votes.latest(vote_type)
 
-        if not voters_of_type:
+        if most_recent is None:
             self.log_action(f"Remove {vote_type.upper()} vote", "No votes to remove")
             return False
 
-        # Find most recent voter
-        most_recent_voter, _ = max(voters_of_type, key=lambda x: x[1])
+        most_recent_voter, _ = most_recent
+        username = self.votes.username_of(most_recent_voter)
 
-        # Remove the vote
-        del self.votes[most_recent_voter]
-        self.log_action(f"Removed {vote_type.upper()} vote", most_recent_voter)
-
-        # If it was an L vote, recalculate first-L claimant
-        if vote_type == 'l' and most_recent_voter == self.first_l_claimant:
-            self._find_new_first_l_claimant()
+        # Remove the vote (the bot must forward this voter's next repeat again)
+        self._remove_vote(most_recent_voter)
+        self.log_action(f"Removed {vote_type.upper()} vote", username)
+        self._notify_bot('vote_revoked', {'voter_id': most_recent_voter})
 
         # Recalculate timer limit
         if self.timer_started:
@@ -477,33 +928,43 @@ class VoteManager:
 
         return True
 
+    def _remove_vote(self, voter_id):
+        """Remove a voter's vote, updating tally and first-L claim (no broadcast)."""
+        vote_type = self.votes.remove(voter_id)
+        if vote_type is None:
+            return
+        if vote_type == 'l':
+            self.l_queue.discard(voter_id)
+        self.tally.remove(vote_type)
+        self._check_tally()
+        if self.journal is not None:
+            self.journal.remove(voter_id)
+
+        # If it was an L vote, recalculate first-L claimant
+        if vote_type == 'l' and voter_id == self.first_l_claimant_id:
+            self._find_new_first_l_claimant()
+
     def force_execute_action(self, action):
         """
         Force immediate execution of a specific action (admin panel testing).
 
         Bypasses normal vote resolution and timer.
-        Executes the specified action immediately and resets for next round.
+        Queues the specified action on the executor and resets for next round.
 
         Args:
             action: Action code ('k', 'l', or 'x')
         """
         self.log_action(f"FORCE EXECUTE: {action.upper()}", "Admin override")
+        self._record_round(action, 'admin')
 
-        if action == 'k':
-            result = send_keypress('Delete', self.log_action)
-            if result['success']:
-                print("✓ FORCE EXECUTED: Delete keypress (admin K)")
-            else:
-                print(f"✗ FAILED: Delete keypress - {result.get('error', 'Unknown error')}")
-        elif action == 'l':
-            claimant = self.first_l_claimant or "Unknown"
-            result = send_keypress('Insert', self.log_action)
-            if result['success']:
-                print(f"✓ FORCE EXECUTED: Insert keypress (admin L, claimant: {claimant})")
-            else:
-                print(f"✗ FAILED: Insert keypress - {result.get('error', 'Unknown error')}")
-        else:  # action == 'x'
+        keypress = self.actions[action]['keypress']
+        round_id = self.round_id
+        claimant = (self.first_l_claimant or "Unknown") if action == 'l' else None
+        if not keypress:  # action == 'x'
             print("→ FORCE EXECUTED: No action (admin X)")
 
-        # Reset for next round
+        # Reset for next round (checkpointed before the keypress, as in _execute_winner)
         self.reset_votes()
+
+        if keypress:
+            self.executor.execute(action, keypress, source='admin', round_id=round_id, claimant=claimant)
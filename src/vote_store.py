@@ -0,0 +1,300 @@
+"""
+Compact per-round vote storage for Selection Protocol.
+
+Stores votes column-wise: each voter is interned once and assigned a slot,
+and vote codes / timestamps live in typed arrays indexed by slot. This
+avoids allocating a dict per voter, keeping large (raid-sized) rounds
+cheap in memory and allocation.
+
+Voters are keyed by Twitch numeric user ID (stable across name changes);
+display names are kept alongside for the overlay and logs.
+"""
+
+import sys
+from array import array
+from .actions import get_enabled_actions
+
+# Vote column value for a slot whose vote was removed
+NO_VOTE = -1
+
+# Translation table value for characters that are not action codes (bulk load)
+_UNKNOWN_CODE = 0x7F
+
+
+class VoteRecord:
+    """Read-only view of one voter's current vote."""
+
+    __slots__ = ('voter_id', 'username', 'vote', 'timestamp')
+
+    def __init__(self, voter_id, username, vote, timestamp):
+        self.voter_id = voter_id
+        self.username = username
+        self.vote = vote
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return f"VoteRecord({self.voter_id!r}, {self.username!r}, {self.vote!r}, {self.timestamp})"
+
+
+class VoteStore:
+    """
+    Column-oriented vote store for a single round.
+
+    Columns (indexed by voter slot):
+    - voter ID (interned string)
+    - display name
+    - vote code as a signed byte (index into action_codes, -1 = no vote)
+    - vote timestamp as a float (time.monotonic() seconds)
+
+    Slots are never freed within a round; a removed vote becomes NO_VOTE
+    and the slot is reused if the same voter votes again.
+    """
+
+    def __init__(self, action_codes=None):
+        """
+        Initialize an empty store.
+
+        Args:
+            action_codes: Action codes that can be stored (defaults to enabled actions)
+        """
+        self.action_codes = tuple(action_codes or get_enabled_actions())
+        self._code_index = {code: i for i, code in enumerate(self.action_codes)}
+
+        self._slots = {}              # {voter_id: slot}
+        self._voter_ids = []          # slot -> voter_id
+        self._usernames = []          # slot -> display name
+        self._votes = array('b')      # slot -> action index (NO_VOTE if removed)
+        self._timestamps = array('d') # slot -> monotonic timestamp
+        self._count = 0               # voters with a live vote
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, voter_id):
+        slot = self._slots.get(voter_id)
+        return slot is not None and self._votes[slot] != NO_VOTE
+
+    def cast(self, voter_id, username, vote, timestamp):
+        """
+        Record or replace a voter's vote.
+
+        Args:
+            voter_id: Stable voter key string (Twitch user ID, or username if unknown)
+            username: Display name
+            vote: Action code
+            timestamp: Vote time (monotonic seconds)
+
+        Returns:
+            str: Previous vote code, or None if the voter had no vote
+        """
+        code = self._code_index[vote]
+        slot = self._slots.get(voter_id)
+
+        if slot is None:
+            voter_id = sys.intern(voter_id)
+            slot = len(self._voter_ids)
+            self._slots[voter_id] = slot
+            self._voter_ids.append(voter_id)
+            self._usernames.append(username)
+            self._votes.append(code)
+            self._timestamps.append(timestamp)
+            self._count += 1
+            return None
+
+        previous = self._votes[slot]
+        self._votes[slot] = code
+        self._timestamps[slot] = timestamp
+        self._usernames[slot] = username
+
+        if previous == NO_VOTE:
+            self._count += 1
+            return None
+        return self.action_codes[previous]
+
+    def remove(self, voter_id):
+        """
+        Remove a voter's vote.
+
+        Args:
+            voter_id: Voter key
+
+        Returns:
+            str: Removed vote code, or None if the voter had no vote
+        """
+        slot = self._slots.get(voter_id)
+        if slot is None or self._votes[slot] == NO_VOTE:
+            return None
+
+        previous = self._votes[slot]
+        self._votes[slot] = NO_VOTE
+        self._count -= 1
+        return self.action_codes[previous]
+
+    def clear(self):
+        """Remove all votes and voters (new round)."""
+        self._slots.clear()
+        self._voter_ids.clear()
+        self._usernames.clear()
+        del self._votes[:]
+        del self._timestamps[:]
+        self._count = 0
+
+    def columns(self, time_offset=0.0):
+        """
+        Export live votes as parallel columns (snapshots).
+
+        Args:
+            time_offset: Added to every timestamp (e.g. monotonic -> wall clock)
+
+        Returns:
+            tuple: (voter_ids, usernames, votes, timestamps) lists, where
+                votes is a string with one action code per voter
+        """
+        live = [slot for slot, code in enumerate(self._votes) if code != NO_VOTE]
+        codes = self.action_codes
+        return (
+            [self._voter_ids[slot] for slot in live],
+            [self._usernames[slot] for slot in live],
+            ''.join(codes[self._votes[slot]] for slot in live),
+            [self._timestamps[slot] + time_offset for slot in live],
+        )
+
+    def load(self, voter_ids, usernames, votes, timestamps, time_offset=0.0):
+        """
+        Replace the store's contents with exported columns (bulk restore).
+
+        Args:
+            voter_ids: Voter keys (unique)
+            usernames: Display names
+            votes: Action codes, one per voter (string or list)
+            timestamps: Vote times
+            time_offset: Added to every timestamp (e.g. wall clock -> monotonic)
+        """
+        self.clear()
+        self._voter_ids = list(voter_ids)   # Decoded once, shared with the claimant queue (no interning)
+        self._slots = dict(zip(self._voter_ids, range(len(self._voter_ids))))
+        self._usernames = list(usernames)
+        self._votes = self._encode_votes(votes)
+        self._timestamps = array('d', map(time_offset.__add__, timestamps) if time_offset else timestamps)
+        self._count = len(self._voter_ids)
+
+    def _encode_votes(self, votes):
+        """
+        Convert action codes to a vote column.
+
+        A string of single-character codes (as exported by columns()) is
+        translated in one C-level pass instead of one lookup per vote.
+
+        Raises:
+            KeyError: If a vote is not one of the store's action codes
+        """
+        if isinstance(votes, str) and all(len(code) == 1 and code.isascii() for code in self.action_codes):
+            table = bytearray([_UNKNOWN_CODE]) * 256
+            for code, index in self._code_index.items():
+                table[ord(code)] = index
+            column = votes.encode('ascii', 'replace').translate(table)
+            if _UNKNOWN_CODE in column:
+                raise KeyError(votes[column.index(_UNKNOWN_CODE)])
+            return array('b', column)
+        code_index = self._code_index
+        return array('b', [code_index[vote] for vote in votes])
+
+    def code_counts(self):
+        """
+        Count live votes per action code (C-level scans of the vote column).
+
+        Returns:
+            dict: {action_code: count}
+        """
+        return {code: self._votes.count(index) for index, code in enumerate(self.action_codes)}
+
+    def vote_of(self, voter_id):
+        """
+        Get a voter's current vote code.
+
+        Returns:
+            str: Vote code, or None if the voter has no vote
+        """
+        slot = self._slots.get(voter_id)
+        if slot is None or self._votes[slot] == NO_VOTE:
+            return None
+        return self.action_codes[self._votes[slot]]
+
+    def username_of(self, voter_id):
+        """
+        Get a voter's display name.
+
+        Returns:
+            str: Display name, or None if the voter is unknown this round
+        """
+        slot = self._slots.get(voter_id)
+        return None if slot is None else self._usernames[slot]
+
+    def get(self, voter_id):
+        """
+        Get a record view of a voter's vote.
+
+        Returns:
+            VoteRecord: Record, or None if the voter has no vote
+        """
+        slot = self._slots.get(voter_id)
+        if slot is None or self._votes[slot] == NO_VOTE:
+            return None
+        return self._record(slot)
+
+    def records(self, vote=None):
+        """
+        Iterate over current votes as record views.
+
+        Args:
+            vote: Only yield votes for this action code (default: all)
+
+        Yields:
+            VoteRecord: One per live vote, in first-vote order
+        """
+        wanted = None if vote is None else self._code_index[vote]
+        for slot, code in enumerate(self._votes):
+            if code == NO_VOTE or (wanted is not None and code != wanted):
+                continue
+            yield self._record(slot)
+
+    def vote_codes(self):
+        """
+        Iterate over current vote codes (for recounts).
+
+        Yields:
+            str: Action code for each live vote
+        """
+        codes = self.action_codes
+        for code in self._votes:
+            if code != NO_VOTE:
+                yield codes[code]
+
+    def latest(self, vote):
+        """
+        Find the most recent voter for an action.
+
+        Args:
+            vote: Action code
+
+        Returns:
+            tuple: (voter_id, timestamp), or None if nobody voted for it
+        """
+        wanted = self._code_index[vote]
+        timestamps = self._timestamps
+        best = None
+        for slot, code in enumerate(self._votes):
+            if code == wanted and (best is None or timestamps[slot] >= timestamps[best]):
+                best = slot
+        if best is None:
+            return None
+        return self._voter_ids[best], timestamps[best]
+
+    def _record(self, slot):
+        """Build a record view for a slot."""
+        return VoteRecord(
+            self._voter_ids[slot],
+            self._usernames[slot],
+            self.action_codes[self._votes[slot]],
+            self._timestamps[slot]
+        )
@@ -0,0 +1,120 @@
+"""
+Incremental vote tally for Selection Protocol.
+
+Keeps per-action vote counters up to date as votes are cast, changed and
+removed, so reading the current counts never rescans the vote dict.
+Counters are driven by the action registry - enabling a new action adds a
+counter without adding work to the vote hot path.
+"""
+
+from .actions import get_enabled_actions
+
+
+class VoteTally:
+    """
+    Per-action vote counters maintained incrementally.
+
+    Every vote change is applied as a delta (-1 on the previous action,
+    +1 on the new one), making each update O(1) regardless of round size.
+    """
+
+    def __init__(self, action_codes=None):
+        """
+        Initialize tally with one counter per action.
+
+        Args:
+            action_codes: Action codes to count (defaults to enabled actions)
+        """
+        self.action_codes = tuple(action_codes or get_enabled_actions())
+        self.counts = dict.fromkeys(self.action_codes, 0)
+        self.total = 0
+
+    def apply(self, new_vote, previous_vote=None):
+        """
+        Apply a vote cast or change.
+
+        Args:
+            new_vote: Action code the user now votes for
+            previous_vote: Action code the user previously voted for (None if new voter)
+        """
+        if previous_vote == new_vote:
+            return
+
+        if previous_vote is None:
+            self.total += 1
+        else:
+            self.counts[previous_vote] -= 1
+
+        self.counts[new_vote] += 1
+
+    def remove(self, vote):
+        """
+        Remove a single vote from the tally.
+
+        Args:
+            vote: Action code of the removed vote
+        """
+        self.counts[vote] -= 1
+        self.total -= 1
+
+    def reset(self):
+        """Zero all counters for a new round."""
+        for code in self.counts:
+            self.counts[code] = 0
+        self.total = 0
+
+    def as_dict(self):
+        """
+        Get a copy of the current counts.
+
+        Returns:
+            dict: {action_code: count} (e.g., {'k': 5, 'l': 3, 'x': 2})
+        """
+        return dict(self.counts)
+
+    def recount(self, votes):
+        """
+        Count votes from scratch (reference implementation).
+
+        Args:
+            votes: VoteStore holding the round's votes
+
+        Returns:
+            dict: {action_code: count} computed by full scan
+        """
+        counts = dict.fromkeys(self.action_codes, 0)
+        for vote in votes.vote_codes():
+            if vote in counts:
+                counts[vote] += 1
+        return counts
+
+    def rebuild(self, votes):
+        """
+        Replace the counters with a full recount (bulk restore).
+
+        Counts come from VoteStore.code_counts() (array scans) rather than
+        the per-vote reference scan in recount().
+
+        Args:
+            votes: VoteStore holding the round's votes
+        """
+        counts = votes.code_counts()
+        self.counts.update({code: counts.get(code, 0) for code in self.action_codes})
+        self.total = len(votes)
+
+    def verify(self, votes):
+        """
+        Check incremental counters against a full recount.
+
+        Args:
+            votes: VoteStore holding the round's votes
+
+        Raises:
+            RuntimeError: If counters have drifted from the recount
+        """
+        expected = self.recount(votes)
+        if expected != self.counts or self.total != len(votes):
+            raise RuntimeError(
+                f"Vote tally drift: incremental={self.counts} (total {self.total}), "
+                f"recount={expected} (total {len(votes)})"
+            )
@@ -0,0 +1,111 @@
+"""
+Voting rules for Selection Protocol.
+
+Single source of truth for the round timer and winner rules described in
+docs/VOTING_RULES.md. VoteManager calls these per vote; the simulator
+(src/simulator.py) evaluates vectorized versions built from the same
+constants and checks them against these functions before every run.
+"""
+
+from math import log2
+
+# Timer limit (seconds)
+BASE_TIME = 30              # Unanimous vote
+MAX_TIME = 120              # Hard cap
+UNCERTAINTY_BONUS = 60      # Added at maximum entropy (perfect 3-way split)
+X_BONUS = 60                # Added at 100% X (deliberation request)
+MAX_ENTROPY = 1.585         # log2(3) for 3 options
+
+# Winner threshold (percent of all votes)
+WIN_THRESHOLD_PCT = 33
+
+
+def timer_limit(k_count, l_count, x_count, base_time=BASE_TIME):
+    """
+    Calculate timer limit based purely on vote distribution.
+
+    Uses Shannon entropy to measure vote uncertainty/split:
+    - Unanimous (100% one option) → 30s (certain, quick)
+    - 50/50 split → ~68s (uncertain, debate)
+    - Perfect 3-way split → ~100s (maximum complexity)
+    - X dominant → extends further (deliberation request)
+
+    Formula:
+        time = base_time + uncertainty_bonus + x_bonus
+        - uncertainty_bonus: 0-60s based on entropy (how split)
+        - x_bonus: 0-60s based on X percentage (deliberation)
+        - Capped at 120s maximum
+
+    Args:
+        k_count: Number of K votes
+        l_count: Number of L votes
+        x_count: Number of X votes
+        base_time: Minimum timer duration
+
+    Returns:
+        int: Timer limit in seconds (30-120)
+    """
+    total = k_count + l_count + x_count
+
+    if total == 0:
+        return base_time
+
+    # Convert to percentages
+    k_pct = k_count / total
+    l_pct = l_count / total
+    x_pct = x_count / total
+
+    # Calculate Shannon entropy (measures uncertainty)
+    # Entropy = -Σ(p_i * log2(p_i)) for each vote type
+    # Range: 0 (unanimous) to log2(3)≈1.585 (perfect 3-way split)
+    entropy = 0
+    for pct in [k_pct, l_pct, x_pct]:
+        if pct > 0:
+            entropy -= pct * log2(pct)
+
+    # Normalize entropy to 0-1 scale
+    uncertainty = min(entropy / MAX_ENTROPY, 1.0)
+
+    # Additive components
+    uncertainty_bonus = uncertainty * UNCERTAINTY_BONUS  # How split votes are (0-60s)
+    x_bonus = x_pct * X_BONUS                            # Deliberation request (0-60s)
+
+    # Combine and cap
+    total_time = base_time + uncertainty_bonus + x_bonus
+    return min(int(total_time), MAX_TIME)
+
+
+def winner(k_count, l_count, total):
+    """
+    Determine round winner per VOTING_RULES.md.
+
+    Rules:
+    - K wins IF: K > 33% AND K > L
+    - L wins IF: L > 33% AND L > K
+    - X wins (no action) IF: Neither K nor L > 33%, OR K = L (tie)
+
+    Args:
+        k_count: Number of K votes
+        l_count: Number of L votes
+        total: Total votes across all actions
+
+    Returns:
+        str: Winning action code ('k', 'l', or 'x')
+    """
+    # No votes = X wins (no action)
+    if total == 0:
+        return 'x'
+
+    k_percent = (k_count / total) * 100
+    l_percent = (l_count / total) * 100
+
+    # K wins: K > 33% AND K > L
+    if k_percent > WIN_THRESHOLD_PCT and k_count > l_count:
+        return 'k'
+
+    # L wins: L > 33% AND L > K
+    if l_percent > WIN_THRESHOLD_PCT and l_count > k_count:
+        return 'l'
+
+    # X wins: Neither K nor L > 33%, OR K = L (tie)
+    return 'x'
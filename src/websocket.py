@@ -2,16 +2,164 @@
 WebSocket event handlers for Flask-SocketIO.
 
 Handles all real-time communication between clients and server including:
-- Client connection/disconnection
+- Client connection/disconnection and role rooms (overlay, admin, bot)
+- Action log delivery to admin panels (new entries, scroll-back pages)
+- Vote state snapshots (on join and resync after vote_patch gaps)
 - Vote updates and timer controls
 - Admin keypress commands (direct, no cooldowns)
 """
 
-from flask_socketio import emit
+import threading
+from flask import request
+from flask_socketio import emit, join_room
+from .broadcast import BroadcastCoalescer, ROLES, ROOM_ADMIN, ROOM_OVERLAY
+from .config import CLIENT_COUNT_MAX_RATE, ACTION_LOG_MAX_RATE, ACTION_LOG_PAGE_SIZE, ACTION_LOG_PAGE_MAX
 from .game_controller import send_keypress
 
 
-def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_manager=None):
+class ClientRooms:
+    """
+    Role rooms, connected-client counts and the action log feed across namespaces.
+
+    Clients emit 'join' {'roles': [...]} after every connect. Each role is
+    a room; the joiner alone gets the snapshots its roles render. Counts
+    reach admin rooms as partial admin_state_update events, coalesced to
+    at most max_rate per second, so an OBS refresh storm costs one
+    snapshot per overlay instead of an admin broadcast per connection.
+
+    Admin joiners get the newest page of the action log; after that,
+    admin rooms get only entries added since the last delivery (at most
+    log_max_rate batches per second) and fetch older pages on demand.
+    """
+
+    def __init__(self, socketio, admin_state, action_log=None, max_rate=CLIENT_COUNT_MAX_RATE,
+                 log_max_rate=ACTION_LOG_MAX_RATE):
+        """
+        Initialize rooms (call register() for each namespace).
+
+        Args:
+            socketio: Flask-SocketIO instance
+            admin_state: Global admin state dictionary (connected_clients, last_action)
+            action_log: ActionLog delivered to admin rooms (None = no log feed)
+            max_rate: Maximum count updates per second
+            log_max_rate: Maximum action log deliveries per second
+        """
+        self.socketio = socketio
+        self.admin_state = admin_state
+        self.action_log = action_log
+        self.namespaces = {}          # namespace -> VoteManager (or None)
+        self.counts = dict.fromkeys(ROLES, 0)
+        self._roles = {}              # (namespace, sid) -> set of joined roles
+        self._lock = threading.Lock()
+        self._updates = BroadcastCoalescer(socketio, self._send_counts, max_rate)
+        self._log_sent = 0            # Last action log ID delivered
+        self._log_lock = threading.Lock()
+        self._log_updates = BroadcastCoalescer(socketio, self._send_log, log_max_rate)
+
+    def register(self, namespace, vote_manager=None):
+        """Register connect/disconnect/join handlers on a namespace (once)."""
+        if namespace in self.namespaces:
+            if vote_manager is not None:
+                self.namespaces[namespace] = vote_manager
+            return
+        self.namespaces[namespace] = vote_manager
+
+        @self.socketio.on('connect', namespace=namespace)
+        def handle_connect():
+            """Count the client; snapshots follow its join."""
+            with self._lock:
+                self._roles[(namespace, request.sid)] = set()
+                self.admin_state['connected_clients'] += 1
+            self._updates.mark_dirty()
+
+        @self.socketio.on('disconnect', namespace=namespace)
+        def handle_disconnect():
+            with self._lock:
+                for role in self._roles.pop((namespace, request.sid), ()):
+                    self.counts[role] -= 1
+                self.admin_state['connected_clients'] = max(0, self.admin_state['connected_clients'] - 1)
+            self._updates.mark_dirty()
+
+        @self.socketio.on('join', namespace=namespace)
+        def handle_join(data):
+            """
+            Join role rooms and send this client its snapshots.
+
+            Expected data: {'roles': ['overlay', 'admin']} or {'role': 'bot'}
+            """
+            data = data or {}
+            roles = data.get('roles') or [data.get('role')]
+            invalid = [role for role in roles if role not in ROLES]
+            if invalid:
+                return {'success': False, 'error': f"Unknown role(s): {invalid}"}
+
+            with self._lock:
+                joined = self._roles.setdefault((namespace, request.sid), set())
+                for role in set(roles) - joined:
+                    join_room(role)
+                    joined.add(role)
+                    self.counts[role] += 1
+            self._updates.mark_dirty()
+
+            manager = self.namespaces[namespace]
+            if manager is not None and (ROOM_OVERLAY in roles or ROOM_ADMIN in roles):
+                emit('vote_update', manager.get_vote_snapshot())
+            if ROOM_ADMIN in roles:
+                emit('admin_state_update', self.admin_state)
+                if self.action_log is not None:
+                    entries, has_more = self.action_log.page()
+                    emit('action_log', {'entries': entries, 'has_more': has_more, 'reset': True})
+            return {'success': True, 'roles': sorted(joined)}
+
+        @self.socketio.on('action_log_page', namespace=namespace)
+        def handle_action_log_page(data):
+            """
+            Return a page of older action log entries (admin scroll-back).
+
+            Expected data: {'before': 1234, 'limit': 50} (before omitted = newest)
+            Returns: {'entries': [...oldest first], 'has_more': bool}
+            """
+            if self.action_log is None:
+                return {'entries': [], 'has_more': False}
+            data = data or {}
+            try:
+                before = int(data['before']) if data.get('before') is not None else None
+                limit = min(int(data.get('limit', ACTION_LOG_PAGE_SIZE)), ACTION_LOG_PAGE_MAX)
+            except (TypeError, ValueError):
+                return {'success': False, 'error': "before and limit must be integers"}
+            entries, has_more = self.action_log.page(before, limit)
+            return {'entries': entries, 'has_more': has_more}
+
+    def action_logged(self):
+        """Schedule delivery of new action log entries (called on every log_action)."""
+        self._log_updates.mark_dirty()
+
+    def _send_counts(self):
+        """Push connected-client counts to every admin room."""
+        with self._lock:
+            update = {'connected_clients': self.admin_state['connected_clients'], 'client_roles': dict(self.counts)}
+        for namespace in self.namespaces:
+            self.socketio.emit('admin_state_update', update, namespace=namespace, to=ROOM_ADMIN)
+        roles = ', '.join(f"{role} {count}" for role, count in update['client_roles'].items())
+        print(f"Clients connected: {update['connected_clients']} ({roles})")
+
+    def _send_log(self):
+        """Print and push action log entries added since the last delivery."""
+        with self._log_lock:
+            entries = self.action_log.since(self._log_sent)
+            if not entries:
+                return
+            self._log_sent = entries[-1]['id']
+            self.admin_state['last_action'] = entries[-1]['action']
+            self.admin_state['last_action_time'] = entries[-1]['time']
+            update = {'entries': entries, 'reset': False}
+            for namespace in self.namespaces:
+                self.socketio.emit('action_log', update, namespace=namespace, to=ROOM_ADMIN)
+        print('\n'.join(self.action_log.format(entry) for entry in entries))
+
+
+def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_manager=None, namespace='/',
+                            rooms=None):
     """
     Register all SocketIO event handlers.
 
@@ -21,31 +169,30 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
         admin_state: Global admin state dictionary
         log_action: Logging function for admin actions
         vote_manager: VoteManager instance (new, replaces vote_state)
+        namespace: Socket.IO namespace to register on (one per arena)
+        rooms: Shared ClientRooms (None = rooms for this namespace only)
     """
+    # Admin keypresses go to this arena's game window
+    game_send_keypress = vote_manager.executor.game.send_keypress if vote_manager else send_keypress
+
+    # Connect/disconnect/join (role rooms, snapshots to the joiner only)
+    if rooms is None:
+        rooms = ClientRooms(socketio, admin_state)
+    rooms.register(namespace, vote_manager)
 
     def broadcast_states():
-        """Broadcast admin state to all clients."""
+        """Broadcast admin state to admin panels."""
         # Note: vote_manager handles vote_update broadcasts directly
-        socketio.emit('admin_state_update', admin_state)
-
-    @socketio.on('connect')
-    def handle_connect():
-        """Handle client connection."""
-        admin_state['connected_clients'] += 1
-        print(f"Client connected to overlay (total: {admin_state['connected_clients']})")
-        log_action("Client connected", f"Total: {admin_state['connected_clients']}")
-
-        # Send current states to newly connected client
-        emit('admin_state_update', admin_state)
-
-    @socketio.on('disconnect')
-    def handle_disconnect():
-        """Handle client disconnection."""
-        admin_state['connected_clients'] = max(0, admin_state['connected_clients'] - 1)
-        print(f"Client disconnected from overlay (remaining: {admin_state['connected_clients']})")
-        log_action("Client disconnected", f"Remaining: {admin_state['connected_clients']}")
-
-    @socketio.on('admin_add_k')
+        socketio.emit('admin_state_update', admin_state, namespace=namespace, to=ROOM_ADMIN)
+
+    @socketio.on('vote_resync', namespace=namespace)
+    def handle_vote_resync():
+        """Return a full vote state snapshot (client detected a vote_patch gap)."""
+        if not vote_manager:
+            return None
+        return vote_manager.get_vote_snapshot()
+
+    @socketio.on('admin_add_k', namespace=namespace)
     def handle_admin_add_k():
         """Handle admin K +1 button."""
         vote_state['k_votes'] += 1
@@ -53,7 +200,7 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
         log_action("K +1", f"K={vote_state['k_votes']}, L={vote_state['l_votes']}")
         broadcast_states()
 
-    @socketio.on('admin_sub_k')
+    @socketio.on('admin_sub_k', namespace=namespace)
     def handle_admin_sub_k():
         """Handle admin K -1 button."""
         if vote_state['k_votes'] > 0:
@@ -62,7 +209,7 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
             log_action("K -1", f"K={vote_state['k_votes']}, L={vote_state['l_votes']}")
             broadcast_states()
 
-    @socketio.on('admin_add_l')
+    @socketio.on('admin_add_l', namespace=namespace)
     def handle_admin_add_l():
         """Handle admin L +1 button."""
         vote_state['l_votes'] += 1
@@ -70,7 +217,7 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
         log_action("L +1", f"K={vote_state['k_votes']}, L={vote_state['l_votes']}")
         broadcast_states()
 
-    @socketio.on('admin_sub_l')
+    @socketio.on('admin_sub_l', namespace=namespace)
     def handle_admin_sub_l():
         """Handle admin L -1 button."""
         if vote_state['l_votes'] > 0:
@@ -79,7 +226,7 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
             log_action("L -1", f"K={vote_state['k_votes']}, L={vote_state['l_votes']}")
             broadcast_states()
 
-    @socketio.on('admin_reset')
+    @socketio.on('admin_reset', namespace=namespace)
     def handle_admin_reset():
         """Handle admin reset button."""
         vote_state['k_votes'] = 0
@@ -88,7 +235,7 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
         log_action("Reset votes", "K=0, L=0")
         broadcast_states()
 
-    @socketio.on('admin_random_vote')
+    @socketio.on('admin_random_vote', namespace=namespace)
     def handle_admin_random_vote():
         """Handle admin random vote button."""
         import random
@@ -101,13 +248,13 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
         vote_state['total_votes'] = vote_state['k_votes'] + vote_state['l_votes']
         broadcast_states()
 
-    @socketio.on('admin_send_keypress')
+    @socketio.on('admin_send_keypress', namespace=namespace)
     def handle_admin_send_keypress(data):
         """Handle admin keypress to game (direct, no cooldowns)."""
         key = data.get('key', '')
 
         # Send the keypress directly
-        result = send_keypress(key, log_action)
+        result = game_send_keypress(key, log_action)
 
         # Update camera mode if it's a camera control
         if key in ['ctrl+g', 'ctrl+o', 'ctrl+r']:
@@ -124,30 +271,30 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
         # Broadcast updated states
         broadcast_states()
 
-    @socketio.on('admin_pause_timer')
+    @socketio.on('admin_pause_timer', namespace=namespace)
     def handle_admin_pause_timer():
         """Handle admin pause timer button."""
         vote_state['timer_paused'] = True
         log_action("Timer paused")
         broadcast_states()
 
-    @socketio.on('admin_resume_timer')
+    @socketio.on('admin_resume_timer', namespace=namespace)
     def handle_admin_resume_timer():
         """Handle admin resume timer button."""
         vote_state['timer_paused'] = False
         log_action("Timer resumed")
         broadcast_states()
 
-    @socketio.on('admin_trigger_now')
+    @socketio.on('admin_trigger_now', namespace=namespace)
     def handle_admin_trigger_now():
         """Handle admin trigger now button."""
         # Determine winner
         if vote_state['k_votes'] > vote_state['l_votes']:
             winner = 'K (Kill)'
-            send_keypress('Delete', log_action)
+            game_send_keypress('Delete', log_action)
         elif vote_state['l_votes'] > vote_state['k_votes']:
             winner = 'L (Lay)'
-            send_keypress('Insert', log_action)
+            game_send_keypress('Insert', log_action)
         else:
             winner = 'Tie - no action'
 
@@ -159,7 +306,7 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
         vote_state['time_remaining'] = admin_state['timer_duration']
         broadcast_states()
 
-    @socketio.on('admin_reset_timer')
+    @socketio.on('admin_reset_timer', namespace=namespace)
     def handle_admin_reset_timer(data):
         """Handle admin reset timer button."""
         duration = data.get('duration', 30)
@@ -168,7 +315,7 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
         log_action("Timer reset", f"{duration}s")
         broadcast_states()
 
-    @socketio.on('admin_toggle_setting')
+    @socketio.on('admin_toggle_setting', namespace=namespace)
     def handle_admin_toggle_setting(data):
         """Handle admin automation setting toggles."""
         setting = data.get('setting')
@@ -183,34 +330,34 @@ def setup_socketio_handlers(socketio, vote_state, admin_state, log_action, vote_
     # NEW ADMIN TESTING HANDLERS (vote_manager-based)
     # ============================================================
 
-    @socketio.on('admin_add_vote')
+    @socketio.on('admin_add_vote', namespace=namespace)
     def handle_admin_add_vote(data):
         """Handle admin test vote addition (+)."""
         if not vote_manager:
             return
         vote_type = data.get('vote_type', '').lower()
         if vote_type in ['k', 'l', 'x']:
-            test_username = vote_manager.add_test_vote(vote_type)
+            test_username = vote_manager.commands.call(vote_manager.add_test_vote, vote_type)
             log_action(f"Test vote added: {vote_type.upper()}", test_username)
 
-    @socketio.on('admin_remove_vote')
+    @socketio.on('admin_remove_vote', namespace=namespace)
     def handle_admin_remove_vote(data):
         """Handle admin vote removal (-)."""
         if not vote_manager:
             return
         vote_type = data.get('vote_type', '').lower()
         if vote_type in ['k', 'l', 'x']:
-            success = vote_manager.remove_last_vote(vote_type)
+            success = vote_manager.commands.call(vote_manager.remove_last_vote, vote_type)
             if not success:
                 log_action(f"Remove {vote_type.upper()} vote", "No votes to remove")
 
-    @socketio.on('admin_force_execute')
+    @socketio.on('admin_force_execute', namespace=namespace)
     def handle_admin_force_execute(data):
         """Handle admin force execution (K/L/X caps buttons)."""
         if not vote_manager:
             return
         action = data.get('action', '').lower()
         if action in ['k', 'l', 'x']:
-            vote_manager.force_execute_action(action)
+            vote_manager.commands.call(vote_manager.force_execute_action, action)
 
     return broadcast_states
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Keypress latency benchmark for the game controller backends.
+
+Creates a throwaway X window (or targets --window), sends the same key
+sequence through each backend and reports per-keypress latency. For the
+created window, key events are also counted on a separate X connection
+to confirm every keypress was delivered. Runs headless under Xvfb:
+
+Usage:
+    xvfb-run -a python tools/bench_keypress.py
+    python tools/bench_keypress.py --count 200 --backends dry-run,xtest
+    python tools/bench_keypress.py --window 0x3a00007   # real game window
+"""
+
+import argparse
+import shutil
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.game_controller import (  # noqa: E402
+    create_keypress_backend, set_game_window_id, set_keypress_backend, send_keypress,
+)
+
+KEYS = ['Delete', 'Insert', 'ctrl+g', 'KP_Add', 'KP_Subtract']
+
+
+class KeyCounter:
+    """Test window that counts KeyPress events delivered to it."""
+
+    def __init__(self):
+        from Xlib import X, display as xdisplay
+
+        self._X = X
+        self.display = xdisplay.Display()
+        screen = self.display.screen()
+        self.window = screen.root.create_window(
+            0, 0, 200, 200, 0, screen.root_depth,
+            event_mask=X.KeyPressMask,
+        )
+        self.window.set_wm_name('Keypress Benchmark')
+        self.window.map()
+        self.display.sync()
+        self.count = 0
+
+    @property
+    def id(self):
+        return self.window.id
+
+    def drain(self, settle=0.2):
+        """Count events received so far (waits briefly for stragglers)."""
+        deadline = time.monotonic() + settle
+        while time.monotonic() < deadline:
+            while self.display.pending_events():
+                event = self.display.next_event()
+                if event.type == self._X.KeyPress:
+                    self.count += 1
+            time.sleep(0.01)
+        return self.count
+
+
+def bench(name, count, counter=None):
+    """Send count keypresses through a backend; returns latencies (ms) or None."""
+    try:
+        backend = create_keypress_backend(name)
+    except RuntimeError as e:
+        print(f"⚠ {name}: unavailable ({e})")
+        return None
+    set_keypress_backend(backend)
+
+    before = counter.drain(0) if counter else 0
+    latencies = []
+    for i in range(count):
+        key = KEYS[i % len(KEYS)]
+        start = time.perf_counter()
+        result = send_keypress(key, timeout=2.0)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if not result['success']:
+            print(f"✗ {name}: {key} failed - {result['error']}")
+            return None
+
+    delivered = None
+    if counter and name != 'dry-run':
+        delivered = counter.drain() - before
+    report(name, latencies, delivered, count)
+    return latencies
+
+
+def report(name, latencies, delivered, count):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    line = (f"{name:>8}: mean {statistics.mean(latencies):8.3f}ms  "
+            f"p50 {statistics.median(latencies):8.3f}ms  p95 {p95:8.3f}ms  "
+            f"max {ordered[-1]:8.3f}ms")
+    if delivered is not None:
+        # Combos (ctrl+g) deliver one KeyPress per key in the combination
+        expected = sum(len(KEYS[i % len(KEYS)].split('+')) for i in range(count))
+        line += f"  delivered {delivered}/{expected} key events"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=50, help='Keypresses per backend')
+    parser.add_argument('--backends', default='dry-run,xtest,xdotool', help='Comma-separated backends')
+    parser.add_argument('--window', type=lambda v: int(v, 0), help='Target window ID (default: create one)')
+    args = parser.parse_args()
+
+    counter = None
+    if args.window is not None:
+        window_id = args.window
+    else:
+        try:
+            counter = KeyCounter()
+        except Exception as e:
+            print(f"✗ Cannot create test window ({e}). Run under Xvfb or pass --window.")
+            sys.exit(1)
+        window_id = counter.id
+    set_game_window_id(window_id)
+
+    print(f"Target window: {window_id:#x}, {args.count} keypresses per backend")
+    for name in args.backends.split(','):
+        if name == 'xdotool' and not shutil.which('xdotool'):
+            print("⚠ xdotool: not installed, skipping")
+            continue
+        bench(name, args.count, counter)
+
+
+if __name__ == '__main__':
+    main()
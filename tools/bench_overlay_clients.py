@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Benchmark overlay fan-out: concurrent clients vs. broadcast rate per serving mode.
+
+For each serving mode and client count, runs the real server (src.server
+handlers, dry-run keypresses, data files in a temp directory) as a
+subprocess, connects N overlay clients to the default arena from
+worker processes, then has a bot client cast votes at --rate per second.
+The broadcast coalescer is uncapped, so every vote becomes one vote_patch
+broadcast to all N clients (plus the round timer's once-a-second tick).
+
+The server logs each vote_patch's seq and send time; clients log when
+they receive it. Reported per run:
+- delivered: patches received / (patches sent x clients)
+- latency p50 / p99 / max from server emit to client receipt
+- server CPU (share of one core) and resident memory
+
+A mode "sustains" N clients at the rate when delivery is complete and
+p99 latency stays under --slo-ms.
+
+Clients run on the same machine and compete with the server for CPU;
+use --procs to spread them across cores.
+
+Usage:
+    python tools/bench_overlay_clients.py
+    python tools/bench_overlay_clients.py --modes threading,eventlet --clients 100,500,1000 --rate 20
+    python tools/bench_overlay_clients.py --websocket-only
+    python tools/bench_overlay_clients.py --serializer msgpack
+    python tools/bench_overlay_clients.py --serializer mixed   # half JSON, half msgpack
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+
+def serve(mode, port, log_path, websocket_only, serializer):
+    """Server subprocess: real handlers, logging vote_patch emits."""
+    from src import serving
+    options = ['--mode', mode, '--port', str(port)]
+    if serializer != 'json':
+        options.append('--msgpack')
+    if websocket_only:
+        options.append('--websocket-only')
+    serving.configure(options)
+
+    from src import server
+    from src.game_controller import create_keypress_backend, set_keypress_backend
+
+    set_keypress_backend(create_keypress_backend('dry-run'))
+    for arena in server.arenas:
+        arena.vote_manager.broadcaster.interval = 0.0   # One broadcast per vote
+
+    log = open(log_path, 'a')
+    emit = server.socketio.emit
+
+    def logged_emit(event, *args, **kwargs):
+        if event == 'vote_patch':
+            log.write(f"{args[0]['seq']} {time.time()}\n")
+            log.flush()
+        return emit(event, *args, **kwargs)
+
+    server.socketio.emit = logged_emit
+    server.scheduler.start()
+    server.run_server(server.socketio, server.app, server.serving)
+
+
+def start_server(args, mode, log_path, workdir):
+    command = [sys.executable, str(Path(__file__).resolve()), '--serve', mode,
+               '--port', str(args.port), '--log', str(log_path), '--serializer', args.serializer]
+    if args.websocket_only:
+        command.append('--websocket-only')
+    return subprocess.Popen(command, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def process_usage(pid):
+    """(CPU seconds, resident MB) of a process."""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    rss = int(fields[21]) * PAGE_SIZE / 2**20
+    return cpu, rss
+
+
+async def wait_for_port(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+# ----------------------------------------------------------------
+# Overlay clients (worker processes)
+# ----------------------------------------------------------------
+
+def client_worker(url, count, transports, serializer, ready, go, stop, results):
+    """Connect count clients, record vote_patch arrivals until stop is set."""
+    asyncio.run(run_clients(url, count, transports, serializer, ready, go, stop, results))
+
+
+async def run_clients(url, count, transports, serializer, ready, go, stop, results):
+    import socketio
+    from src.serving import packet_serializer, SOCKETIO_PATHS
+
+    arrivals = []          # (seq, time received) across this worker's clients
+    clients = []
+    failed = 0
+
+    def on_patch(patch):
+        arrivals.append((patch['seq'], time.time()))
+
+    for i in range(count):
+        name = ('json', 'msgpack')[i % 2] if serializer == 'mixed' else serializer
+        client = socketio.AsyncClient(reconnection=False, serializer=packet_serializer(name))
+        client.on('vote_patch', on_patch)
+        try:
+            await client.connect(url, transports=transports, socketio_path=SOCKETIO_PATHS[name], wait_timeout=30)
+            await client.call('join', {'roles': ['overlay']}, timeout=30)
+            clients.append(client)
+        except Exception:
+            failed += 1
+
+    ready.put(failed)
+    while not go.is_set():
+        await asyncio.sleep(0.05)
+    while not stop.is_set():
+        await asyncio.sleep(0.05)
+
+    results.put(arrivals)
+    await asyncio.gather(*(client.disconnect() for client in clients), return_exceptions=True)
+
+
+# ----------------------------------------------------------------
+# One run
+# ----------------------------------------------------------------
+
+async def drive_votes(url, rate, duration, serializer):
+    """Bot client: cast votes from distinct viewers at rate per second."""
+    import socketio
+    from src.serving import packet_serializer, SOCKETIO_PATHS
+
+    name = 'json' if serializer == 'json' else 'msgpack'
+    bot = socketio.AsyncClient(reconnection=False, serializer=packet_serializer(name))
+    await bot.connect(url, transports=['websocket'], socketio_path=SOCKETIO_PATHS[name])
+    rng = random.Random(7)
+    interval = 1 / rate
+    deadline = time.monotonic() + duration
+    next_send = time.monotonic()
+    sent = 0
+    while time.monotonic() < deadline:
+        bot_vote = {
+            'username': f'viewer{sent}',
+            'user_id': str(sent),
+            'channel_id': None,
+            'vote': rng.choice('kl'),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        await bot.emit('vote_cast', bot_vote)
+        sent += 1
+        next_send += interval
+        await asyncio.sleep(max(0.0, next_send - time.monotonic()))
+    await bot.disconnect()
+    return sent
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench(args, mode, clients):
+    workdir = Path(tempfile.mkdtemp(prefix='overlay-bench-'))
+    log_path = workdir / 'emits.log'
+    url = f'http://127.0.0.1:{args.port}'
+    transports = ['websocket'] if args.websocket_only else None
+    proc = start_server(args, mode, log_path, workdir)
+    workers = []
+    cutoff = 0.0
+    try:
+        asyncio.run(wait_for_port(args.port))
+        context = multiprocessing.get_context('spawn')
+        ready, results = context.Queue(), context.Queue()
+        go, stop = context.Event(), context.Event()
+        procs = min(args.procs, clients)
+        connect_started = time.monotonic()
+        for i in range(procs):
+            count = clients // procs + (1 if i < clients % procs else 0)
+            worker = context.Process(target=client_worker,
+                                     args=(url, count, transports, args.serializer, ready, go, stop, results))
+            worker.start()
+            workers.append(worker)
+        connect_failed = sum(ready.get(timeout=300) for _ in workers)
+        connect_time = time.monotonic() - connect_started
+        time.sleep(1)  # Let connect-time broadcasts settle
+
+        cpu_before, _ = process_usage(proc.pid)
+        go.set()
+        started = time.monotonic()
+        asyncio.run(drive_votes(url, args.rate, args.duration, args.serializer))
+        time.sleep(args.grace)
+        elapsed = time.monotonic() - started
+        cpu_after, rss = process_usage(proc.pid)
+        cutoff = time.time() - args.grace / 2   # Timer ticks keep coming; ignore the last ones
+        stop.set()
+        arrivals = [item for _ in workers for item in results.get(timeout=60)]
+    finally:
+        for worker in workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.kill()
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+        emitted = {}
+        if log_path.exists():
+            for line in log_path.read_text().splitlines():
+                seq, sent_at = line.split()
+                if float(sent_at) < cutoff:
+                    emitted[int(seq)] = float(sent_at)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    connected = clients - connect_failed
+    latencies = [(received - emitted[seq]) * 1000 for seq, received in arrivals if seq in emitted]
+    expected = len(emitted) * connected
+    return {
+        'mode': mode,
+        'clients': clients,
+        'connected': connected,
+        'connect_s': connect_time,
+        'broadcasts': len(emitted),
+        'delivered': len(latencies) / expected if expected else 0.0,
+        'p50': percentile(latencies, 0.50),
+        'p99': percentile(latencies, 0.99),
+        'max': max(latencies, default=float('nan')),
+        'cpu': (cpu_after - cpu_before) / elapsed,
+        'rss': rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='threading,eventlet,gevent',
+                        help='Comma-separated serving modes (threading = today\'s Werkzeug server without the reloader)')
+    parser.add_argument('--clients', default='50,200,500', help='Comma-separated overlay client counts')
+    parser.add_argument('--rate', type=float, default=10, help='Broadcasts (votes) per second')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of voting per run')
+    parser.add_argument('--grace', type=float, default=2, help='Seconds to wait for late deliveries')
+    parser.add_argument('--procs', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help='Client worker processes')
+    parser.add_argument('--slo-ms', type=float, default=250, help='p99 latency a sustained run must stay under')
+    parser.add_argument('--websocket-only', action='store_true', help='Serve and connect with websocket only')
+    parser.add_argument('--serializer', choices=('json', 'msgpack', 'mixed'), default='json',
+                        help='Socket.IO packet encoding of the clients (mixed = alternate per client; '
+                             'the server runs with --msgpack unless json)')
+    parser.add_argument('--port', type=int, default=5095)
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--log', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.log, args.websocket_only, args.serializer)
+        return
+
+    transport = 'websocket only' if args.websocket_only else 'polling + upgrade'
+    print(f"Overlay fan-out: {args.rate:g} broadcasts/s for {args.duration:g}s, {transport}, {args.serializer}, "
+          f"{args.procs} client process(es), {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<10} {'clients':>7} {'connect':>8} {'delivered':>9} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'cpu':>6} {'rss MB':>7}  sustained")
+    for mode in args.modes.split(','):
+        for clients in (int(n) for n in args.clients.split(',')):
+            try:
+                r = bench(args, mode, clients)
+            except Exception as e:
+                print(f"{mode:<10} {clients:>7}  ✗ {str(e) or type(e).__name__}")
+                continue
+            sustained = r['connected'] == clients and r['delivered'] >= 0.999 and r['p99'] < args.slo_ms
+            print(f"{mode:<10} {clients:>7} {r['connect_s']:>7.1f}s {r['delivered']:>8.1%} {r['p50']:>8.1f} "
+                  f"{r['p99']:>8.1f} {r['max']:>8.1f} {r['cpu']:>5.0%} {r['rss']:>7.0f}  "
+                  f"{'✓' if sustained else '✗'}")
+
+
+if __name__ == '__main__':
+    main()
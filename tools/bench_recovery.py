@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Restore-time benchmark for round crash recovery.
+
+Builds a live round of N votes (default 50,000) with a running timer,
+lets RoundRecovery snapshot it and journal a tail of further votes, then
+restores into a fresh VoteManager (as after a restart) and checks that
+counts, first-L claimant, claim queue and timer deadline match.
+
+Then checks the two crash windows around a snapshot:
+- a periodic snapshot still queued on the writer thread (the old
+  snapshot plus both journals must restore the current round)
+- a round-boundary checkpoint (the snapshot on disk must already be the
+  new round when reset_votes() returns, so an executed round is never
+  restored)
+
+Usage:
+    python tools/bench_recovery.py
+    python tools/bench_recovery.py 100000 --journal 5000
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.vote_manager import VoteManager  # noqa: E402
+from src.recovery import RoundRecovery  # noqa: E402
+from src.scheduler import DeadlineScheduler  # noqa: E402
+
+TARGET_MS = 200
+
+
+class StubSocketIO:
+    """Minimal SocketIO stand-in for running VoteManager without Flask."""
+
+    def emit(self, event, data=None, **kwargs):
+        pass
+
+    def start_background_task(self, target, *args, **kwargs):
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+def fingerprint(manager):
+    """Round state that must survive a restart."""
+    deadline = time.time() - time.monotonic() + manager.round_start_time + manager.timer_limit
+    return {
+        'round_id': manager.round_id,
+        'counts': dict(manager.tally.counts),
+        'claimant': manager.first_l_claimant,
+        'queue': manager.get_claimant_queue(10),
+        'deadline': round(deadline, 2),
+    }
+
+
+def restore_copy(directory):
+    """Restore a copy of the recovery directory as it is now (a crash at this instant)."""
+    crashed = Path(tempfile.mkdtemp(prefix='recovery-crash-'))
+    try:
+        for path in directory.iterdir():
+            if path.is_file():
+                shutil.copy(path, crashed / path.name)
+        manager = VoteManager(StubSocketIO(), scheduler=DeadlineScheduler('crash-timer'))
+        manager.commands.call(RoundRecovery(manager, crashed)._restore)
+        return fingerprint(manager) if manager.timer_started else {'round_id': manager.round_id}
+    finally:
+        shutil.rmtree(crashed, ignore_errors=True)
+
+
+def check_crash_windows():
+    """Crash while a snapshot is in flight, and right after a round-boundary checkpoint."""
+    directory = Path(tempfile.mkdtemp(prefix='recovery-window-'))
+    failures = []
+    scheduler = DeadlineScheduler('window-timer')
+    try:
+        manager = VoteManager(StubSocketIO(), scheduler=scheduler)
+        recovery = RoundRecovery(manager, directory)
+        recovery.start()
+
+        def cast(start, count):
+            for i in range(start, start + count):
+                manager._apply_vote(f'viewer{i}', 'kl'[i % 2], None, str(i))
+            if manager.timer_started:
+                manager._update_timer_limit()
+
+        manager.commands.call(cast, 0, 500)
+        manager.commands.call(recovery.flush)
+
+        # Periodic snapshot stuck behind a slow write: journal rotated, snapshot not on disk yet
+        release = threading.Event()
+        recovery.writer.submit(release.wait)
+        manager.commands.call(cast, 500, 200)        # Buffered, not yet flushed
+        manager.commands.call(recovery._snapshot)
+        manager.commands.call(cast, 700, 100)
+        manager.commands.call(recovery.flush)
+        if restore_copy(directory) != fingerprint(manager):
+            failures.append("crash before the snapshot was written lost or changed votes")
+        release.set()
+        recovery.writer.call(lambda: None)
+
+        # Round boundary: the new round is durable as soon as reset_votes() returns
+        manager.commands.call(manager.reset_votes)
+        if restore_copy(directory) != {'round_id': manager.round_id}:
+            failures.append("crash after a round boundary restored the previous round")
+        recovery.stop()
+    finally:
+        scheduler.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('votes', type=int, nargs='?', default=50_000, help='Votes in the snapshot')
+    parser.add_argument('--journal', type=int, default=1000, help='Votes journaled after the snapshot')
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix='recovery-bench-'))
+    rng = random.Random(7)
+    try:
+        # Live round: snapshot at startup, bulk votes, snapshot, journaled tail
+        scheduler = DeadlineScheduler('bench-timer')
+        manager = VoteManager(StubSocketIO(), scheduler=scheduler)
+        recovery = RoundRecovery(manager, directory, max_journal=args.journal + 1)
+        recovery.start()
+
+        def cast(start, count):
+            for i in range(start, start + count):
+                manager._apply_vote(f'viewer{i}', rng.choice('kkllx'), None, str(i))
+            if manager.timer_started:
+                manager._update_timer_limit()
+
+        manager.commands.call(cast, 0, args.votes)
+        manager.commands.call(recovery._snapshot)
+        manager.commands.call(cast, args.votes, args.journal)
+        recovery.stop()
+        recovery.writer.call(lambda: None)
+        scheduler.stop()
+        expected = fingerprint(manager)
+
+        # Restart: fresh manager restores from disk
+        restored_manager = VoteManager(StubSocketIO(), scheduler=DeadlineScheduler('bench-timer-2'))
+        restored = RoundRecovery(restored_manager, directory)
+        restored_manager.commands.call(restored._restore)
+        actual = fingerprint(restored_manager)
+        restored_manager.tally.verify(restored_manager.votes)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"Round: {args.votes} votes in snapshot + {args.journal} journaled")
+    print(f"Restore: {restored.restore_ms:.1f}ms (target {TARGET_MS}ms)")
+    if actual != expected:
+        print("✗ Restored state differs")
+        print(f"  expected: {expected}")
+        print(f"  actual:   {actual}")
+        sys.exit(1)
+    print("✓ Counts, claimant, queue and deadline match")
+    if restored.restore_ms > TARGET_MS:
+        print(f"⚠ Restore slower than {TARGET_MS}ms target")
+
+    failures = check_crash_windows()
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ Crash while a snapshot is in flight or at a round boundary restores the right round")
+
+
+if __name__ == '__main__':
+    main()
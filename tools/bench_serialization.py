@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Compare JSON and MessagePack Socket.IO packets for this server's events.
+
+Builds each event's payload the way the server or bot does, at a
+typical size and at raid size, then wraps it in a python-socketio
+EVENT packet and measures:
+- encoded bytes per packet (the same bytes go to every client in the
+  room)
+- encode time per packet (one encode per emit, whatever the room size)
+- decode time per packet (paid by each receiver)
+
+Raid payloads:
+- a snapshot after 5,000 voters
+- 200-vote bot batches
+- 250 action log entries in one delivery (1,000 votes/s at 4
+  deliveries/s)
+
+Usage:
+    python tools/bench_serialization.py
+    python tools/bench_serialization.py --repeat 20000
+"""
+
+import argparse
+import sys
+import threading
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from socketio import packet  # noqa: E402
+
+from src.action_log import ActionLog  # noqa: E402
+from src.vote_manager import VoteManager  # noqa: E402
+
+
+class StubSocketIO:
+    """Minimal SocketIO stand-in: drops emits, runs background tasks in threads."""
+
+    def emit(self, event, data=None, **kwargs):
+        pass
+
+    def start_background_task(self, target, *args, **kwargs):
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+def vote_snapshot(voters):
+    """vote_update snapshot after voters votes (real VoteManager state)."""
+    manager = VoteManager(StubSocketIO())
+    for i in range(voters):
+        manager.cast_vote(f"viewer_{i}", 'kllx'[i % 4], user_id=str(10_000_000 + i))
+    return manager.get_vote_snapshot()
+
+
+def bot_votes(count):
+    """vote_cast_batch payload as sent by the bot's VoteSender."""
+    return {'votes': [
+        {
+            'username': f"viewer_{i}",
+            'user_id': str(10_000_000 + i),
+            'channel_id': '123456789',
+            'vote': 'kllx'[i % 4],
+            'timestamp': '2026-10-17T20:15:42.123456',
+            'vote_id': f"5f2c9a1e7b3d-{i + 1}",
+        }
+        for i in range(count)
+    ]}
+
+
+def action_log_batch(count):
+    """action_log delivery with count new entries."""
+    log = ActionLog()
+    for i in range(count):
+        log.append(f"Vote: viewer_{i}", 'KLLX'[i % 4])
+    return {'entries': log.since(0), 'reset': False}
+
+
+def admin_state():
+    """admin_state_update payload (server.admin_state after a few actions)."""
+    return {
+        'auto_increment': False,
+        'auto_resolve': False,
+        'twitch_bot_active': True,
+        'timer_duration': 60,
+        'camera_mode': 'Generation',
+        'last_action': 'Vote: viewer_4821',
+        'last_action_time': '20:15:42',
+        'connected_clients': 12,
+        'time_remaining': 37,
+        'timer_paused': False,
+    }
+
+
+def payloads():
+    """(label, event, payload) for typical and raid-sized traffic."""
+    return [
+        ('vote_patch', 'vote_patch',
+         {'seq': 4812, 'changes': {'k_votes': 1203, 'total_votes': 3391, 'voter_count': 3391, 'time_remaining': 17}}),
+        ('vote_update (40 voters)', 'vote_update', vote_snapshot(40)),
+        ('vote_update (5,000 voters)', 'vote_update', vote_snapshot(5000)),
+        ('admin_state_update', 'admin_state_update', admin_state()),
+        ('vote_cast', 'vote_cast', bot_votes(1)['votes'][0]),
+        ('vote_cast_batch (10)', 'vote_cast_batch', bot_votes(10)),
+        ('vote_cast_batch (200)', 'vote_cast_batch', bot_votes(200)),
+        ('action_log (10)', 'action_log', action_log_batch(10)),
+        ('action_log (250)', 'action_log', action_log_batch(250)),
+    ]
+
+
+def measure(packet_class, event, payload, repeat):
+    """(bytes, encode µs, decode µs) for one EVENT packet."""
+    pkt = packet_class(packet.EVENT, data=[event, payload], namespace='/')
+    encoded = pkt.encode()
+    size = len(encoded.encode('utf-8') if isinstance(encoded, str) else encoded)
+    encode = min(timeit.repeat(pkt.encode, number=repeat, repeat=3)) / repeat * 1e6
+    decode = min(timeit.repeat(lambda: packet_class(encoded_packet=encoded), number=repeat, repeat=3)) / repeat * 1e6
+    assert packet_class(encoded_packet=encoded).data == [event, payload], f"{event} did not round-trip"
+    return size, encode, decode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000, help='Encodes/decodes per timing run')
+    args = parser.parse_args()
+
+    try:
+        from socketio.msgpack_packet import MsgPackPacket
+    except ImportError:
+        print("✗ msgpack not installed. Install with: pip install msgpack")
+        sys.exit(1)
+
+    print(f"{'payload':<28} | {'JSON B':>7} {'msgpack B':>9} {'size':>5} | "
+          f"{'enc µs':>7} {'msgpack':>7} | {'dec µs':>7} {'msgpack':>7}")
+    print("-" * 92)
+    for label, event, payload in payloads():
+        repeat = max(20, args.repeat // max(1, len(str(payload)) // 500))
+        json_size, json_enc, json_dec = measure(packet.Packet, event, payload, repeat)
+        mp_size, mp_enc, mp_dec = measure(MsgPackPacket, event, payload, repeat)
+        print(f"{label:<28} | {json_size:>7} {mp_size:>9} {mp_size / json_size:>5.0%} | "
+              f"{json_enc:>7.1f} {mp_enc:>7.1f} | {json_dec:>7.1f} {mp_dec:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
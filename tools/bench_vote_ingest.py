@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for vote ingestion.
+
+Feeds the same vote stream into VoteManager one vote at a time
+(cast_vote, as per vote_cast event) and in batches (cast_votes, as per
+vote_cast_batch event), and reports votes per second.
+
+Socket.io transport is not included - both paths use a stub SocketIO,
+so the numbers isolate server-side per-vote work (timer recomputation,
+logging, broadcast scheduling).
+
+Usage:
+    python tools/bench_vote_ingest.py
+    python tools/bench_vote_ingest.py 200000
+"""
+
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.action_log import ActionLog  # noqa: E402
+from src.vote_manager import VoteManager  # noqa: E402
+
+BATCH_SIZES = [10, 50, 200]
+
+
+class StubSocketIO:
+    """Minimal SocketIO stand-in: counts emits, runs background tasks in threads."""
+
+    def __init__(self):
+        self.emits = 0
+
+    def emit(self, event, data=None, **kwargs):
+        self.emits += 1
+
+    def start_background_task(self, target, *args, **kwargs):
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+def log_action(action, details=""):
+    """Append to an action log like server.log_action, without delivering it."""
+    action_log.append(action, details)
+
+
+action_log = ActionLog()
+
+
+def make_votes(count, voters):
+    """Generate a raid-like vote stream with repeat voters."""
+    rng = random.Random(42)
+    return [
+        {
+            'username': f"viewer_{uid}",
+            'user_id': str(uid),
+            'vote': rng.choice('kklx'),
+        }
+        for uid in (rng.randrange(voters) for _ in range(count))
+    ]
+
+
+def run_single(votes):
+    manager = VoteManager(StubSocketIO(), log_action)
+    start = time.perf_counter()
+    for vote in votes:
+        manager.cast_vote(vote['username'], vote['vote'], user_id=vote['user_id'])
+    return time.perf_counter() - start
+
+
+def run_batched(votes, batch_size):
+    manager = VoteManager(StubSocketIO(), log_action)
+    start = time.perf_counter()
+    for i in range(0, len(votes), batch_size):
+        manager.cast_votes(votes[i:i + batch_size])
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    votes = make_votes(count, voters=count // 4)
+
+    single = run_single(votes)
+    print(f"{'mode':>12} | {'seconds':>8} | {'votes/s':>10} | speedup")
+    print("-" * 48)
+    print(f"{'single':>12} | {single:>8.3f} | {count / single:>10.0f} | 1.0x")
+
+    for batch_size in BATCH_SIZES:
+        elapsed = run_batched(votes, batch_size)
+        print(f"{'batch ' + str(batch_size):>12} | {elapsed:>8.3f} | {count / elapsed:>10.0f} | {single / elapsed:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
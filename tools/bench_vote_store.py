@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for vote storage.
+
+Compares the old per-user dict layout ({username: {'vote', 'timestamp'}})
+against the columnar VoteStore at several round sizes.
+
+Usage:
+    python tools/bench_vote_store.py
+    python tools/bench_vote_store.py 10000 100000
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.vote_store import VoteStore  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def make_voters(count):
+    """Generate (user_id, username, vote) tuples resembling Twitch chat."""
+    codes = 'klx'
+    return [
+        (str(40_000_000 + i), f"viewer_{i}", codes[i % 3])
+        for i in range(count)
+    ]
+
+
+def measure(build):
+    """Run build() and return (bytes retained, seconds taken)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current, elapsed
+
+
+def build_dict_store(voters):
+    """Old layout: one dict + datetime per voter, keyed by username."""
+    votes = {}
+    for _, username, vote in voters:
+        votes[username] = {'vote': vote, 'timestamp': datetime.now()}
+    return votes
+
+
+def build_vote_store(voters):
+    """New layout: columnar VoteStore keyed by user ID."""
+    store = VoteStore()
+    for user_id, username, vote in voters:
+        store.cast(user_id, username, vote, time.monotonic())
+    return store
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    print(f"{'voters':>10} | {'dict MB':>9} {'B/voter':>8} {'s':>6} | {'store MB':>9} {'B/voter':>8} {'s':>6} | {'ratio':>5}")
+    print("-" * 82)
+
+    for size in sizes:
+        voters = make_voters(size)
+        dict_bytes, dict_time = measure(lambda: build_dict_store(voters))
+        store_bytes, store_time = measure(lambda: build_vote_store(voters))
+        print(
+            f"{size:>10} | "
+            f"{dict_bytes / 1e6:>9.1f} {dict_bytes / size:>8.0f} {dict_time:>6.2f} | "
+            f"{store_bytes / 1e6:>9.1f} {store_bytes / size:>8.0f} {store_time:>6.2f} | "
+            f"{dict_bytes / store_bytes:>5.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Check the bot's chat queue against a local stub of Helix "Send Chat Message".
+
+The stub enforces Twitch's limit (20 messages per window, 429 with a
+Ratelimit-Reset header beyond it) in scaled time: --window 3 runs the
+30-second limit ten times faster, and the ChatSender bucket is scaled
+to match. A flood of mixed messages is queued at once:
+- round results sharing one key (only the newest should be sent)
+- command replies with a short ttl (the excess should go stale)
+- repeated calls to action sharing one key (merged)
+
+Checks: no 429s, never more than 20 messages in any window, results
+sent before replies before CTAs, stale/merged messages not sent.
+
+Usage:
+    python tools/check_chat_sender.py
+    python tools/check_chat_sender.py --window 30   # real-time limit
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiohttp import web  # noqa: E402
+
+from src.chat_sender import (  # noqa: E402
+    ChatSender, CHAT_BURST, CHAT_RATE, PRIORITY_RESULT, PRIORITY_REPLY, PRIORITY_CTA,
+)
+
+TWITCH_LIMIT = 20
+
+
+class StubHelix:
+    """Helix chat endpoint that records sends and enforces the rate limit."""
+
+    def __init__(self, window):
+        self.window = window
+        self.sent = []          # (monotonic time, message)
+        self.rejected = 0
+
+    async def handle(self, request):
+        body = await request.json()
+        now = time.monotonic()
+        recent = [t for t, _ in self.sent if now - t < self.window]
+        if len(recent) >= TWITCH_LIMIT:
+            self.rejected += 1
+            reset = time.time() + self.window - (now - recent[0])
+            return web.json_response({'message': 'Too Many Requests'}, status=429,
+                                     headers={'Ratelimit-Reset': str(int(reset) + 1)})
+        self.sent.append((now, body['message']))
+        return web.json_response({'data': [{'message_id': str(len(self.sent)), 'is_sent': True}]})
+
+    def max_in_window(self):
+        times = [t for t, _ in self.sent]
+        best = 0
+        for i, start in enumerate(times):
+            best = max(best, sum(1 for t in times[i:] if t - start < self.window))
+        return best
+
+
+async def run(args):
+    stub = StubHelix(args.window)
+    app = web.Application()
+    app.router.add_post('/helix/chat/messages', stub.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', args.port)
+    await site.start()
+
+    scale = args.window / 30
+    chat = ChatSender(
+        'client', lambda: 'token', 'bot', 'channel',
+        helix_url=f'http://127.0.0.1:{args.port}/helix',
+        rate=CHAT_RATE / scale, burst=CHAT_BURST,
+    )
+    chat.start()
+
+    futures = []
+    for i in range(args.results):
+        futures.append(chat.send(f"result {i}", PRIORITY_RESULT, key='result'))
+    for i in range(args.replies):
+        futures.append(chat.send(f"reply {i}", PRIORITY_REPLY, ttl=args.window / 2))
+    for i in range(args.ctas):
+        futures.append(chat.send(f"cta {i}", PRIORITY_CTA, key='cta'))
+
+    start = time.monotonic()
+    await asyncio.wait_for(asyncio.gather(*futures), timeout=args.window * 4)
+    elapsed = time.monotonic() - start
+    await chat.close()
+    await runner.cleanup()
+    return stub, chat, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--window', type=float, default=3.0, help='Seconds standing in for the 30s limit window')
+    parser.add_argument('--replies', type=int, default=40)
+    parser.add_argument('--results', type=int, default=5)
+    parser.add_argument('--ctas', type=int, default=10)
+    parser.add_argument('--port', type=int, default=5098)
+    args = parser.parse_args()
+
+    stub, chat, elapsed = asyncio.run(run(args))
+    messages = [message for _, message in stub.sent]
+    kinds = [message.split()[0] for message in messages]
+
+    print(f"Queued: {args.results} results, {args.replies} replies, {args.ctas} CTAs "
+          f"(window {args.window:g}s)")
+    print(f"Sent {len(messages)} in {elapsed:.1f}s | stats: {chat.get_stats()}")
+    print(f"Max in any window: {stub.max_in_window()} (limit {TWITCH_LIMIT}) | 429s: {stub.rejected}")
+
+    failures = []
+    if stub.rejected:
+        failures.append(f"{stub.rejected} sends rate limited")
+    if stub.max_in_window() > TWITCH_LIMIT:
+        failures.append("window limit exceeded")
+    if messages[:1] != [f"result {args.results - 1}"] or kinds.count('result') != 1:
+        failures.append(f"expected only the newest result first, got {messages[:3]}")
+    if kinds.count('cta') != 1 or kinds[-1] != 'cta':
+        failures.append("expected one merged CTA, sent last")
+    if kinds.count('reply') >= args.replies:
+        failures.append("no stale replies were dropped")
+    if kinds != sorted(kinds, key=['result', 'reply', 'cta'].index):
+        failures.append("messages not in priority order")
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ Rate limit respected, priorities kept, stale and merged messages not sent")
+
+
+if __name__ == '__main__':
+    main()
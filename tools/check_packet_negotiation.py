@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Check per-client msgpack negotiation against the installed python-socketio.
+
+src/packet_negotiation.py relies on python-socketio internals: it wraps
+Server._send_packet (connect acks, call acks, disconnects) and sends
+broadcasts through the Engine.IO server. Run this after upgrading
+python-socketio or python-engineio.
+
+Starts a Flask-SocketIO server with the --msgpack options on a local
+port, connects a JSON client on /socket.io and a msgpack client on
+/socket.io-msgpack, and checks:
+- the internals the negotiation needs still exist
+- both clients connect (connect acknowledgement)
+- a call from each client gets its ack
+- a broadcast reaches both clients intact
+- a server-side disconnect reaches the msgpack client
+
+Usage:
+    python tools/check_packet_negotiation.py
+    python tools/check_packet_negotiation.py --port 5097
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from importlib.metadata import version
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.serving import configure, socketio_options, packet_serializer, SOCKETIO_PATHS  # noqa: E402
+
+PAYLOAD = {'seq': 7, 'changes': {'k_votes': 3, 'claimant': 'viewer_1', 'ratio': 0.25, 'tags': [1, None, True]}}
+
+
+def start_server(port):
+    """Run a server with the --msgpack options in a daemon thread."""
+    from flask import Flask, request
+    from flask_socketio import SocketIO, emit, disconnect
+    from src.packet_negotiation import mount_msgpack_path
+
+    app = Flask(__name__)
+    app.logger.disabled = True
+    socketio = SocketIO(app, **socketio_options(configure(['--mode', 'threading', '--msgpack'])))
+    mount_msgpack_path(app, socketio)
+
+    @socketio.on('echo')
+    def handle_echo(data):
+        return {'echo': data, 'sid': request.sid}
+
+    @socketio.on('broadcast')
+    def handle_broadcast(data):
+        emit('vote_patch', data, broadcast=True)
+
+    @socketio.on('kick')
+    def handle_kick():
+        disconnect()
+
+    thread = threading.Thread(
+        target=socketio.run, args=(app,),
+        kwargs={'host': '127.0.0.1', 'port': port, 'allow_unsafe_werkzeug': True, 'log_output': False},
+        daemon=True,
+    )
+    thread.start()
+    return socketio
+
+
+def check_internals(socketio):
+    """The python-socketio attributes the negotiation relies on."""
+    from src.packet_negotiation import NegotiatingManager
+    server = socketio.server
+    problems = []
+    if not isinstance(server.manager, NegotiatingManager):
+        problems.append("client_manager option not applied")
+    if not callable(getattr(server, '_send_packet', None)):
+        problems.append("Server._send_packet missing")
+    if not callable(getattr(server.eio, 'send_packet', None)):
+        problems.append("engineio Server.send_packet missing")
+    if not isinstance(getattr(server, 'environ', None), dict):
+        problems.append("Server.environ missing")
+    return problems
+
+
+def connect_client(port, name, received, disconnected):
+    import socketio
+    client = socketio.Client(reconnection=False, serializer=packet_serializer(name))
+    client.on('vote_patch', lambda data: received.append((name, data)))
+    client.on('disconnect', lambda *args: disconnected.append(name))
+    client.connect(f'http://127.0.0.1:{port}', socketio_path=SOCKETIO_PATHS[name], wait_timeout=10)
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=5097)
+    args = parser.parse_args()
+
+    print(f"python-socketio {version('python-socketio')}, python-engineio {version('python-engineio')}")
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    try:
+        server = start_server(args.port)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    failures = check_internals(server)
+    for problem in failures:
+        print(f"✗ {problem}")
+    if failures:
+        sys.exit(1)
+    print("✓ Internals present")
+
+    time.sleep(0.5)
+    received, disconnected = [], []
+    clients = {}
+    for name in ('json', 'msgpack'):
+        try:
+            clients[name] = connect_client(args.port, name, received, disconnected)
+        except Exception as e:
+            failures.append(f"{name} client did not connect: {e}")
+    if not failures:
+        print("✓ JSON and msgpack clients connected")
+
+        for name, client in clients.items():
+            reply = client.call('echo', PAYLOAD, timeout=5)
+            if reply.get('echo') != PAYLOAD:
+                failures.append(f"{name} call ack wrong: {reply}")
+        if not failures:
+            print("✓ Call acks round-trip for both serializers")
+
+        clients['json'].emit('broadcast', PAYLOAD)
+        deadline = time.monotonic() + 5
+        while len(received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if sorted(received, key=lambda item: item[0]) != [('json', PAYLOAD), ('msgpack', PAYLOAD)]:
+            failures.append(f"broadcast received as {received}")
+        else:
+            print("✓ Broadcast reached both clients intact")
+
+        clients['msgpack'].emit('kick')
+        deadline = time.monotonic() + 5
+        while 'msgpack' not in disconnected and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if 'msgpack' not in disconnected:
+            failures.append("server-side disconnect did not reach the msgpack client")
+        else:
+            print("✓ Server-side disconnect reached the msgpack client")
+
+    for client in clients.values():
+        client.disconnect()
+    for problem in failures:
+        print(f"✗ {problem}")
+    if failures:
+        sys.exit(1)
+    print("✓ Packet negotiation works with this python-socketio")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Check TokenManager against a local stub of the Twitch OAuth endpoints.
+
+The stub issues short-lived tokens (--lifetime seconds), answers
+/validate, and delays every /token response by --latency seconds. While
+the manager runs, a ticker measures event loop lag and a ChatSender
+posts to a stub chat endpoint that rejects stale tokens with 401.
+
+Checks:
+- tokens are refreshed ahead of expiry (no chat send ever sees a 401
+  from expiry; a forced revoke is renewed and retried once)
+- concurrent renew() calls for the same stale token share one refresh
+- the event loop is never blocked by the refresh HTTP call
+- the cache file is rewritten atomically with owner-only permissions
+
+Usage:
+    python tools/check_token_manager.py
+    python tools/check_token_manager.py --lifetime 5 --duration 20
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aiohttp import web  # noqa: E402
+
+from src.chat_sender import ChatSender  # noqa: E402
+from src.oauth_flow import TokenManager, save_token_cache  # noqa: E402
+
+
+class StubOAuth:
+    """Token, validate and chat endpoints sharing one set of live tokens."""
+
+    def __init__(self, lifetime, latency):
+        self.lifetime = lifetime
+        self.latency = latency
+        self.counter = itertools.count(1)
+        self.tokens = {}           # access token -> expiry (time.time())
+        self.refresh_token = 'refresh-0'
+        self.refreshes = 0
+        self.unauthorized = 0
+        self.sent = 0
+
+    def issue(self):
+        token = f"access-{next(self.counter)}"
+        self.tokens[token] = time.time() + self.lifetime
+        return token
+
+    def valid(self, token):
+        return self.tokens.get(token, 0) > time.time()
+
+    async def token(self, request):
+        await asyncio.sleep(self.latency)
+        if request.query.get('refresh_token') != self.refresh_token:
+            return web.json_response({'message': 'Invalid refresh token'}, status=400)
+        self.refreshes += 1
+        self.refresh_token = f"refresh-{self.refreshes}"   # Rotated on every refresh
+        return web.json_response({
+            'access_token': self.issue(),
+            'refresh_token': self.refresh_token,
+            'expires_in': self.lifetime,
+        })
+
+    async def validate(self, request):
+        token = request.headers.get('Authorization', '').removeprefix('OAuth ')
+        if not self.valid(token):
+            return web.json_response({'message': 'invalid access token'}, status=401)
+        return web.json_response({'expires_in': int(self.tokens[token] - time.time())})
+
+    async def chat(self, request):
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not self.valid(token):
+            self.unauthorized += 1
+            return web.json_response({'message': 'Invalid OAuth token'}, status=401)
+        self.sent += 1
+        return web.json_response({'data': [{'message_id': str(self.sent), 'is_sent': True}]})
+
+
+async def measure_lag(stop, interval=0.01):
+    """Largest delay between a scheduled tick and when it ran."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(args, cache_file):
+    stub = StubOAuth(args.lifetime, args.latency)
+    app = web.Application()
+    app.router.add_post('/oauth2/token', stub.token)
+    app.router.add_get('/oauth2/validate', stub.validate)
+    app.router.add_post('/helix/chat/messages', stub.chat)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.port).start()
+    base = f'http://127.0.0.1:{args.port}'
+
+    # Cached token with a stale cached_at: the expiry estimate is wrong until validated
+    save_token_cache(stub.issue(), stub.refresh_token, 3600, cache_file)
+    tokens = TokenManager(
+        'client', 'secret', cache_file, oauth_url=f'{base}/oauth2',
+        refresh_margin=args.lifetime / 3, retry_min=0.2, retry_max=1,
+    )
+    tokens.start()
+    chat = ChatSender('client', tokens, 'bot', 'channel', helix_url=f'{base}/helix',
+                      rate=50, burst=50, on_unauthorized=tokens.renew)
+    chat.start()
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_lag(stop))
+    results = []
+    end = time.monotonic() + args.duration
+    revoked = False
+    while time.monotonic() < end:
+        if not revoked and time.monotonic() > end - args.duration / 2:
+            # Revoke the live token: the next send gets a 401, renews and retries
+            stub.tokens.clear()
+            revoked = True
+            refreshes_before = stub.refreshes
+            renewals = await asyncio.gather(*(tokens.renew(tokens()) for _ in range(5)))
+            shared = stub.refreshes - refreshes_before
+            stub.tokens.clear()   # Revoke again so a send hits the 401 path
+        results.append(await chat.send(f"message {len(results)}"))
+        await asyncio.sleep(0.1)
+
+    stop.set()
+    worst_lag = await lag
+    mode = stat.S_IMODE(os.stat(cache_file).st_mode)
+    with open(cache_file) as f:
+        cached = json.load(f)
+    leftovers = [name for name in os.listdir(os.path.dirname(cache_file)) if name.endswith('.tmp')]
+    await chat.close()
+    await tokens.close()
+    await runner.cleanup()
+    return stub, tokens, results, worst_lag, renewals, shared, cached, mode, leftovers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lifetime', type=float, default=3.0, help='Seconds each stub token is valid')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds the stub takes per /token call')
+    parser.add_argument('--duration', type=float, default=12.0, help='Seconds to keep sending')
+    parser.add_argument('--port', type=int, default=5096)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='token-check-')
+    cache_file = os.path.join(workdir, '.twitch_token')
+    stub, tokens, results, worst_lag, renewals, shared, cached, mode, leftovers = asyncio.run(run(args, cache_file))
+
+    print(f"Token lifetime {args.lifetime:g}s, /token latency {args.latency:g}s, ran {args.duration:g}s")
+    print(f"Refreshes: {stub.refreshes} | failures: {tokens.failures} | chat sent {stub.sent}/{len(results)} "
+          f"| 401s seen by chat: {stub.unauthorized}")
+    print(f"Concurrent renew() x5 -> {shared} refresh(es) | worst event loop lag: {worst_lag * 1000:.1f}ms")
+
+    failures = []
+    if stub.refreshes < args.duration / args.lifetime:
+        failures.append("tokens not refreshed ahead of expiry")
+    if not all(results):
+        failures.append(f"{results.count(False)} chat message(s) failed")
+    if stub.unauthorized > 1:
+        failures.append(f"{stub.unauthorized} 401s (expected one, from the forced revoke)")
+    if shared != 1 or not all(renewals):
+        failures.append("concurrent renew() calls did not share one refresh")
+    if worst_lag > args.latency / 2:
+        failures.append("event loop blocked during refresh")
+    if cached['access_token'] != tokens() or cached['refresh_token'] != stub.refresh_token:
+        failures.append("cache file does not hold the current token")
+    if mode != 0o600 or leftovers:
+        failures.append(f"cache file mode {oct(mode)}, temp files left: {leftovers}")
+
+    for failure in failures:
+        print(f"✗ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✓ Refreshed ahead of expiry without blocking; 401 renewed once; cache written atomically")
+
+
+if __name__ == '__main__':
+    main()
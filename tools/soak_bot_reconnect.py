@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Soak test for bot -> Flask vote delivery across server restarts.
+
+Runs the real server (src.server handlers, dry-run keypresses, data files
+in a temp directory) as a subprocess and feeds it votes through the bot's
+VoteOutbox/VoteSender over a reconnecting socket.io client. The server is
+killed (SIGKILL) and restarted repeatedly while votes keep arriving.
+
+Each vote carries a unique user_id, and every vote the vote manager
+actually applies (replays discarded as duplicates are not) is appended
+to a log with the server's PID. At the end each vote sent must have been
+applied at least once, and never twice by the same server process. A
+vote applied before a kill whose ack was lost is applied again by the
+next process (its vote_id cache starts empty); that is reported, not an
+error.
+
+Usage:
+    python tools/soak_bot_reconnect.py
+    python tools/soak_bot_reconnect.py --restarts 10 --rate 500 --outbox /tmp/outbox.jsonl
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import socketio  # noqa: E402
+
+from src.vote_delivery import VoteOutbox, VoteSender, BACKOFF_MIN, BACKOFF_MAX  # noqa: E402
+
+
+def serve(port, log_path):
+    """Server subprocess: real handlers, logging each vote the vote managers apply."""
+    import os
+    from src import server
+    from src.game_controller import create_keypress_backend, set_keypress_backend
+
+    set_keypress_backend(create_keypress_backend('dry-run'))
+    log = open(log_path, 'a')
+    pid = os.getpid()
+
+    def logged(apply_vote):
+        def wrapper(username, vote, timestamp=None, user_id=None):
+            applied = apply_vote(username, vote, timestamp, user_id)
+            if applied:
+                log.write(f"{pid} {user_id}\n")
+                log.flush()
+            return applied
+        return wrapper
+
+    for arena in server.arenas:
+        manager = arena.vote_manager
+        manager._apply_vote = logged(manager._apply_vote)
+    server.scheduler.start()
+    server.socketio.run(server.app, host='127.0.0.1', port=port, allow_unsafe_werkzeug=True)
+
+
+def start_server(port, log_path, workdir):
+    return subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), '--serve', '--port', str(port), '--log', str(log_path)],
+        cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_for_port(port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server did not start on port {port}")
+
+
+async def soak(args, workdir, log_path):
+    url = f'http://127.0.0.1:{args.port}'
+    proc = start_server(args.port, log_path, workdir)
+    await wait_for_port(args.port)
+
+    sio = socketio.AsyncClient(
+        reconnection=True, reconnection_attempts=0,
+        reconnection_delay=BACKOFF_MIN, reconnection_delay_max=BACKOFF_MAX,
+    )
+    outbox = VoteOutbox(path=args.outbox)
+    sender = VoteSender(sio, outbox, batch_window=0.005)
+    sio.on('connect', sender.wake)
+    await sio.connect(url)
+    sender.start()
+
+    sent_ids = []
+    rng = random.Random(11)
+    stop = asyncio.Event()
+
+    async def produce():
+        interval = 1 / args.rate
+        while not stop.is_set():
+            # user_id = index into sent_ids, so applied votes map back to vote_ids
+            vote = sender.send({
+                'username': f'viewer{rng.randrange(5000)}',
+                'user_id': str(len(sent_ids)),
+                'channel_id': None,
+                'vote': rng.choice('klx'),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            })
+            sent_ids.append(vote['vote_id'])
+            await asyncio.sleep(interval)
+
+    producer = asyncio.create_task(produce())
+    try:
+        for restart in range(1, args.restarts + 1):
+            await asyncio.sleep(args.uptime)
+            proc.send_signal(signal.SIGKILL)
+            proc.wait()
+            held = len(outbox)
+            await asyncio.sleep(args.downtime)
+            proc = start_server(args.port, log_path, workdir)
+            await wait_for_port(args.port)
+            print(f"  restart {restart}/{args.restarts}: {len(sent_ids)} sent, {held}+ held during outage")
+
+        await asyncio.sleep(args.uptime)
+        stop.set()
+        await producer
+
+        deadline = time.monotonic() + 60
+        while len(outbox) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+    finally:
+        stop.set()
+        await sio.disconnect()
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+
+    return sent_ids, outbox, sender
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--restarts', type=int, default=5, help='Server kill/restart cycles')
+    parser.add_argument('--rate', type=float, default=200, help='Votes per second')
+    parser.add_argument('--uptime', type=float, default=3.0, help='Seconds the server runs between kills')
+    parser.add_argument('--downtime', type=float, default=1.5, help='Seconds the server stays down')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--outbox', help='Disk-backed outbox file (default: memory only)')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--log', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.log)
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix='bot-soak-'))
+    log_path = workdir / 'applied.log'
+    try:
+        print(f"Soak: {args.restarts} restarts, {args.rate:g} votes/s, "
+              f"{args.uptime:g}s up / {args.downtime:g}s down")
+        sent_ids, outbox, sender = asyncio.run(soak(args, workdir, log_path))
+
+        applied = {}     # user_id -> number of times applied
+        processes = {}   # user_id -> PIDs that applied it
+        if log_path.exists():
+            for line in log_path.read_text().splitlines():
+                pid, user_id = line.split()
+                applied[user_id] = applied.get(user_id, 0) + 1
+                processes.setdefault(user_id, set()).add(pid)
+        lost = [vote_id for i, vote_id in enumerate(sent_ids) if str(i) not in applied]
+        reapplied = sum(len(pids) - 1 for pids in processes.values())
+        doubled = [sent_ids[int(user_id)] for user_id, count in applied.items()
+                   if count > len(processes[user_id])]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"Votes sent: {len(sent_ids)} | delivered: {len(sent_ids) - len(lost)} | "
+          f"send failures: {sender.failures} | dropped (outbox full): {outbox.dropped}")
+    print(f"Votes applied again after a restart (ack lost in a kill, resent): {reapplied}")
+    if len(outbox):
+        print(f"⚠ {len(outbox)} vote(s) still held when the soak ended")
+    if doubled:
+        print(f"✗ {len(doubled)} replayed vote(s) applied twice by one server, e.g. {doubled[:5]}")
+    if lost:
+        print(f"✗ {len(lost)} vote(s) lost, e.g. {lost[:5]}")
+    if lost or doubled:
+        sys.exit(1)
+    print("✓ No votes lost across restarts, no replay applied twice")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for the VoteManager command loop.
+
+Several writer threads cast votes while another thread resets rounds,
+mirroring socket.io handlers racing the timer. Every cast reports the
+round it landed in. At each reset the round's vote count is captured,
+and at the end each round's count must equal the number of distinct
+voters that were told their vote landed in that round. The incremental
+tally is also checked against a full recount after every change.
+
+Usage:
+    python tools/stress_vote_loop.py              # through the command loop
+    python tools/stress_vote_loop.py --no-loop    # direct calls (shows the race)
+"""
+
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.vote_manager import VoteManager  # noqa: E402
+
+WRITERS = 8
+VOTES_PER_WRITER = 20_000
+
+
+class StubSocketIO:
+    """Minimal SocketIO stand-in for running VoteManager without Flask."""
+
+    def emit(self, event, data=None, **kwargs):
+        pass
+
+    def start_background_task(self, target, *args, **kwargs):
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+def main():
+    use_loop = '--no-loop' not in sys.argv
+    manager = VoteManager(StubSocketIO(), verify_tally=True)
+
+    def run(fn, *args):
+        if use_loop:
+            return manager.commands.call(fn, *args)
+        return fn(*args)
+
+    def cast_and_report(username, vote):
+        manager.cast_vote(username, vote)
+        return manager.round_id
+
+    def close_round():
+        closed = (manager.round_id, len(manager.votes))
+        manager.reset_votes()
+        return closed
+
+    landed = defaultdict(set)  # round_id -> usernames told their vote landed there
+    landed_lock = threading.Lock()
+    closed_rounds = []
+    errors = []
+    done = threading.Event()
+
+    def writer(index):
+        rng = random.Random(index)
+        try:
+            for i in range(VOTES_PER_WRITER):
+                username = f"w{index}_{rng.randrange(500)}"
+                round_id = run(cast_and_report, username, rng.choice('klx'))
+                with landed_lock:
+                    landed[round_id].add(username)
+        except Exception as e:
+            errors.append(e)
+
+    def resetter():
+        try:
+            while not done.is_set():
+                time.sleep(0.005)
+                closed_rounds.append(run(close_round))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+    reset_thread = threading.Thread(target=resetter)
+
+    start = time.perf_counter()
+    reset_thread.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    reset_thread.join()
+    closed_rounds.append(run(close_round))
+    elapsed = time.perf_counter() - start
+
+    mismatches = [
+        (round_id, count, len(landed.get(round_id, ())))
+        for round_id, count in closed_rounds
+        if count != len(landed.get(round_id, ()))
+    ]
+
+    total = WRITERS * VOTES_PER_WRITER
+    print(f"Mode: {'command loop' if use_loop else 'direct calls'}")
+    print(f"Votes: {total} from {WRITERS} writers in {elapsed:.2f}s ({total / elapsed:.0f}/s)")
+    print(f"Rounds closed: {len(closed_rounds)}")
+    print(f"Errors: {len(errors)}" + (f" (first: {errors[0]!r})" if errors else ""))
+    print(f"Rounds with lost/misattributed votes: {len(mismatches)}")
+    for round_id, count, expected in mismatches[:5]:
+        print(f"  round {round_id}: store had {count}, writers reported {expected}")
+
+    if errors or mismatches:
+        sys.exit(1)
+    print("✓ No lost or misattributed votes")
+
+
+if __name__ == '__main__':
+    main()